@@ -5,14 +5,16 @@
 import streamlit as st
 import os
 import sys
-import requests
 from datetime import datetime, timedelta
-import traceback
-from typing import Dict, List, Optional
+from typing import Dict, Final, List, Optional
 import logging
+import json
 import time
+import hashlib
 from functools import wraps
-import pandas as pd
+from statistics import fmean
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # 配置日志
 logging.basicConfig(
@@ -22,19 +24,26 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # 添加项目根目录到Python路径
-# 兼容Streamlit Cloud和Vercel部署
-if os.path.basename(os.path.dirname(__file__)) == 'api':
-    # Vercel部署：当前文件在api目录下
-    project_root = os.path.dirname(os.path.dirname(__file__))
-else:
-    # Streamlit Cloud部署：当前文件在根目录下
-    project_root = os.path.dirname(__file__)
-sys.path.insert(0, project_root)
+@st.cache_resource
+def _project_paths() -> str:
+    """计算项目根目录并加入Python路径（每个进程只执行一次，rerun时直接返回）"""
+    # 兼容Streamlit Cloud和Vercel部署
+    if os.path.basename(os.path.dirname(__file__)) == 'api':
+        # Vercel部署：当前文件在api目录下
+        root = os.path.dirname(os.path.dirname(__file__))
+    else:
+        # Streamlit Cloud部署：当前文件在根目录下
+        root = os.path.dirname(__file__)
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    return root
+
+project_root = _project_paths()
 
 # 导入自定义模块
 try:
     from src.email_connector import EmailConnector
-    from src.semantic_search import SemanticSearchEngine
+    from src.semantic_search import SemanticSearchEngine, create_faiss_index
     from src.oss_storage import OSSStorage
     from src.utils import (
         validate_email_config, format_email_preview, export_emails_to_csv,
@@ -44,11 +53,11 @@ try:
         load_email_config, list_saved_configs, delete_email_config,
         save_emails_to_cache, load_emails_from_cache, get_cache_info,
         clean_html_tags, get_historical_cache_files, load_emails_from_specific_cache,
-        search_emails_in_cache
+        search_emails_in_cache, EmailColumns
     )
 except ImportError as e:
     st.error(f"模块导入失败: {str(e)}")
-    logger.error(f"Module import failed: {str(e)}")
+    logger.error("Module import failed: %s", e)
     st.stop()
 
 # 页面配置
@@ -59,12 +68,36 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# 隐藏页面底部默认的“Made with Streamlit”文案
-st.markdown("""
-<style>
+# 全局样式：隐藏页面底部默认的“Made with Streamlit”文案，以及导航提示的动画
+_APP_CSS = """
 footer {visibility: hidden;}
-</style>
-""", unsafe_allow_html=True)
+@keyframes pulse {
+    0% { transform: scale(1); }
+    50% { transform: scale(1.02); }
+    100% { transform: scale(1); }
+}
+"""
+
+# 每次运行只注入一次全局样式（未重新输出的元素会在rerun后消失，因此不能按会话跳过）
+st.html(f"<style>{_APP_CSS}</style>")
+
+# webhook连接复用：长连接Session + 单线程后台发送（进程内共享）
+@st.cache_resource
+def _get_webhook_client():
+    """获取webhook发送使用的Session和线程池"""
+    import requests  # 仅在需要发送告警时导入，减少冷启动开销
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="error-webhook")
+    return session, executor
+
+def _log_webhook_result(future):
+    """记录后台webhook发送失败"""
+    if future.exception() is not None:
+        logger.warning("Error notification failed: %s", future.exception())
 
 # 错误通知（webhook）
 def notify_error(context: str, error: Exception, config: Dict):
@@ -79,7 +112,10 @@ def notify_error(context: str, error: Exception, config: Dict):
         }
         # 兼容常见 webhook（如自建、Slack等）
         headers = {'Content-Type': 'application/json'}
-        requests.post(webhook, json=payload, headers=headers, timeout=5)
+        # 后台发送，不阻塞脚本线程
+        session, executor = _get_webhook_client()
+        future = executor.submit(session.post, webhook, json=payload, headers=headers, timeout=5)
+        future.add_done_callback(_log_webhook_result)
     except Exception as _:
         # 告警失败不影响主流程
         logger.warning("Error notification failed")
@@ -89,16 +125,17 @@ def performance_monitor(func):
     """性能监控装饰器"""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             result = func(*args, **kwargs)
-            execution_time = time.time() - start_time
-            if execution_time > 1.0:  # 记录超过1秒的操作
-                logger.warning(f"Slow operation: {func.__name__} took {execution_time:.2f}s")
+            execution_time = time.perf_counter() - start_time
+            # 记录超过1秒的操作，日志级别关闭时跳过格式化
+            if execution_time > 1.0 and logger.isEnabledFor(logging.WARNING):
+                logger.warning("Slow operation: %s took %.2fs", func.__name__, execution_time)
             return result
         except Exception as e:
-            execution_time = time.time() - start_time
-            logger.error(f"Error in {func.__name__} after {execution_time:.2f}s: {str(e)}")
+            execution_time = time.perf_counter() - start_time
+            logger.error("Error in %s after %.2fs: %s", func.__name__, execution_time, e)
             raise
     return wrapper
 
@@ -110,14 +147,15 @@ def error_handler(func):
         try:
             return func(*args, **kwargs)
         except Exception as e:
-            logger.error(f"Error in {func.__name__}: {str(e)}")
+            logger.error("Error in %s: %s", func.__name__, e)
             # 发送错误告警
             try:
-                notify_error(func.__name__, e, config)
+                notify_error(func.__name__, e, load_app_config())
             except Exception:
                 pass
             st.error(f"操作失败: {str(e)}")
             if st.session_state.get('debug_mode', False):
+                import traceback
                 st.code(traceback.format_exc())
             return None
     return wrapper
@@ -125,6 +163,10 @@ def error_handler(func):
 # 初始化session state
 def init_session_state():
     """初始化session state"""
+    # 已初始化的会话直接返回，避免每次rerun逐个检查默认值
+    if st.session_state.get('_initialized'):
+        return
+    
     defaults = {
         'email_connector': None,
         'search_engine': None,
@@ -142,68 +184,73 @@ def init_session_state():
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
-
-# 初始化
-init_session_state()
-
-# 自动加载邮件数据（优先从OSS加载）
-if not st.session_state.get('emails_data', []):
-    emails_loaded = False
     
-    # 优先尝试从OSS加载
-    if st.session_state.get('oss_storage'):
-        try:
-            oss_emails = st.session_state.get('oss_storage').download_emails_index()
-            if oss_emails:
-                st.session_state.emails_data = oss_emails
-                logger.info(f"从OSS加载了 {len(oss_emails)} 封邮件")
-                emails_loaded = True
-        except Exception as e:
-            logger.warning(f"从OSS加载邮件失败: {e}")
-    
-    # 如果OSS加载失败，尝试从本地缓存加载
-    if not emails_loaded:
-        cached_emails = load_emails_from_cache()
-        if cached_emails:
-            st.session_state.emails_data = cached_emails
-            logger.info(f"从本地缓存加载了 {len(cached_emails)} 封邮件")
-            
-            # 如果有OSS存储，将本地缓存上传到OSS
-            if st.session_state.get('oss_storage'):
-                try:
-                    st.session_state.get('oss_storage').upload_emails_index(cached_emails)
-                    logger.info("本地缓存已同步到OSS")
-                except Exception as e:
-                    logger.warning(f"同步到OSS失败: {e}")
+    st.session_state._initialized = True
 
-# 加载配置
-@st.cache_data(ttl=300)  # 5分钟缓存
+# 加载配置（cache_resource：跨会话共享同一只读dict，命中时无pickle开销）
+@st.cache_resource
 def load_app_config():
-    """加载应用配置"""
+    """加载应用配置（只读，调用方不得修改返回的dict）"""
     try:
         return load_config_from_env()
     except Exception as e:
-        logger.error(f"Failed to load config: {str(e)}")
+        logger.error("Failed to load config: %s", e)
         return {
             'app': {'cache_dir': './cache', 'debug': False},
             'oss': {},
             'ai': {'model_name': 'all-MiniLM-L6-v2'}
         }
 
-config = load_app_config()
+# 健康检查处理（/?health=1 或 /?health=TOKEN）
+def handle_healthcheck() -> bool:
+    ss = st.session_state
+    try:
+        params = st.query_params
+        if 'health' not in params:
+            return False
+        token = params.get('health', '')
+        expected = load_app_config()['app'].get('healthcheck_token')
+        if expected and token != expected:
+            st.error('健康检查令牌无效')
+            return True
+        # 轻量状态输出，避免重载主界面
+        search_engine = ss.get('search_engine')
+        last_sync_time = ss.get('last_sync_time')
+        emails_count = len(ss.get('emails_data', []))
+        indexed = len(search_engine.email_metadata) if search_engine else 0
+        st.write({
+            'status': 'ok',
+            'emails_synced': emails_count,
+            'emails_indexed': indexed,
+            'connected': bool(ss.get('connection_status', False)),
+            'last_sync': last_sync_time.isoformat() if last_sync_time else None,
+            'errors': int(ss.get('error_count', 0)),
+        })
+        return True
+    except Exception as e:
+        logger.error("Healthcheck failed: %s", e)
+        st.write({'status': 'error', 'message': str(e)})
+        return True
+
+# 健康检查探针直接返回，不初始化会话状态、不加载邮件缓存
+if handle_healthcheck():
+    st.stop()
+
+# 初始化
+init_session_state()
 
 # 创建缓存目录
 try:
-    cache_dir = create_cache_dir(config['app']['cache_dir'])
+    cache_dir = create_cache_dir(load_app_config()['app']['cache_dir'])
 except Exception as e:
-    logger.error(f"Failed to create cache directory: {str(e)}")
+    logger.error("Failed to create cache directory: %s", e)
     cache_dir = './cache'
 
 # 初始化OSS存储
 if st.session_state.get('oss_storage') is None:
     try:
         from src.oss_storage import OSSStorage
-        oss_config = config.get('oss', {})
+        oss_config = load_app_config().get('oss', {})
         
         # 检查OSS配置是否完整
         required_keys = ['access_key_id', 'access_key_secret', 'bucket_name', 'endpoint']
@@ -218,40 +265,91 @@ if st.session_state.get('oss_storage') is None:
         else:
             logger.warning("OSS配置不完整，将使用本地存储")
     except Exception as e:
-        logger.error(f"OSS存储初始化失败: {e}")
+        logger.error("OSS存储初始化失败: %s", e)
 
-# 健康检查处理（/?health=1 或 /?health=TOKEN）
-def handle_healthcheck() -> bool:
+# 本地邮件缓存按文件mtime在进程内缓存，避免每次rerun重复解析JSON
+@st.cache_resource
+def _cached_emails_loader(cache_dir: str, mtime: float):
+    """加载本地邮件缓存（mtime仅作为缓存键，缓存文件更新后自动失效）"""
+    return load_emails_from_cache(cache_dir)
+
+def _latest_cache_mtime() -> float:
+    """获取本地邮件缓存文件的修改时间，文件不存在时返回0"""
     try:
-        params = st.experimental_get_query_params()
-        if 'health' not in params:
-            return False
-        token = params.get('health', [''])[0]
-        expected = config['app'].get('healthcheck_token')
-        if expected and token != expected:
-            st.error('健康检查令牌无效')
-            return True
-        # 轻量状态输出，避免重载主界面
-        emails_count = len(st.session_state.get('emails_data', []))
-        indexed = len(st.session_state.search_engine.email_metadata) if st.session_state.get('search_engine') else 0
-        st.write({
-            'status': 'ok',
-            'emails_synced': emails_count,
-            'emails_indexed': indexed,
-            'connected': bool(st.session_state.get('connection_status', False)),
-            'last_sync': st.session_state.get('last_sync_time').isoformat() if st.session_state.get('last_sync_time') else None,
-            'errors': int(st.session_state.get('error_count', 0)),
-        })
-        return True
-    except Exception as e:
-        logger.error(f"Healthcheck failed: {str(e)}")
-        st.write({'status': 'error', 'message': str(e)})
-        return True
+        return os.path.getmtime(os.path.join(cache_dir, 'latest_emails_cache.json'))
+    except OSError:
+        return 0.0
+
+# 历史缓存文件按路径和mtime在进程内缓存，重复选择同一文件时不再读取磁盘
+@st.cache_resource(max_entries=4, ttl=900)
+def _cached_specific_cache_loader(cache_file_path: str, mtime: float):
+    """加载指定的历史缓存文件（mtime仅作为缓存键）"""
+    return load_emails_from_specific_cache(cache_file_path)
+
+def load_specific_cache(cache_file_path: str) -> Optional[List]:
+    """
+    加载历史缓存文件，命中进程内缓存时直接返回
+    
+    Args:
+        cache_file_path: 缓存文件路径
+        
+    Returns:
+        Optional[List]: 邮件数据列表（浅拷贝），加载失败时返回None
+    """
+    try:
+        mtime = os.path.getmtime(cache_file_path)
+    except OSError:
+        return load_emails_from_specific_cache(cache_file_path)
+    emails = _cached_specific_cache_loader(cache_file_path, mtime)
+    return list(emails) if emails else emails
+
+# 自动加载邮件数据（优先从OSS加载），每个会话只尝试一次
+if 'cache_loaded' not in st.session_state and not st.session_state.get('emails_data', []):
+    st.session_state.cache_loaded = True
+    emails_loaded = False
+    
+    # 优先尝试从OSS加载
+    if st.session_state.get('oss_storage'):
+        try:
+            oss_emails = st.session_state.get('oss_storage').download_emails_index()
+            if oss_emails:
+                st.session_state.emails_data = oss_emails
+                logger.info("从OSS加载了 %s 封邮件", len(oss_emails))
+                emails_loaded = True
+        except Exception as e:
+            logger.warning("从OSS加载邮件失败: %s", e)
+    
+    # 如果OSS加载失败，尝试从本地缓存加载
+    if not emails_loaded:
+        cached_emails = _cached_emails_loader(cache_dir, _latest_cache_mtime())
+        if cached_emails:
+            # 浅拷贝，避免不同会话共享同一个列表对象
+            st.session_state.emails_data = list(cached_emails)
+            logger.info("从本地缓存加载了 %s 封邮件", len(cached_emails))
+            
+            # 如果有OSS存储，将本地缓存上传到OSS
+            if st.session_state.get('oss_storage'):
+                try:
+                    st.session_state.get('oss_storage').upload_emails_index(cached_emails)
+                    logger.info("本地缓存已同步到OSS")
+                except Exception as e:
+                    logger.warning("同步到OSS失败: %s", e)
+
+# 邮箱服务商及其预设IMAP配置（只读常量）
+_PROVIDERS = ("Gmail", "Outlook", "QQ邮箱", "163邮箱", "自定义IMAP")
+_IMAP_CONFIGS = MappingProxyType({
+    "Gmail": MappingProxyType({"server": "imap.gmail.com", "port": 993}),
+    "Outlook": MappingProxyType({"server": "outlook.office365.com", "port": 993}),
+    "QQ邮箱": MappingProxyType({"server": "imap.qq.com", "port": 993}),
+    "163邮箱": MappingProxyType({"server": "imap.163.com", "port": 993}),
+    "自定义IMAP": MappingProxyType({"server": "", "port": 993})
+})
 
 @error_handler
 @performance_monitor
 def configure_email_settings() -> Dict:
     """配置邮箱设置"""
+    ss = st.session_state
     email_config = {}
     
     # 配置管理部分
@@ -278,7 +376,7 @@ def configure_email_settings() -> Dict:
                         # 将加载的配置保存到session state
                         for key, value in loaded_config.items():
                             if key != 'saved_at':  # 排除时间戳
-                                st.session_state[f"config_{key}"] = value
+                                ss[f"config_{key}"] = value
                         st.success(f"✅ 配置 '{selected_config}' 已加载")
                         st.rerun()
                     else:
@@ -309,125 +407,125 @@ def configure_email_settings() -> Dict:
     # 邮箱类型选择
     email_provider = st.selectbox(
         "邮箱服务商",
-        ["Gmail", "Outlook", "QQ邮箱", "163邮箱", "自定义IMAP"],
-        index=0 if "config_provider" not in st.session_state else 
-              ["Gmail", "Outlook", "QQ邮箱", "163邮箱", "自定义IMAP"].index(st.session_state.get("config_provider", "Gmail"))
+        _PROVIDERS,
+        index=0 if "config_provider" not in ss else 
+              _PROVIDERS.index(ss.get("config_provider", "Gmail"))
     )
     
     # 根据服务商预设IMAP配置
-    imap_configs = {
-        "Gmail": {"server": "imap.gmail.com", "port": 993},
-        "Outlook": {"server": "outlook.office365.com", "port": 993},
-        "QQ邮箱": {"server": "imap.qq.com", "port": 993},
-        "163邮箱": {"server": "imap.163.com", "port": 993},
-        "自定义IMAP": {"server": "", "port": 993}
-    }
-    
+    imap_config = _IMAP_CONFIGS[email_provider]
     email_config['provider'] = email_provider
-    email_config['server'] = imap_configs[email_provider]['server']
-    email_config['port'] = imap_configs[email_provider]['port']
-    
-    # 如果是自定义IMAP，允许用户输入服务器信息
-    if email_provider == "自定义IMAP":
-        email_config['server'] = st.text_input(
-            "IMAP服务器", 
-            value=st.session_state.get("config_server", "")
-        )
-        email_config['port'] = st.number_input(
-            "端口", 
-            value=st.session_state.get("config_port", 993), 
-            min_value=1, 
-            max_value=65535
-        )
-    else:
-        st.info(f"服务器: {email_config['server']}:{email_config['port']}")
-    
-    # 用户凭据
-    email_config['email'] = st.text_input(
-        "邮箱地址", 
-        placeholder="your.email@example.com",
-        value=st.session_state.get("config_email", "")
-    )
-    email_config['password'] = st.text_input("密码/应用专用密码", type="password")
-    email_config['use_ssl'] = True
-    
-    # SSL配置选项
-    with st.expander("🔒 高级SSL设置"):
-        email_config['disable_ssl_verify'] = st.checkbox(
-            "禁用SSL证书验证", 
-            value=st.session_state.get("config_disable_ssl_verify", False),
-            help="⚠️ 仅在遇到SSL证书问题时启用。这会降低安全性，请谨慎使用。"
-        )
-        if email_config['disable_ssl_verify']:
-            st.warning("⚠️ SSL证书验证已禁用，连接安全性降低")
-    
-    # 配置保存部分
-    st.markdown("---")
-    st.markdown("#### 💾 保存配置")
-    
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        config_name = st.text_input(
-            "配置名称", 
-            value="default",
-            placeholder="输入配置名称",
-            help="为当前配置指定一个名称，方便以后快速加载"
+    email_config['server'] = imap_config['server']
+    email_config['port'] = imap_config['port']
+    
+    # 服务器、凭据和SSL设置放在表单中，输入过程中不触发rerun，提交时一次性生效
+    with st.form("email_config_form"):
+        # 如果是自定义IMAP，允许用户输入服务器信息
+        if email_provider == "自定义IMAP":
+            email_config['server'] = st.text_input(
+                "IMAP服务器", 
+                value=ss.get("config_server", "")
+            )
+            email_config['port'] = st.number_input(
+                "端口", 
+                value=ss.get("config_port", 993), 
+                min_value=1, 
+                max_value=65535
+            )
+        else:
+            st.info(f"服务器: {email_config['server']}:{email_config['port']}")
+        
+        # 用户凭据
+        email_config['email'] = st.text_input(
+            "邮箱地址", 
+            placeholder="your.email@example.com",
+            value=ss.get("config_email", "")
         )
-    
-    with col2:
-        if st.button("💾 保存配置", key="save_config"):
-            if config_name and email_config.get('email'):
-                # 保存当前配置（不包含密码）
-                if save_email_config(email_config, config_name):
-                    st.success(f"✅ 配置 '{config_name}' 已保存")
-                else:
-                    st.error("❌ 保存配置失败")
+        email_config['password'] = st.text_input("密码/应用专用密码", type="password")
+        email_config['use_ssl'] = True
+        
+        # SSL配置选项
+        with st.expander("🔒 高级SSL设置"):
+            email_config['disable_ssl_verify'] = st.checkbox(
+                "禁用SSL证书验证", 
+                value=ss.get("config_disable_ssl_verify", False),
+                help="⚠️ 仅在遇到SSL证书问题时启用。这会降低安全性，请谨慎使用。"
+            )
+            if email_config['disable_ssl_verify']:
+                st.warning("⚠️ SSL证书验证已禁用，连接安全性降低")
+        
+        # 配置保存部分：与测试连接同属一个表单，保存时读取的是本次提交的值
+        st.markdown("---")
+        st.markdown("#### 💾 保存配置")
+        
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            config_name = st.text_input(
+                "配置名称", 
+                value="default",
+                placeholder="输入配置名称",
+                help="为当前配置指定一个名称，方便以后快速加载"
+            )
+        
+        with col2:
+            save_clicked = st.form_submit_button("💾 保存配置")
+        
+        test_clicked = st.form_submit_button("🔗 测试连接")
+    
+    # 保存配置（表单提交）
+    if save_clicked:
+        if config_name and email_config.get('email'):
+            # 保存当前配置（不包含密码）
+            if save_email_config(email_config, config_name):
+                st.success(f"✅ 配置 '{config_name}' 已保存")
             else:
-                st.error("❌ 请填写配置名称和邮箱地址")
+                st.error("❌ 保存配置失败")
+        else:
+            st.error("❌ 请填写配置名称和邮箱地址")
     
-    # 连接测试按钮
-    if st.button("🔗 测试连接"):
+    # 连接测试（表单提交）
+    if test_clicked:
         if validate_email_config(email_config):
             with st.spinner("正在测试邮箱连接..."):
                 try:
                     connector = EmailConnector(email_config)
                     if connector.test_connection():
-                        st.session_state.email_connector = connector
-                        st.session_state.connection_status = True
+                        ss.email_connector = connector
+                        ss.connection_status = True
                         st.success("✅ 邮箱连接成功！")
                         email_config['configured'] = True
-                        logger.info(f"Email connection successful for {email_config['email']}")
+                        logger.info("Email connection successful for %s", email_config['email'])
                         
                         # 询问用户是否立即开始同步
                         st.info("🚀 邮箱配置完成！您现在可以：")
                         col1, col2 = st.columns(2)
                         with col1:
                             if st.button("🔄 立即同步邮件", type="primary", use_container_width=True):
-                                st.session_state.auto_sync_requested = True
+                                ss.auto_sync_requested = True
                                 st.rerun()
                         with col2:
                             if st.button("🔍 直接开始搜索", type="secondary", use_container_width=True):
-                                st.session_state.direct_search_mode = True
+                                ss.direct_search_mode = True
                                 st.info("💡 您选择了直接搜索模式。搜索时将实时查询邮件服务器，可能会稍慢但无需等待同步。")
                         
                         # 如果用户选择了自动同步
-                        if st.session_state.get('auto_sync_requested', False):
+                        if ss.get('auto_sync_requested', False):
                             st.info("🔄 正在自动同步邮件，请稍候...")
                             # 使用默认配置进行同步
                             sync_emails(limit=-1, days_back=365, include_sent=True)
-                            st.session_state.auto_sync_requested = False
+                            ss.auto_sync_requested = False
                             st.success("🎉 邮件同步完成！您现在可以切换到搜索页面开始使用了。")
                             st.balloons()
                     else:
                         st.error("❌ 邮箱连接失败，请检查配置")
                         email_config['configured'] = False
-                        st.session_state.error_count = st.session_state.get('error_count', 0) + 1
+                        ss.error_count = ss.get('error_count', 0) + 1
                 except Exception as e:
                     st.error(f"❌ 连接错误: {str(e)}")
                     email_config['configured'] = False
-                    st.session_state.error_count = st.session_state.get('error_count', 0) + 1
-                    logger.error(f"Email connection failed: {str(e)}")
+                    ss.error_count = ss.get('error_count', 0) + 1
+                    logger.error("Email connection failed: %s", e)
         else:
             st.error("❌ 请填写完整的邮箱配置信息")
             email_config['configured'] = False
@@ -471,81 +569,257 @@ def configure_search_settings() -> Dict:
     
     return search_config
 
+@st.fragment
 def display_system_status():
-    """显示系统状态"""
-    emails_count = len(st.session_state.get('emails_data', []))
+    """显示系统状态（fragment：调试开关等交互只重新运行本函数）"""
+    ss = st.session_state
+    oss_storage = ss.get('oss_storage')
+    debug_mode = ss.get('debug_mode', False)
+    last_sync_time = ss.get('last_sync_time')
+    error_count = ss.get('error_count', 0)
+    
+    emails_count = len(ss.get('emails_data', []))
     st.metric("已索引邮件", f"{emails_count:,}")
     
     # 系统组件状态
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        if st.session_state.get('connection_status', False):
+        if ss.get('connection_status', False):
             st.success("🟢 邮箱已连接")
         else:
             st.error("🔴 邮箱未连接")
     
     with col2:
-        if st.session_state.get('search_engine'):
+        if ss.get('search_engine'):
             st.success("🟢 搜索引擎已就绪")
         else:
             st.warning("🟡 搜索引擎未初始化")
     
     with col3:
         # OSS存储状态
-        if st.session_state.get('oss_storage'):
+        if oss_storage:
             try:
                 # 测试OSS连接
-                st.session_state.get('oss_storage').test_connection()
+                oss_storage.test_connection()
                 st.success("☁️ OSS存储已连接")
             except Exception as e:
                 st.error(f"☁️ OSS存储连接失败")
-                if st.session_state.get('debug_mode', False):
+                if debug_mode:
                     st.error(f"错误详情: {str(e)}")
         else:
             st.warning("☁️ OSS存储未配置")
     
     # 显示最后同步时间
-    if st.session_state.get('last_sync_time'):
-        st.info(f"最后同步: {st.session_state.get('last_sync_time').strftime('%Y-%m-%d %H:%M')}")
+    if last_sync_time:
+        st.info(f"最后同步: {last_sync_time.strftime('%Y-%m-%d %H:%M')}")
     
     # 存储信息
-    if st.session_state.get('oss_storage'):
+    if oss_storage:
         try:
-            storage_info = st.session_state.get('oss_storage').get_storage_usage()
+            storage_info = oss_storage.get_storage_usage()
             if storage_info:
                 st.info(f"☁️ OSS存储: {storage_info.get('object_count', 0)} 个对象, "
                        f"{storage_info.get('total_size', 0) / 1024 / 1024:.2f} MB")
         except Exception as e:
-            if st.session_state.get('debug_mode', False):
+            if debug_mode:
                 st.warning(f"获取OSS存储信息失败: {str(e)}")
     
     # 错误计数
-    if st.session_state.get('error_count', 0) > 0:
-        st.warning(f"⚠️ 错误次数: {st.session_state.get('error_count', 0)}")
+    if error_count > 0:
+        st.warning(f"⚠️ 错误次数: {error_count}")
     
     # 调试模式开关
-    st.session_state.debug_mode = st.checkbox("调试模式", value=st.session_state.get('debug_mode', False))
+    ss.debug_mode = st.checkbox("调试模式", value=debug_mode)
+
+# 搜索页引导信息（模块级常量，避免每次rerun重新构造）
+_GUIDE_HTML = """
+<div style="background-color: #e3f2fd; padding: 20px; border-radius: 8px; border: 2px solid #2196f3; margin-bottom: 20px;">
+<h3 style="color: #1976d2; margin: 0 0 15px 0;">🚀 快速开始指南</h3>
+<div style="display: flex; align-items: center; margin-bottom: 15px;">
+<div style="background-color: #2196f3; color: white; border-radius: 50%; width: 30px; height: 30px; display: flex; align-items: center; justify-content: center; margin-right: 15px; font-weight: bold;">1</div>
+<div>
+<h4 style="color: #333; margin: 0 0 5px 0;">配置邮箱连接</h4>
+<p style="color: #666; margin: 0; font-size: 16px;">
+📧 前往"邮件配置"标签页，输入邮箱信息并测试连接
+</p>
+</div>
+</div>
+<div style="display: flex; align-items: center; margin-bottom: 15px;">
+<div style="background-color: #4caf50; color: white; border-radius: 50%; width: 30px; height: 30px; display: flex; align-items: center; justify-content: center; margin-right: 15px; font-weight: bold;">2</div>
+<div>
+<h4 style="color: #333; margin: 0 0 5px 0;">选择搜索方式</h4>
+<p style="color: #666; margin: 0; font-size: 16px;">
+🔍 <strong>实时搜索</strong>：配置完成即可使用，无需等待<br>
+🧠 <strong>智能搜索</strong>：需要先同步邮件，但搜索更智能
+</p>
+</div>
+</div>
+<div style="display: flex; align-items: center;">
+<div style="background-color: #ff9800; color: white; border-radius: 50%; width: 30px; height: 30px; display: flex; align-items: center; justify-content: center; margin-right: 15px; font-weight: bold;">3</div>
+<div>
+<h4 style="color: #333; margin: 0 0 5px 0;">开始搜索</h4>
+<p style="color: #666; margin: 0; font-size: 16px;">
+✨ 配置完成后即可开始搜索，或选择同步邮件以获得更好的搜索体验
+</p>
+</div>
+</div>
+</div>
+"""
+
+_STEPS_HTML = """
+<div style="background-color: #e8f4fd; padding: 20px; border-radius: 10px; border: 2px solid #1f77b4; margin: 20px 0;">
+<h3 style="color: #1f77b4; margin: 0 0 15px 0;">📋 操作步骤</h3>
+<div style="background-color: white; padding: 15px; border-radius: 8px; margin-bottom: 15px;">
+<h4 style="color: #333; margin: 0 0 10px 0;">第一步：切换到邮件管理</h4>
+<p style="color: #666; margin: 0; font-size: 16px;">
+👆 点击页面顶部的 <strong style="background-color: #f0f0f0; padding: 2px 6px; border-radius: 4px;">📧 邮件管理</strong> 标签页
+</p>
+</div>
+<div style="background-color: white; padding: 15px; border-radius: 8px; margin-bottom: 15px;">
+<h4 style="color: #333; margin: 0 0 10px 0;">第二步：配置同步选项</h4>
+<p style="color: #666; margin: 0; font-size: 16px;">
+⚙️ 选择同步数量（建议选择"无限制"）和时间范围
+</p>
+</div>
+<div style="background-color: white; padding: 15px; border-radius: 8px;">
+<h4 style="color: #333; margin: 0 0 10px 0;">第三步：开始同步</h4>
+<p style="color: #666; margin: 0; font-size: 16px;">
+🔄 点击"同步邮件"按钮，等待同步完成
+</p>
+</div>
+</div>
+"""
+
+_DETAIL_HTML = """
+<div style="background-color: #fff3cd; padding: 20px; border-radius: 8px; border: 2px solid #ffc107; margin-top: 15px;">
+<h4 style="color: #856404; margin: 0 0 15px 0;">🎯 详细操作指导</h4>
+<div style="margin-bottom: 20px;">
+<h5 style="color: #856404; margin: 0 0 10px 0;">📧 邮箱配置步骤：</h5>
+<ol style="color: #856404; margin: 0; padding-left: 20px;">
+<li style="margin-bottom: 5px;">点击页面顶部的"📧 邮件配置"标签</li>
+<li style="margin-bottom: 5px;">填写邮箱服务器信息（IMAP地址、端口、用户名、密码）</li>
+<li style="margin-bottom: 5px;">点击"🔗 测试连接"验证配置</li>
+<li style="margin-bottom: 5px;">连接成功后选择"立即同步邮件"或"直接开始搜索"</li>
+</ol>
+</div>
+<div style="margin-bottom: 20px;">
+<h5 style="color: #856404; margin: 0 0 10px 0;">🔍 搜索模式选择：</h5>
+<ul style="color: #856404; margin: 0; padding-left: 20px;">
+<li style="margin-bottom: 5px;"><strong>实时搜索：</strong>配置完邮箱即可使用，直接查询邮件服务器</li>
+<li style="margin-bottom: 5px;"><strong>智能搜索：</strong>需要先同步邮件，支持AI语义理解和自然语言查询</li>
+</ul>
+</div>
+<div>
+<h5 style="color: #856404; margin: 0 0 10px 0;">⚡ 快速开始建议：</h5>
+<p style="color: #856404; margin: 0;">
+如果您想立即开始搜索，建议先使用<strong>实时搜索</strong>模式。
+如果您有时间等待同步，<strong>智能搜索</strong>将提供更好的搜索体验。
+</p>
+</div>
+</div>
+"""
+
+def _filter_search_results(search_results: List, sender_kw: str, subject_kw: str, has_attachment: bool) -> List:
+    """按已小写化的筛选条件过滤SearchResult列表"""
+    return [
+        r for r in search_results
+        if (not sender_kw or sender_kw in r.sender.lower())
+        and (not subject_kw or subject_kw in r.subject.lower())
+        and (not has_attachment or r.attachments)
+    ]
+
+def _dedupe_results(results: List) -> List:
+    """按邮件UID去重，保留每封邮件首次出现的结果及其顺序（兼容SearchResult对象和字典格式）"""
+    merged = {}
+    for r in results:
+        uid = getattr(r, 'email_id', None) or (r.get('uid') if isinstance(r, dict) else None)
+        merged.setdefault(uid if uid is not None else id(r), r)
+    return list(merged.values())
+
+def _lowered_field(result, name: str) -> str:
+    """获取结果的小写字段，EmailMessage直接使用入库时预先小写化的值"""
+    lowered = getattr(result, f"{name}_lc", None)
+    if lowered is not None:
+        return lowered
+    value = result.get(name) if isinstance(result, dict) else getattr(result, name, None)
+    return (value or '').lower()
 
+def _filter_result_dicts(results: List, sender_kw: str, subject_kw: str, has_attachment: bool) -> List:
+    """按已小写化的筛选条件过滤字典或EmailMessage格式的搜索结果"""
+    return [
+        r for r in results
+        if (not sender_kw or sender_kw in _lowered_field(r, 'sender'))
+        and (not subject_kw or subject_kw in _lowered_field(r, 'subject'))
+        and (not has_attachment or (r.get('attachments') if isinstance(r, dict) else r.attachments))
+    ]
+
+def _result_row(result, source: Optional[str] = None) -> Dict:
+    """将SearchResult转换为展示用的精简字典，不携带正文，source为来源缓存文件（None表示当前邮件数据）"""
+    return {
+        'uid': result.email_id,
+        'subject': result.subject,
+        'sender': result.sender,
+        'date': result.date,
+        'preview': result.preview,
+        'folder': result.folder,
+        'attachments': result.attachments,
+        'score': result.score,
+        'source': source
+    }
+
+def _attach_bodies(results: List) -> List:
+    """导出前按uid从来源缓存回填精简结果的完整正文"""
+    wanted = {}
+    for r in results:
+        if isinstance(r, dict) and 'body_text' not in r:
+            wanted.setdefault(r.get('source'), set()).add(r.get('uid'))
+    if not wanted:
+        return results
+    
+    bodies = {}
+    for source, uids in wanted.items():
+        emails = load_specific_cache(source) if source else st.session_state.get('emails_data', [])
+        for email in emails or []:
+            if email.uid in uids:
+                bodies[(source, email.uid)] = {'body_text': email.body_text, 'body_html': email.body_html}
+    
+    return [
+        {**r, **bodies.get((r.get('source'), r.get('uid')), {})} if isinstance(r, dict) else r
+        for r in results
+    ]
+
+@st.fragment
 @error_handler
 @performance_monitor
 def search_interface(search_config: Dict):
-    """搜索界面"""
+    """搜索界面（fragment：搜索框和筛选项的交互只重新运行本函数）"""
+    # 本次运行内只读取一次session state，后续使用局部变量
+    ss = st.session_state
+    emails_count = len(ss.get('emails_data', []))
+    
+    # 后台索引构建中：仅显示状态，由main()末尾的进度fragment定时检查，完成后整页刷新
+    if poll_index_build():
+        elapsed = time.time() - ss.get('index_started_at', time.time())
+        st.info(f"🔨 正在后台构建搜索索引（{emails_count:,} 封邮件），已用时 {elapsed:.0f} 秒...")
+        return
+    
+    search_engine = ss.get('search_engine')
+    email_connector = ss.get('email_connector')
+    indexed_count = len(search_engine.email_metadata) if search_engine else 0
+    
     # 添加醒目的标题和状态指示
     col1, col2 = st.columns([3, 1])
     with col1:
         st.title("🔍 智能邮件搜索")
     with col2:
         # 显示搜索引擎状态
-        if st.session_state.get('search_engine'):
+        if search_engine:
             st.success("✅ 搜索就绪")
         else:
             st.error("❌ 未就绪")
     
     # 显示邮件统计信息
-    emails_count = len(st.session_state.get('emails_data', []))
-    indexed_count = len(st.session_state.get('search_engine').email_metadata) if st.session_state.get('search_engine') else 0
-    
     col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("📧 已同步邮件", f"{emails_count:,}")
@@ -553,135 +827,50 @@ def search_interface(search_config: Dict):
         st.metric("🔍 已索引邮件", f"{indexed_count:,}")
     with col3:
         if emails_count > 0:
-            coverage = (indexed_count / emails_count * 100) if emails_count > 0 else 0
-            st.metric("📊 索引覆盖率", f"{coverage:.1f}%")
+            # 覆盖率文本仅在邮件数或索引数变化时重新计算
+            metric_key = (emails_count, indexed_count)
+            if ss.get('_metric_key') != metric_key:
+                ss._metric_cov = f"{indexed_count / emails_count * 100:.1f}%"
+                ss._metric_key = metric_key
+            st.metric("📊 索引覆盖率", ss._metric_cov)
     
     st.divider()
     
     # 检查搜索引擎状态
-    if not st.session_state.get('search_engine'):
+    if not search_engine:
         # 如果有邮件数据但没有搜索引擎，自动重建索引
-        if st.session_state.get('emails_data', []):
+        if emails_count:
             st.info("🔄 检测到邮件数据，正在自动初始化搜索引擎...")
             rebuild_search_index()
             st.rerun()
         else:
             st.error("⚠️ 搜索引擎未初始化，请先同步邮件！")
         
-        # 突出显示的引导信息
-        st.markdown("""
-        <div style="background-color: #e3f2fd; padding: 20px; border-radius: 8px; border: 2px solid #2196f3; margin-bottom: 20px;">
-        <h3 style="color: #1976d2; margin: 0 0 15px 0;">🚀 快速开始指南</h3>
-        
-        <div style="display: flex; align-items: center; margin-bottom: 15px;">
-        <div style="background-color: #2196f3; color: white; border-radius: 50%; width: 30px; height: 30px; display: flex; align-items: center; justify-content: center; margin-right: 15px; font-weight: bold;">1</div>
-        <div>
-        <h4 style="color: #333; margin: 0 0 5px 0;">配置邮箱连接</h4>
-        <p style="color: #666; margin: 0; font-size: 16px;">
-        📧 前往"邮件配置"标签页，输入邮箱信息并测试连接
-        </p>
-        </div>
-        </div>
-        
-        <div style="display: flex; align-items: center; margin-bottom: 15px;">
-        <div style="background-color: #4caf50; color: white; border-radius: 50%; width: 30px; height: 30px; display: flex; align-items: center; justify-content: center; margin-right: 15px; font-weight: bold;">2</div>
-        <div>
-        <h4 style="color: #333; margin: 0 0 5px 0;">选择搜索方式</h4>
-        <p style="color: #666; margin: 0; font-size: 16px;">
-        🔍 <strong>实时搜索</strong>：配置完成即可使用，无需等待<br>
-        🧠 <strong>智能搜索</strong>：需要先同步邮件，但搜索更智能
-        </p>
-        </div>
-        </div>
-        
-        <div style="display: flex; align-items: center;">
-        <div style="background-color: #ff9800; color: white; border-radius: 50%; width: 30px; height: 30px; display: flex; align-items: center; justify-content: center; margin-right: 15px; font-weight: bold;">3</div>
-        <div>
-        <h4 style="color: #333; margin: 0 0 5px 0;">开始搜索</h4>
-        <p style="color: #666; margin: 0; font-size: 16px;">
-        ✨ 配置完成后即可开始搜索，或选择同步邮件以获得更好的搜索体验
-        </p>
-        </div>
-        </div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # 显示操作指南
-        st.markdown("""
-        <div style="background-color: #e8f4fd; padding: 20px; border-radius: 10px; border: 2px solid #1f77b4; margin: 20px 0;">
-        <h3 style="color: #1f77b4; margin: 0 0 15px 0;">📋 操作步骤</h3>
-        <div style="background-color: white; padding: 15px; border-radius: 8px; margin-bottom: 15px;">
-        <h4 style="color: #333; margin: 0 0 10px 0;">第一步：切换到邮件管理</h4>
-        <p style="color: #666; margin: 0; font-size: 16px;">
-        👆 点击页面顶部的 <strong style="background-color: #f0f0f0; padding: 2px 6px; border-radius: 4px;">📧 邮件管理</strong> 标签页
-        </p>
-        </div>
-        <div style="background-color: white; padding: 15px; border-radius: 8px; margin-bottom: 15px;">
-        <h4 style="color: #333; margin: 0 0 10px 0;">第二步：配置同步选项</h4>
-        <p style="color: #666; margin: 0; font-size: 16px;">
-        ⚙️ 选择同步数量（建议选择"无限制"）和时间范围
-        </p>
-        </div>
-        <div style="background-color: white; padding: 15px; border-radius: 8px;">
-        <h4 style="color: #333; margin: 0 0 10px 0;">第三步：开始同步</h4>
-        <p style="color: #666; margin: 0; font-size: 16px;">
-        🔄 点击"同步邮件"按钮，等待同步完成
-        </p>
-        </div>
-        </div>
-        """, unsafe_allow_html=True)
+        # 引导信息放在折叠面板中，仅在尚无邮件数据的首次使用时默认展开
+        with st.expander("📋 使用指南", expanded=not emails_count):
+            st.html(_GUIDE_HTML + _STEPS_HTML)
         
         # 简化的操作按钮
         col1, col2 = st.columns(2)
         with col1:
             if st.button("💡 显示详细指导", type="primary", use_container_width=True):
-                st.session_state.show_detailed_guide = True
+                ss.show_detailed_guide = True
                 st.rerun()
         with col2:
             if emails_count > 0:
                 if st.button("🔨 重建搜索索引", type="secondary", use_container_width=True):
-                    if config['app'].get('index_async'):
+                    if load_app_config()['app'].get('index_async'):
                         rebuild_search_index_async()
                     else:
                         rebuild_search_index()
                     st.rerun()
         
         # 显示详细指导
-        if st.session_state.get('show_detailed_guide', False):
-            st.markdown("""
-            <div style="background-color: #fff3cd; padding: 20px; border-radius: 8px; border: 2px solid #ffc107; margin-top: 15px;">
-            <h4 style="color: #856404; margin: 0 0 15px 0;">🎯 详细操作指导</h4>
-            
-            <div style="margin-bottom: 20px;">
-            <h5 style="color: #856404; margin: 0 0 10px 0;">📧 邮箱配置步骤：</h5>
-            <ol style="color: #856404; margin: 0; padding-left: 20px;">
-            <li style="margin-bottom: 5px;">点击页面顶部的"📧 邮件配置"标签</li>
-            <li style="margin-bottom: 5px;">填写邮箱服务器信息（IMAP地址、端口、用户名、密码）</li>
-            <li style="margin-bottom: 5px;">点击"🔗 测试连接"验证配置</li>
-            <li style="margin-bottom: 5px;">连接成功后选择"立即同步邮件"或"直接开始搜索"</li>
-            </ol>
-            </div>
-            
-            <div style="margin-bottom: 20px;">
-            <h5 style="color: #856404; margin: 0 0 10px 0;">🔍 搜索模式选择：</h5>
-            <ul style="color: #856404; margin: 0; padding-left: 20px;">
-            <li style="margin-bottom: 5px;"><strong>实时搜索：</strong>配置完邮箱即可使用，直接查询邮件服务器</li>
-            <li style="margin-bottom: 5px;"><strong>智能搜索：</strong>需要先同步邮件，支持AI语义理解和自然语言查询</li>
-            </ul>
-            </div>
-            
-            <div>
-            <h5 style="color: #856404; margin: 0 0 10px 0;">⚡ 快速开始建议：</h5>
-            <p style="color: #856404; margin: 0;">
-            如果您想立即开始搜索，建议先使用<strong>实时搜索</strong>模式。
-            如果您有时间等待同步，<strong>智能搜索</strong>将提供更好的搜索体验。
-            </p>
-            </div>
-            </div>
-            """, unsafe_allow_html=True)
+        if ss.get('show_detailed_guide', False):
+            st.html(_DETAIL_HTML)
             
             if st.button("✅ 关闭指导", type="secondary"):
-                st.session_state.show_detailed_guide = False
+                ss.show_detailed_guide = False
                 st.rerun()
     else:
         # 搜索引擎已就绪，显示搜索提示
@@ -696,18 +885,18 @@ def search_interface(search_config: Dict):
         search_mode = st.radio(
             "选择搜索模式：",
             options=["智能搜索", "技能匹配搜索", "实时搜索"],
-            index=0 if st.session_state.get('search_engine') else 2,
+            index=0 if search_engine else 2,
             horizontal=True,
             help="智能搜索：基于AI语义理解；技能匹配搜索：双向匹配程序员技能和项目需求；实时搜索：直接查询邮件服务器"
         )
     with col2:
         if search_mode in ["智能搜索", "技能匹配搜索"]:
-            if st.session_state.get('search_engine'):
+            if search_engine:
                 st.success("✅ 可用")
             else:
                 st.error("❌ 需同步")
         else:
-            if st.session_state.get('email_connector'):
+            if email_connector:
                 st.success("✅ 可用")
             else:
                 st.error("❌ 需配置")
@@ -742,21 +931,21 @@ def search_interface(search_config: Dict):
     
     # 根据搜索模式显示不同的提示
     if search_mode == "智能搜索":
-        search_disabled = not st.session_state.get('search_engine')
+        search_disabled = not search_engine
         if search_disabled:
             st.warning("⚠️ 智能搜索需要先同步邮件。您可以切换到实时搜索模式或先同步邮件。")
         else:
             cache_info = "最新缓存" if selected_cache_file is None or selected_cache_file == "最新" else f"历史缓存 ({selected_cache_file})"
             st.info(f"💡 智能搜索支持自然语言查询，当前数据源：{cache_info}\n例如：'昨天的会议邮件'、'包含附件的重要邮件'、'来自客户的报价单'等")
     elif search_mode == "技能匹配搜索":
-        search_disabled = not st.session_state.get('search_engine')
+        search_disabled = not search_engine
         if search_disabled:
             st.warning("⚠️ 技能匹配搜索需要先同步邮件。您可以切换到实时搜索模式或先同步邮件。")
         else:
             cache_info = "最新缓存" if selected_cache_file is None or selected_cache_file == "最新" else f"历史缓存 ({selected_cache_file})"
             st.info(f"🎯 技能匹配搜索支持双向匹配，当前数据源：{cache_info}\n• 输入人员技能 → 匹配项目需求\n• 输入项目需求 → 匹配相关人员\n例如：'4年Java程序员，会Vue3、SpringBoot、MyBatis' 或 '招聘Python开发工程师，要求3年以上经验'")
     else:
-        search_disabled = not st.session_state.get('email_connector')
+        search_disabled = not email_connector
         if search_disabled:
             st.warning("⚠️ 实时搜索需要先配置邮箱连接。")
         else:
@@ -806,13 +995,17 @@ def search_interface(search_config: Dict):
         with col3:
             has_attachment = st.checkbox("包含附件")
     
+    # 筛选关键词只小写化一次，避免在结果循环中重复计算
+    sender_kw = sender_filter.lower() if sender_filter else ""
+    subject_kw = subject_filter.lower() if subject_filter else ""
+    
     # 执行搜索
     if search_button and query:
         if not validate_search_query(query):
             st.error("❌ 请输入有效的搜索内容")
-        elif search_mode in ["智能搜索", "技能匹配搜索"] and not st.session_state.get('search_engine'):
+        elif search_mode in ["智能搜索", "技能匹配搜索"] and not search_engine:
             st.error("❌ 请先同步邮件建立搜索索引")
-        elif search_mode == "实时搜索" and not st.session_state.get('email_connector'):
+        elif search_mode == "实时搜索" and not email_connector:
             st.error("❌ 请先配置邮箱连接")
         else:
             if search_mode == "智能搜索":
@@ -839,59 +1032,34 @@ def search_interface(search_config: Dict):
                             # 构造完整的文件路径
                             cache_filename = f"emails_cache_{date_part}.json"
                             cache_file_path = os.path.join("./cache", cache_filename)
-                            emails = load_emails_from_specific_cache(cache_file_path)
+                            emails = load_specific_cache(cache_file_path)
                             if emails:
-                                # 创建临时的语义搜索引擎实例用于历史缓存
-                                from src.semantic_search import SemanticSearchEngine
-                                temp_search_engine = SemanticSearchEngine()
+                                # 历史缓存的索引持久化为旁路文件，缓存未变化时直接加载
+                                temp_search_engine = get_historical_search_engine(emails, cache_file_path)
                                 
-                                # 使用历史缓存数据构建临时索引
-                                if temp_search_engine.build_index(emails):
+                                if temp_search_engine:
                                     # 使用智能语义搜索
                                     search_results = temp_search_engine.search(query, search_config.get('max_results', 20))
                                     
                                     # 转换为统一格式并应用筛选器
-                                    results = []
-                                    for result in search_results:
-                                        # 应用筛选器
-                                        if sender_filter and sender_filter.lower() not in result.sender.lower():
-                                            continue
-                                        if subject_filter and subject_filter.lower() not in result.subject.lower():
-                                            continue
-                                        if has_attachment and not result.attachments:
-                                            continue
-                                        
-                                        # 转换为统一格式
-                                        results.append({
-                                            'uid': result.email_id,
-                                            'subject': result.subject,
-                                            'sender': result.sender,
-                                            'date': result.date,
-                                            'folder': result.folder,
-                                            'attachments': result.attachments,
-                                            'body_text': result.body_text,
-                                            'score': result.score
-                                        })
+                                    results = [
+                                        _result_row(result, cache_file_path)
+                                        for result in _filter_search_results(search_results, sender_kw, subject_kw, has_attachment)
+                                    ]
                                 else:
                                     # 如果语义搜索失败，降级到关键词搜索
                                     results = search_emails_in_cache(emails, query)
                                     # 应用筛选器
-                                    filtered_results = []
-                                    for result in results:
-                                        if sender_filter and sender_filter.lower() not in result.get('sender', '').lower():
-                                            continue
-                                        if subject_filter and subject_filter.lower() not in result.get('subject', '').lower():
-                                            continue
-                                        if has_attachment and not result.get('attachments'):
-                                            continue
-                                        filtered_results.append(result)
-                                    results = filtered_results
+                                    results = _filter_result_dicts(results, sender_kw, subject_kw, has_attachment)
                                     st.warning("⚠️ 智能搜索引擎初始化失败，已降级到关键词搜索")
                             else:
                                 results = []
                         else:
                             # 使用现有的智能搜索（最新缓存）
-                            results = perform_search(query, search_config, sender_filter, subject_filter, has_attachment)
+                            results = [
+                                _result_row(result)
+                                for result in perform_search(query, search_config, sender_filter, subject_filter, has_attachment)
+                            ]
                     elif search_mode == "技能匹配搜索":
                         # 如果选择了历史缓存文件，先加载该文件的邮件
                         if selected_cache_file and selected_cache_file != "最新":
@@ -903,42 +1071,23 @@ def search_interface(search_config: Dict):
                             # 构造完整的文件路径
                             cache_filename = f"emails_cache_{date_part}.json"
                             cache_file_path = os.path.join("./cache", cache_filename)
-                            emails = load_emails_from_specific_cache(cache_file_path)
+                            emails = load_specific_cache(cache_file_path)
                             if emails:
-                                # 创建临时的语义搜索引擎实例用于历史缓存
-                                from src.semantic_search import SemanticSearchEngine
-                                temp_search_engine = SemanticSearchEngine()
+                                # 历史缓存的索引持久化为旁路文件，缓存未变化时直接加载
+                                temp_search_engine = get_historical_search_engine(emails, cache_file_path)
                                 
                                 # 初始化query_info变量
                                 query_info = None
                                 
-                                # 使用历史缓存数据构建临时索引
-                                if temp_search_engine.build_index(emails):
+                                if temp_search_engine:
                                     # 使用智能技能匹配搜索
                                     search_results, query_info = temp_search_engine.intelligent_skill_search(query, search_config.get('max_results', 20))
                                     
                                     # 转换为统一格式并应用筛选器
-                                    results = []
-                                    for result in search_results:
-                                        # 应用筛选器
-                                        if sender_filter and sender_filter.lower() not in result.sender.lower():
-                                            continue
-                                        if subject_filter and subject_filter.lower() not in result.subject.lower():
-                                            continue
-                                        if has_attachment and not result.attachments:
-                                            continue
-                                        
-                                        # 转换为统一格式
-                                        results.append({
-                                            'uid': result.email_id,
-                                            'subject': result.subject,
-                                            'sender': result.sender,
-                                            'date': result.date,
-                                            'folder': result.folder,
-                                            'attachments': result.attachments,
-                                            'body_text': result.body_text,
-                                            'score': result.score
-                                        })
+                                    results = [
+                                        _result_row(result, cache_file_path)
+                                        for result in _filter_search_results(search_results, sender_kw, subject_kw, has_attachment)
+                                    ]
                                     
                                     # 显示双向匹配信息
                                     if query_info:
@@ -954,45 +1103,19 @@ def search_interface(search_config: Dict):
                                     # 如果语义搜索失败，降级到关键词搜索
                                     results = search_emails_in_cache(emails, query)
                                     # 应用筛选器
-                                    filtered_results = []
-                                    for result in results:
-                                        if sender_filter and sender_filter.lower() not in result.get('sender', '').lower():
-                                            continue
-                                        if subject_filter and subject_filter.lower() not in result.get('subject', '').lower():
-                                            continue
-                                        if has_attachment and not result.get('attachments'):
-                                            continue
-                                        filtered_results.append(result)
-                                    results = filtered_results
+                                    results = _filter_result_dicts(results, sender_kw, subject_kw, has_attachment)
                                     st.warning("⚠️ 智能搜索引擎初始化失败，已降级到关键词搜索")
                             else:
                                 results = []
                         else:
                             # 使用技能匹配搜索（最新缓存）
-                            search_results, query_info = st.session_state.get('search_engine').intelligent_skill_search(query, search_config.get('max_results', 20))
+                            search_results, query_info = search_engine.intelligent_skill_search(query, search_config.get('max_results', 20))
                             
                             # 转换为统一格式并应用筛选器
-                            results = []
-                            for result in search_results:
-                                # 应用筛选器
-                                if sender_filter and sender_filter.lower() not in result.sender.lower():
-                                    continue
-                                if subject_filter and subject_filter.lower() not in result.subject.lower():
-                                    continue
-                                if has_attachment and not result.attachments:
-                                    continue
-                                
-                                results.append({
-                                    'uid': result.email_id,
-                                    'subject': result.subject,
-                                    'sender': result.sender,
-                                    'date': result.date,
-                                    'preview': result.preview,
-                                    'folder': result.folder,
-                                    'attachments': result.attachments,
-                                    'score': result.score,
-                                    'body_text': result.body_text  # 添加完整正文字段
-                                })
+                            results = [
+                                _result_row(result)
+                                for result in _filter_search_results(search_results, sender_kw, subject_kw, has_attachment)
+                            ]
                             
                             # 显示双向匹配信息
                             if isinstance(query_info, dict) and query_info.get('query_type') != 'general':
@@ -1028,51 +1151,48 @@ def search_interface(search_config: Dict):
                                     st.success(f"📅 经验年限：{query_info['experience_years']}年")
                     else:
                         # 使用实时搜索
-                        results = st.session_state.get('email_connector').search_emails_realtime(query)
-                        # 应用筛选器
-                        if sender_filter:
-                            results = [r for r in results if sender_filter.lower() in r.sender.lower()]
-                        if subject_filter:
-                            results = [r for r in results if subject_filter.lower() in r.subject.lower()]
-                        if has_attachment:
-                            results = [r for r in results if r.has_attachment]
+                        results = email_connector.search_emails_realtime(query)
+                        # 应用筛选器（单次遍历，使用预先小写化的字段）
+                        results = _filter_result_dicts(results, sender_kw, subject_kw, has_attachment)
                     
                     search_time = time.time() - start_time
                     
                     # 保存搜索结果到session_state，以便导出时使用
-                    st.session_state.last_search_results = results
-                    st.session_state.last_search_query = query
-                    st.session_state.last_search_time = search_time
+                    ss.last_search_results = results
+                    ss.last_search_query = query
+                    ss.last_search_time = search_time
                     
                     display_search_results(results, query, search_time)
                     
                     # 保存搜索历史
                     save_search_history(query, len(results))
-                    if 'search_history' not in st.session_state:
-                        st.session_state.search_history = []
-                    st.session_state.search_history.append({
+                    if 'search_history' not in ss:
+                        ss.search_history = []
+                    ss.search_history.append({
                         'query': query,
                         'results_count': len(results),
                         'timestamp': datetime.now(),
                         'search_mode': search_mode,
                         'search_time': search_time
                     })
+                    ss._hist_version = ss.get('_hist_version', 0) + 1
                     
                 except Exception as e:
                     st.error(f"❌ 搜索失败: {str(e)}")
-                    st.session_state.error_count = st.session_state.get('error_count', 0) + 1
-                    logger.error(f"Search failed: {str(e)}")
-                    if st.session_state.get('debug_mode', False):
+                    ss.error_count = ss.get('error_count', 0) + 1
+                    logger.error("Search failed: %s", e)
+                    if ss.get('debug_mode', False):
+                        import traceback
                         st.code(traceback.format_exc())
 
     # 页面重新运行（例如点击导出按钮）时，若未点击搜索按钮但已有上次搜索结果，则保持显示
     if not search_button:
-        _prev_results = st.session_state.get('last_search_results', [])
+        _prev_results = ss.get('last_search_results', [])
         if _prev_results:
             display_search_results(
                 _prev_results,
-                st.session_state.get('last_search_query', ''),
-                st.session_state.get('last_search_time', 0.0)
+                ss.get('last_search_query', ''),
+                ss.get('last_search_time', 0.0)
             )
 
 
@@ -1086,138 +1206,207 @@ def perform_search(query: str, search_config: Dict, sender_filter: str = "", sub
     time_range = search_config.get('time_range', '全部')
     folder_filter = search_config.get('folder_filter', ['收件箱'])
     
+    search_engine = st.session_state.get('search_engine')
+    
     # 执行搜索
     if search_mode == "智能搜索":
-        results = st.session_state.get('search_engine').search(
+        # 筛选条件在FAISS检索阶段下推，无需再逐条过滤
+        id_filter = search_engine.filter_ids(sender_filter, subject_filter, has_attachment)
+        return search_engine.search(
             query=query,
-            top_k=max_results
+            top_k=max_results,
+            id_filter=id_filter
         )
     elif search_mode == "关键词搜索":
-        results = st.session_state.get('search_engine').keyword_search(
+        results = search_engine.keyword_search(
             query=query,
             top_k=max_results
         )
     else:  # 混合搜索
-        semantic_results = st.session_state.get('search_engine').search(
-            query=query,
-            top_k=max_results//2
-        )
-        keyword_results = st.session_state.get('search_engine').keyword_search(
+        # 两路各取完整的max_results，再按倒数排名融合
+        results = search_engine.hybrid_search(
             query=query,
-            top_k=max_results//2
+            top_k=max_results
         )
-        # 合并结果并去重
-        seen_ids = set()
-        results = []
-        for result in semantic_results + keyword_results:
-            email_id = result.email_id
-            if email_id not in seen_ids:
-                seen_ids.add(email_id)
-                results.append(result)
-    
-    # 应用额外筛选
-    if sender_filter:
-        results = [r for r in results if sender_filter.lower() in r.sender.lower()]
-    
-    if subject_filter:
-        results = [r for r in results if subject_filter.lower() in r.subject.lower()]
     
-    if has_attachment:
-        results = [r for r in results if len(r.attachments) > 0]
+    # 应用额外筛选（单次遍历）
+    if sender_filter or subject_filter or has_attachment:
+        results = _filter_search_results(
+            results,
+            sender_filter.lower() if sender_filter else "",
+            subject_filter.lower() if subject_filter else "",
+            has_attachment
+        )
     
     return results
 
+def _results_signature(results: List) -> tuple:
+    """搜索结果的轻量签名（来源、UID与分数），用作导出缓存键"""
+    return tuple(
+        (r.get('source'), r.get('uid'), r.get('score')) if isinstance(r, dict)
+        else (None, getattr(r, 'email_id', None) or getattr(r, 'uid', None), getattr(r, 'score', None))
+        for r in results
+    )
+
+def _build_results_xlsx(signature: tuple, results: List) -> bytes:
+    """
+    生成搜索结果的Excel文件，按签名缓存在当前会话中
+    
+    正文取自当前会话的邮件数据，因此不使用跨会话共享的cache_data
+    """
+    ss = st.session_state
+    cached = ss.get('export_xlsx')
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    excel_data = export_emails_to_excel(_attach_bodies(results))
+    ss.export_xlsx = (signature, excel_data)
+    return excel_data
+
+def _prepare_result_rows(results: List, query: str) -> List[Dict]:
+    """
+    将搜索结果转换为展示行（清理HTML、高亮关键词），兼容SearchResult对象和字典格式
+    
+    Args:
+        results: 已去重的搜索结果
+        query: 搜索查询
+        
+    Returns:
+        List[Dict]: 展示行，包含原始主题/发件人/日期、高亮后的主题与预览及元信息
+    """
+    rows = []
+    for i, result in enumerate(results):
+        if hasattr(result, 'subject'):
+            # SearchResult对象格式
+            subject = result.subject
+            sender = result.sender
+            date = result.date
+            preview = result.preview
+            attachments = result.attachments
+            score = result.score
+        else:
+            # 字典格式
+            if not isinstance(result, dict):
+                logger.error("结果 %s 不是字典类型: %s, 值: %s", i, type(result), repr(result)[:200])
+                continue
+            subject = result.get('subject', '无主题')
+            sender = result.get('sender', '未知发件人')
+            date = result.get('date', '未知日期')
+            preview = result.get('preview', '无预览')
+            attachments = result.get('attachments', [])
+            score = result.get('score', 0)
+        
+        # 先清理主题中的HTML标签，避免原始HTML造成删除线
+        if isinstance(subject, str):
+            # 统一进行清理，移除HTML/实体/Unicode删除线
+            subject = clean_html_tags(subject)
+        
+        # 邮件预览
+        if isinstance(preview, str):
+            # 统一进行清理，移除HTML/实体/Unicode删除线
+            preview = clean_html_tags(preview)
+            preview_formatted = preview[:200] + "..." if len(preview) > 200 else preview
+        else:
+            # 如果preview是字典，使用format_email_preview函数
+            preview_formatted = format_email_preview(preview, max_length=200)
+        
+        rows.append({
+            'subject': subject,
+            'sender': sender,
+            'date': date,
+            # 高亮搜索词（使用HTML <mark>）
+            'subject_html': highlight_search_terms(subject, query, highlight_tag="<mark>"),
+            'meta': f"📧 {sender} | 📅 {date}",
+            'preview_html': highlight_search_terms(preview_formatted, query, highlight_tag="<mark>"),
+            'has_attachments': len(attachments) > 0,
+            'score': score
+        })
+    return rows
+
 def display_search_results(results: List, query: str, search_time: float = 0):
-    """显示搜索结果"""
-    # 优先使用session_state中保存的结果，确保页面重新运行时结果不丢失
-    display_results = st.session_state.get('last_search_results', results)
+    """显示搜索结果（results为唯一数据来源）"""
+    if results:
+        results = _dedupe_results(results)
     
-    if not display_results:
+    if not results:
         st.info("🔍 未找到匹配的邮件")
         return
     
-    st.success(f"🎯 找到 {len(display_results)} 封相关邮件 (用时 {search_time:.2f}秒)")
+    st.success(f"🎯 找到 {len(results)} 封相关邮件 (用时 {search_time:.2f}秒)")
     
-    # 导出选项 - 使用session_state中保存的结果
-    export_results = display_results
+    # 导出选项 - 点击后才生成Excel，同一批结果的文件在会话内复用
+    signature = _results_signature(results)
     col1, col2 = st.columns([1, 3])
     with col1:
         try:
-            excel_data = export_emails_to_excel(export_results)
-            st.download_button(
-                label="📋 导出Excel",
-                data=excel_data,
-                file_name=f"search_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+            if st.session_state.get('export_signature') == signature or st.button("📋 导出Excel"):
+                st.session_state.export_signature = signature
+                excel_data = _build_results_xlsx(signature, results)
+                st.download_button(
+                    label="⬇️ 下载Excel",
+                    data=excel_data,
+                    file_name=f"search_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
         except Exception as e:
-            logger.error(f"Excel导出失败: {str(e)}")
+            logger.error("Excel导出失败: %s", e)
             st.error("Excel导出失败")
     
-    # 显示结果
-    for i, result in enumerate(display_results):
-        try:
-            with st.container():
-                col1, col2 = st.columns([3, 1])
-                
-                with col1:
-                    # 兼容处理：支持SearchResult对象和字典格式
-                    if hasattr(result, 'subject'):
-                        # SearchResult对象格式
-                        subject = result.subject
-                        sender = result.sender
-                        date = result.date
-                        preview = result.preview
-                        attachments = result.attachments
-                        score = result.score
-                    else:
-                        # 字典格式
-                        if not isinstance(result, dict):
-                            logger.error(f"结果 {i} 不是字典类型: {type(result)}, 值: {repr(result)[:200]}")
-                            continue
-                        subject = result.get('subject', '无主题')
-                        sender = result.get('sender', '未知发件人')
-                        date = result.get('date', '未知日期')
-                        preview = result.get('preview', '无预览')
-                        attachments = result.get('attachments', [])
-                        score = result.get('score', 0)
-                
-                # 先清理主题中的HTML标签，避免原始HTML造成删除线
-                if isinstance(subject, str):
-                    # 统一进行清理，移除HTML/实体/Unicode删除线
-                    subject = clean_html_tags(subject)
-                # 高亮搜索词（使用HTML <mark>）
-                highlighted_subject = highlight_search_terms(subject, query, highlight_tag="<mark>")
-                st.markdown(f"**{highlighted_subject}**", unsafe_allow_html=True)
-                
-                st.text(f"📧 {sender} | 📅 {date}")
-                
-                # 邮件预览
-                if isinstance(preview, str):
-                    # 统一进行清理，移除HTML/实体/Unicode删除线
-                    preview = clean_html_tags(preview)
-                    preview_formatted = preview[:200] + "..." if len(preview) > 200 else preview
-                else:
-                    # 如果preview是字典，使用format_email_preview函数
-                    preview_formatted = format_email_preview(preview, max_length=200)
-                highlighted_preview = highlight_search_terms(preview_formatted, query, highlight_tag="<mark>")
-                st.markdown(highlighted_preview, unsafe_allow_html=True)
-                
-                # 附件信息
-                if len(attachments) > 0:
-                    st.text("📎 包含附件")
-            
-            with col2:
-                # 相关度分数
-                st.metric("相关度", f"{score:.0%}")
+    # 结果与查询未变化时复用上次准备好的展示行与表格，rerun时只重新输出元素
+    render_key = (signature, query)
+    if st.session_state.get('rendered_rows_key') != render_key:
+        import pandas as pd  # 按需导入，避免拖慢冷启动
+        rows = _prepare_result_rows(results, query)
+        st.session_state.rendered_rows = rows
+        st.session_state.rendered_table = pd.DataFrame({
+            '主题': [row['subject'] for row in rows],
+            '发件人': [row['sender'] for row in rows],
+            '日期': [str(row['date']) for row in rows],
+            '相关度': [row['score'] * 100 for row in rows],
+            '附件': [row['has_attachments'] for row in rows]
+        })
+        st.session_state.rendered_rows_key = render_key
+    rows = st.session_state.rendered_rows
+    
+    # 全部结果以单个表格展示，选中一行后在下方展开高亮详情
+    event = st.dataframe(
+        st.session_state.rendered_table,
+        column_config={
+            '主题': st.column_config.TextColumn(width='large'),
+            '相关度': st.column_config.ProgressColumn(format='%.0f%%', min_value=0, max_value=100),
+            '附件': st.column_config.CheckboxColumn('📎')
+        },
+        hide_index=True,
+        use_container_width=True,
+        on_select='rerun',
+        selection_mode='single-row',
+        key='search_results_table'
+    )
+    
+    selected = event.selection.rows
+    if selected and selected[0] < len(rows):
+        row = rows[selected[0]]
+        with st.expander("📧 邮件详情", expanded=True):
+            st.markdown(f"**{row['subject_html']}**", unsafe_allow_html=True)
+            st.text(row['meta'])
+            st.markdown(row['preview_html'], unsafe_allow_html=True)
             
-            # 替换分隔线为留白，避免视觉上的“删除线”误解
-            st.markdown("<div style='height:12px'></div>", unsafe_allow_html=True)
-        except Exception as e:
-            logger.error(f"显示搜索结果 {i} 时出错: {str(e)}")
-            st.error(f"显示结果时出错: {str(e)}")
+            # 附件信息
+            if row['has_attachments']:
+                st.text("📎 包含附件")
+    else:
+        st.caption("💡 选中表格中的一行查看高亮预览")
+
 
 
+def get_email_columns() -> EmailColumns:
+    """获取当前邮件数据的列式视图，邮件数据未变化时复用上次构建的结果"""
+    ss = st.session_state
+    emails_data = ss.get('emails_data', [])
+    key = (id(emails_data), len(emails_data))
+    if ss.get('email_columns_key') != key:
+        ss.email_columns = EmailColumns.from_emails(emails_data)
+        ss.email_columns_key = key
+    return ss.email_columns
 
 @error_handler
 def email_management_interface():
@@ -1266,11 +1455,11 @@ def email_management_interface():
                                 if emails_data:
                                     source_info = "（从OSS加载）"
                             except Exception as e:
-                                logger.warning(f"从OSS加载失败: {e}")
+                                logger.warning("从OSS加载失败: %s", e)
                         
                         # 如果OSS加载失败，从本地缓存加载
                         if not emails_data:
-                            emails_data = load_emails_from_cache()
+                            emails_data = load_emails_from_cache(cache_dir)
                             source_info = "（从本地缓存加载）"
                         
                         if emails_data:
@@ -1286,7 +1475,7 @@ def email_management_interface():
                     try:
                         # 从选择的文件名中提取实际文件名
                         filename = selected_cache_file.split(" (")[0]
-                        emails_data = load_emails_from_specific_cache(filename)
+                        emails_data = load_specific_cache(filename)
                         if emails_data:
                             st.session_state.emails_data = emails_data
                             st.session_state.current_cache_source = filename
@@ -1371,13 +1560,13 @@ def email_management_interface():
     with col3:
         # 计算今日新增邮件
         today_emails = 0
+        attachment_emails = 0
         if st.session_state.get('emails_data', []):
-            today = datetime.now().date()
-            today_emails = sum(1 for email in st.session_state.get('emails_data', []) 
-                             if email.date and 
-                             isinstance(email.date, datetime) and 
-                             email.date.date() == today)
+            columns = get_email_columns()
+            today_emails = columns.count_on(datetime.now().date())
+            attachment_emails = columns.attachment_count()
         st.metric("今日新增", f"{today_emails:,}")
+        st.caption(f"📎 含附件 {attachment_emails:,} 封")
     
     with col4:
         # 计算存储使用量（估算）
@@ -1389,6 +1578,29 @@ def email_management_interface():
                 storage_usage = round(vector_count * 4 / 1024, 1)  # 转换为MB
         st.metric("存储使用", f"{storage_usage} MB")
 
+# 并发同步的文件夹数量上限（每个文件夹占用一个IMAP连接）
+SYNC_MAX_WORKERS = 8
+
+# 进度刷新的最小间隔（秒），每次刷新都是一条WebSocket消息，限制在20Hz以内
+PROGRESS_UPDATE_INTERVAL = 0.05
+
+def _fetch_folder_worker(email_config: Dict, folder: str, limit: Optional[int],
+                         days_back: Optional[int]) -> List:
+    """
+    在线程池中同步单个文件夹（使用独立连接，不得调用任何st.*接口）
+    
+    Args:
+        email_config: 邮箱配置
+        folder: 文件夹名称
+        limit: 邮件数量限制，None表示无限制
+        days_back: 时间范围（天），None表示全部
+        
+    Returns:
+        List: 该文件夹的邮件列表
+    """
+    with EmailConnector(email_config) as connector:
+        return connector.get_emails(folder=folder, limit=limit, days_back=days_back)
+
 @error_handler
 @performance_monitor
 def sync_emails(limit=10000, days_back=365, include_sent=True):
@@ -1415,26 +1627,44 @@ def sync_emails(limit=10000, days_back=365, include_sent=True):
                    f"时间范围 {'全部邮件' if days_back == -1 else f'最近 {days_back} 天'}, "
                    f"文件夹数量 {len(folders)} 个")
             
-            for i, folder in enumerate(folders):
-                st.text(f"正在同步文件夹: {folder}")
-                
-                # 设置实际的限制参数
-                actual_limit = None if limit == -1 else limit
-                actual_days_back = None if days_back == -1 else days_back
-                
-                emails = st.session_state.get('email_connector').get_emails(
-                    folder=folder,
-                    limit=actual_limit,
-                    days_back=actual_days_back
-                )
-                all_emails.extend(emails)
-                progress_bar.progress((i + 1) / len(folders))
-                
-                # 显示当前文件夹的邮件数量
-                st.text(f"  └─ 获取到 {len(emails)} 封邮件")
+            # 设置实际的限制参数
+            actual_limit = None if limit == -1 else limit
+            actual_days_back = None if days_back == -1 else days_back
+            
+            # 各文件夹并发同步，每个线程使用独立的IMAP连接（imaplib连接非线程安全）
+            email_config = st.session_state.get('email_connector').config
+            folder_emails = {}
+            if folders:
+                # 各文件夹结果汇总到同一占位元素，按间隔节流刷新
+                status_area = st.empty()
+                status_lines = []
+                last_update = 0.0
+                with ThreadPoolExecutor(max_workers=min(SYNC_MAX_WORKERS, len(folders)),
+                                        thread_name_prefix="folder-sync") as executor:
+                    futures = {
+                        executor.submit(_fetch_folder_worker, email_config, folder, actual_limit, actual_days_back): folder
+                        for folder in folders
+                    }
+                    for i, future in enumerate(as_completed(futures)):
+                        folder = futures[future]
+                        folder_emails[folder] = future.result()
+                        
+                        # 显示当前文件夹的邮件数量
+                        status_lines.append(f"✅ {folder} └─ 获取到 {len(folder_emails[folder])} 封邮件")
+                        now = time.time()
+                        if now - last_update > PROGRESS_UPDATE_INTERVAL or i + 1 == len(folders):
+                            progress_bar.progress((i + 1) / len(folders))
+                            status_area.text("\n".join(status_lines))
+                            last_update = now
+            
+            # 按文件夹原有顺序合并结果
+            for folder in folders:
+                all_emails.extend(folder_emails.get(folder, []))
             
             st.session_state.emails_data = all_emails
             st.session_state.last_sync_time = datetime.now()
+            # 同步完成时即构建列式统计数据，统计面板无需再遍历邮件
+            get_email_columns()
             
             # 保存邮件数据
             storage_success = False
@@ -1446,18 +1676,18 @@ def sync_emails(limit=10000, days_back=365, include_sent=True):
                     st.info(f"☁️ 邮件数据已保存到阿里云OSS")
                     storage_success = True
                 except Exception as e:
-                    logger.warning(f"保存邮件数据到OSS失败: {str(e)}")
+                    logger.warning("保存邮件数据到OSS失败: %s", e)
                     st.warning(f"⚠️ OSS保存失败: {str(e)}")
             
             # 同时保存到本地缓存作为备份
             try:
-                save_emails_to_cache(all_emails)
+                save_emails_to_cache(all_emails, cache_dir)
                 if not storage_success:
                     st.info(f"📁 邮件数据已保存到本地缓存")
                 else:
                     st.info(f"📁 邮件数据已同步到本地缓存（备份）")
             except Exception as e:
-                logger.warning(f"保存邮件数据到本地缓存失败: {str(e)}")
+                logger.warning("保存邮件数据到本地缓存失败: %s", e)
                 if storage_success:
                     st.warning(f"⚠️ 本地缓存保存失败: {str(e)}")
             
@@ -1468,7 +1698,7 @@ def sync_emails(limit=10000, days_back=365, include_sent=True):
                 st.success(f"✅ 成功同步 {len(all_emails)} 封邮件")
             else:
                 st.error(f"❌ 邮件同步完成但存储失败，请检查OSS配置")
-            logger.info(f"Synced {len(all_emails)} emails")
+            logger.info("Synced %s emails", len(all_emails))
             
             # 自动重建搜索索引
             rebuild_search_index()
@@ -1476,34 +1706,198 @@ def sync_emails(limit=10000, days_back=365, include_sent=True):
         except Exception as e:
             st.error(f"❌ 同步失败: {str(e)}")
             st.session_state.error_count = st.session_state.get('error_count', 0) + 1
-            logger.error(f"Email sync failed: {str(e)}")
+            logger.error("Email sync failed: %s", e)
+
+# 索引构建线程池（进程内共享，单线程避免多个构建任务争抢CPU）
+@st.cache_resource
+def _get_index_executor() -> ThreadPoolExecutor:
+    """获取后台索引构建线程池"""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="index-build")
+
+def _search_engine_kwargs() -> Dict:
+    """根据应用配置生成搜索引擎构造参数（需在脚本线程中调用）"""
+    ai_config = load_app_config()['ai']
+    return {
+        'model_name': ai_config.get('model_name', 'all-MiniLM-L6-v2'),
+        'embedding_cache_path': os.path.join(cache_dir, 'embeddings.sqlite3'),
+        'encode_batch_size': ai_config.get('encode_batch_size', 256),
+        'quantize': ai_config.get('quantize', False),
+        'backend': ai_config.get('backend', 'torch'),
+        'onnx_cache_dir': os.path.join(cache_dir, 'onnx')
+    }
+
+def _emails_fingerprint(emails: List) -> str:
+    """邮件数据指纹（按UID顺序），用于判断旁路索引是否与当前邮件数据一致（兼容EmailMessage与字典）"""
+    digest = hashlib.blake2b(digest_size=16)
+    for email in emails:
+        uid = email.get('uid') if isinstance(email, dict) else email.uid
+        digest.update(f"{uid}\n".encode('utf-8'))
+    return f"{len(emails)}:{digest.hexdigest()}"
+
+def _latest_index_path() -> str:
+    """当前邮件数据对应的旁路索引路径"""
+    return os.path.join(cache_dir, 'indices', 'latest_emails_cache')
+
+def save_latest_index(search_engine: SemanticSearchEngine, emails: List):
+    """
+    将当前邮件数据的索引保存为旁路文件（可在后台线程中调用，不使用st.*接口）
+    
+    Args:
+        search_engine: 构建完成的搜索引擎
+        emails: 建索引所用的邮件数据
+    """
+    if search_engine.index is not None:
+        search_engine.save_index(_latest_index_path(), {'fingerprint': _emails_fingerprint(emails)})
+
+def load_latest_index(emails: List) -> Optional[SemanticSearchEngine]:
+    """
+    加载与当前邮件数据一致的旁路索引（只读内存映射），避免每个会话重建索引
+    
+    Args:
+        emails: 当前邮件数据
+        
+    Returns:
+        Optional[SemanticSearchEngine]: 搜索引擎，旁路索引不存在或已过期时返回None
+    """
+    engine_kwargs = _search_engine_kwargs()
+    index_path = _latest_index_path()
+    try:
+        with open(f"{index_path}.config", 'r', encoding='utf-8') as f:
+            index_config = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if (index_config.get('model_name') != engine_kwargs['model_name']
+            or index_config.get('fingerprint') != _emails_fingerprint(emails)):
+        return None
+    
+    search_engine = SemanticSearchEngine(**engine_kwargs)
+    if not search_engine.load_index(index_path, mmap=True):
+        return None
+    return search_engine
+
+def _build_index_worker(emails_data: List, engine_kwargs: Dict) -> SemanticSearchEngine:
+    """
+    后台线程中构建搜索索引并保存旁路文件（不得调用任何st.*接口）
+    
+    Args:
+        emails_data: 邮件数据快照
+        engine_kwargs: 搜索引擎构造参数
+        
+    Returns:
+        SemanticSearchEngine: 构建完成的搜索引擎
+    """
+    search_engine = SemanticSearchEngine(**engine_kwargs)
+    search_engine.build_index(emails_data)
+    logger.info("Search index rebuilt with %s emails", len(emails_data))
+    save_latest_index(search_engine, emails_data)
+    return search_engine
+
+def get_historical_search_engine(emails: List, cache_file_path: str) -> Optional[SemanticSearchEngine]:
+    """
+    获取历史缓存文件对应的搜索引擎，索引以旁路文件形式保存在缓存目录的indices下
+    
+    Args:
+        emails: 历史缓存中的邮件数据
+        cache_file_path: 历史缓存文件路径
+        
+    Returns:
+        Optional[SemanticSearchEngine]: 搜索引擎，构建失败时返回None
+    """
+    engine_kwargs = _search_engine_kwargs()
+    search_engine = SemanticSearchEngine(**engine_kwargs)
+    cache_name = os.path.splitext(os.path.basename(cache_file_path))[0]
+    index_path = os.path.join(cache_dir, 'indices', cache_name)
+    
+    # 旁路索引（配置文件最后写入）比缓存文件新且模型一致时直接加载
+    try:
+        with open(f"{index_path}.config", 'r', encoding='utf-8') as f:
+            index_config = json.load(f)
+        is_fresh = (
+            index_config.get('model_name') == engine_kwargs['model_name']
+            and os.path.getmtime(f"{index_path}.config") >= os.path.getmtime(cache_file_path)
+        )
+    except (OSError, ValueError):
+        is_fresh = False
+    
+    if is_fresh and search_engine.load_index(index_path, mmap=True):
+        return search_engine
+    
+    if not search_engine.build_index(emails):
+        return None
+    if search_engine.index is not None:
+        search_engine.save_index(index_path)
+    return search_engine
+
+def poll_index_build() -> bool:
+    """
+    检查后台索引构建任务，完成后写回session state
+    
+    Returns:
+        bool: 构建任务仍在进行中返回True
+    """
+    ss = st.session_state
+    future = ss.get('index_future')
+    if future is None:
+        return False
+    if not future.done():
+        return True
+    
+    ss.index_future = None
+    try:
+        search_engine = future.result()
+        ss.search_engine = search_engine
+        st.success(f"✅ 搜索索引重建完成，包含 {len(search_engine.email_metadata)} 封邮件")
+    except Exception as e:
+        st.error(f"❌ 索引重建失败: {str(e)}")
+        ss.error_count = ss.get('error_count', 0) + 1
+        logger.error("Index rebuild failed: %s", e)
+    
+    # 构建期间邮件数据已被替换（如重新同步），按最新数据再构建一次
+    emails_data = ss.get('emails_data', [])
+    if emails_data and _emails_fingerprint(emails_data) != ss.get('index_build_fingerprint'):
+        _submit_index_build(emails_data)
+        st.info(f"🔨 邮件数据已更新，重新在后台构建搜索索引（{len(emails_data)} 封邮件）")
+        return True
+    return False
+
+@st.fragment(run_every=0.5)
+def _index_build_progress():
+    """后台索引构建进度（fragment定时只重新运行本函数），构建结束后整页rerun一次以使用新索引"""
+    if st.session_state.get('index_future') is None:
+        return
+    if poll_index_build():
+        elapsed = time.time() - st.session_state.get('index_started_at', time.time())
+        st.caption(f"🔨 搜索索引后台构建中，已用时 {elapsed:.0f} 秒...")
+        return
+    st.rerun()
+
+def _submit_index_build(emails_data: List):
+    """提交后台索引构建任务，并记录所用邮件快照的指纹"""
+    ss = st.session_state
+    snapshot = list(emails_data)
+    ss.index_build_fingerprint = _emails_fingerprint(snapshot)
+    ss.index_future = _get_index_executor().submit(_build_index_worker, snapshot, _search_engine_kwargs())
+    ss.index_started_at = time.time()
 
 @error_handler
 @performance_monitor
 def rebuild_search_index():
-    """重建搜索索引"""
-    if not st.session_state.get('emails_data', []):
+    """重建搜索索引（提交到后台线程，由poll_index_build回收结果）"""
+    ss = st.session_state
+    emails_data = ss.get('emails_data', [])
+    if not emails_data:
         st.error("❌ 没有邮件数据，请先同步邮件")
         return
     
-    with st.spinner("正在重建搜索索引..."):
-        try:
-            # 初始化搜索引擎
-            model_name = config['ai'].get('model_name', 'all-MiniLM-L6-v2')
-            search_engine = SemanticSearchEngine(model_name=model_name)
-            
-            # 构建索引
-            emails_data = st.session_state.get('emails_data', [])
-            search_engine.build_index(emails_data)
-            st.session_state.search_engine = search_engine
-            
-            st.success(f"✅ 搜索索引重建完成，包含 {len(emails_data)} 封邮件")
-            logger.info(f"Search index rebuilt with {len(emails_data)} emails")
-            
-        except Exception as e:
-            st.error(f"❌ 索引重建失败: {str(e)}")
-            st.session_state.error_count = st.session_state.get('error_count', 0) + 1
-            logger.error(f"Index rebuild failed: {str(e)}")
+    future = ss.get('index_future')
+    if future is not None and not future.done():
+        # 当前任务完成后poll_index_build会发现数据指纹变化并重新构建
+        st.info("⏳ 搜索索引正在后台构建中，完成后将按最新邮件数据重新构建...")
+        return
+    
+    _submit_index_build(emails_data)
+    st.info(f"🔨 已开始在后台构建搜索索引（{len(emails_data)} 封邮件）")
 
 @error_handler
 @performance_monitor
@@ -1513,8 +1907,9 @@ def rebuild_search_index_async():
         st.error("❌ 没有邮件数据，请先同步邮件")
         return
 
-    batch_size = int(config['app'].get('index_batch_size', 500))
-    time_budget = int(config['app'].get('index_time_slice_sec', 20))
+    app_config = load_app_config()
+    batch_size = int(app_config['app'].get('index_batch_size', 500))
+    time_budget = int(app_config['app'].get('index_time_slice_sec', 20))
     start_time = time.time()
 
     # 初始化或继续进度
@@ -1523,58 +1918,54 @@ def rebuild_search_index_async():
     total = len(emails_data)
 
     if not st.session_state.get('search_engine') or progress == 0:
-        model_name = config['ai'].get('model_name', 'all-MiniLM-L6-v2')
-        st.session_state.search_engine = SemanticSearchEngine(model_name=model_name)
+        st.session_state.search_engine = SemanticSearchEngine(**_search_engine_kwargs())
         # 预加载元数据，保证关键词搜索可用
         try:
             st.session_state.search_engine.build_index([])  # 初始化模型
         except Exception:
             pass
         # 手动准备元数据
-        metadata = []
-        for email in emails_data:
-            metadata.append({
-                'uid': email.uid,
-                'subject': email.subject,
-                'sender': email.sender,
-                'date': email.date,
-                'folder': email.folder,
-                'attachments': email.attachments,
-                'body_text': email.body_text,
-                'body_html': email.body_html
-            })
-        st.session_state.get('search_engine').email_metadata = metadata
+        engine = st.session_state.get('search_engine')
+        engine.email_metadata = [engine.metadata_entry(email) for email in emails_data]
+        engine.build_meta_frame()
         st.session_state.index_progress = 0
 
     engine = st.session_state.get('search_engine')
 
     # 分批处理直到耗尽时间预算
     processed = progress
+    progress_bar = st.progress(processed / total if total else 0)
+    last_update = 0.0
     with st.spinner("分批构建索引中..."):
         while processed < total:
             if time.time() - start_time >= time_budget:
                 break
             batch_end = min(processed + batch_size, total)
-            # 准备文本
-            texts = []
-            for email in emails_data[processed:batch_end]:
-                combined_text = engine._prepare_email_text(email)
-                texts.append(combined_text)
+            # 准备文本（长正文切分为多个重叠块，owners记录每块所属邮件行号）
+            texts, owners = engine.chunk_emails(emails_data[processed:batch_end], offset=processed)
             if not texts:
                 break
             # 生成向量并添加到索引
-            embeddings = engine.model.encode(texts, show_progress_bar=False)
-            import faiss
-            faiss.normalize_L2(embeddings)
+            # encode_texts返回已L2标准化的向量，无需再次标准化
+            embeddings = engine.encode_texts(texts)
             if engine.index is None:
+                # 分批构建时无法一次性训练IVF-PQ，按总量在精确检索和HNSW之间选择
                 dimension = embeddings.shape[1]
-                engine.index = faiss.IndexFlatIP(dimension)
-            engine.index.add(embeddings.astype('float32'))
+                engine.index = create_faiss_index(dimension, total)
+            engine.add_chunk_vectors(embeddings, owners)
             processed = batch_end
             st.session_state.index_progress = processed
+            
+            # 节流刷新进度条，避免每批都向浏览器推送消息
+            now = time.time()
+            if now - last_update > PROGRESS_UPDATE_INTERVAL or processed >= total:
+                progress_bar.progress(processed / total)
+                last_update = now
 
     # 完成与提示
     if processed >= total:
+        if progress < total:
+            save_latest_index(engine, emails_data)
         st.success(f"✅ 索引构建完成，共 {total} 封邮件")
     else:
         remaining = total - processed
@@ -1589,41 +1980,10 @@ def cleanup_cache():
         logger.info("Cache cleanup completed")
     except Exception as e:
         st.error(f"❌ 缓存清理失败: {str(e)}")
-        logger.error(f"Cache cleanup failed: {str(e)}")
+        logger.error("Cache cleanup failed: %s", e)
 
-def statistics_interface():
-    """统计分析界面"""
-    st.header("📊 统计分析")
-    
-    # 搜索历史
-    st.markdown("### 🔍 搜索历史")
-    if st.session_state.get('search_history', []):
-        history_df = pd.DataFrame(st.session_state.get('search_history', []))
-        st.dataframe(history_df, use_container_width=True)
-        
-        # 搜索统计
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("总搜索次数", len(st.session_state.get('search_history', [])))
-        with col2:
-            avg_results = history_df['results_count'].mean() if not history_df.empty else 0
-            st.metric("平均结果数", f"{avg_results:.1f}")
-        with col3:
-            avg_time = history_df['search_time'].mean() if not history_df.empty else 0
-            st.metric("平均搜索时间", f"{avg_time:.2f}s")
-    else:
-        st.info("暂无搜索历史")
-    
-    # 性能统计
-    st.markdown("### ⚡ 性能统计")
-    if st.session_state.get('performance_stats'):
-        st.json(st.session_state.get('performance_stats'))
-    else:
-        st.info("暂无性能数据")
-    
-    # 使用提示
-    st.markdown("### 💡 使用提示")
-    st.markdown("""
+# 统计页使用提示（模块级常量，rerun时不再重新分配）
+_USAGE_TIPS_MD: Final[str] = """
     **智能搜索技巧：**
     - 使用自然语言描述：如"上周的会议邮件"
     - 结合时间和人员：如"张三昨天发的报告"
@@ -1640,11 +2000,111 @@ def statistics_interface():
     - 搜索结果最多显示100条
     - 支持常见邮箱服务商
     - 单次同步限制1000封邮件/文件夹
-    """)
+    """
 
-def display_welcome_page():
-    """显示欢迎页面"""
-    st.markdown("""
+@st.cache_data(ttl=300, show_spinner=False)
+def _history_stats(history: tuple) -> tuple:
+    """
+    计算搜索历史的聚合指标（history为可哈希的元组，作为缓存键）
+    
+    Args:
+        history: (结果数, 搜索耗时)元组组成的元组
+    
+    Returns:
+        tuple: (平均结果数, 平均搜索时间, 搜索次数)
+    """
+    if not history:
+        return 0.0, 0.0, 0
+    # 历史记录规模很小，直接对原始数值求均值，无需构建DataFrame
+    avg_results = fmean(results_count for results_count, _ in history)
+    avg_time = fmean(search_time for _, search_time in history)
+    return avg_results, avg_time, len(history)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _history_df(records: tuple):
+    """
+    构建搜索历史表格（records为可哈希的元组，作为缓存键）
+    
+    Args:
+        records: 每条历史记录的(字段, 值)元组组成的元组
+    
+    Returns:
+        pd.DataFrame: 搜索历史表格
+    """
+    import pandas as pd  # 按需导入，避免拖慢冷启动
+    return pd.DataFrame([dict(record) for record in records])
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _stats_df(items: tuple):
+    """
+    构建性能统计表格（items为排序后的(指标, 值)元组，作为缓存键）
+    
+    Args:
+        items: (指标, 值)元组组成的元组
+    
+    Returns:
+        pd.DataFrame: 两列的性能统计表格
+    """
+    import pandas as pd  # 按需导入，避免拖慢冷启动
+    return pd.DataFrame(items, columns=['metric', 'value'])
+
+def _history_metrics(avg_results: float, avg_time: float, search_count: int):
+    """在一组列中输出搜索统计指标"""
+    cols = st.columns(3)
+    cols[0].metric("总搜索次数", search_count)
+    cols[1].metric("平均结果数", f"{avg_results:.1f}")
+    cols[2].metric("平均搜索时间", f"{avg_time:.2f}s")
+
+def _render_search_history():
+    """显示搜索历史表格与统计（无历史时在任何pandas操作之前直接返回）"""
+    ss = st.session_state
+    history = ss.get('search_history', [])
+    if not history:
+        st.info("暂无搜索历史")
+        return
+    
+    # 历史版本未变化时复用上次构建的表格与统计，避免每次rerun重建DataFrame
+    hist_version = ss.get('_hist_version', 0)
+    if ss.get('_hist_stats_version') != hist_version or 'history_df' not in ss:
+        ss.history_df = _history_df(tuple(tuple(record.items()) for record in history))
+        ss.history_stats = _history_stats(tuple(
+            (record.get('results_count', 0), record.get('search_time', 0))
+            for record in history
+        ))
+        ss._hist_stats_version = hist_version
+    st.dataframe(ss.history_df, use_container_width=True)
+    
+    # 搜索统计
+    _history_metrics(*ss.history_stats)
+
+@st.fragment
+def statistics_interface():
+    """统计分析界面（fragment：本页交互不触发整页rerun）"""
+    st.header("📊 统计分析")
+    
+    # 搜索历史
+    st.markdown("### 🔍 搜索历史")
+    _render_search_history()
+    
+    # 性能统计
+    st.markdown("### ⚡ 性能统计")
+    performance_stats = st.session_state.get('performance_stats')
+    if performance_stats:
+        # 值统一转为字符串，保证可哈希且Arrow列类型一致
+        st.dataframe(
+            _stats_df(tuple(sorted((str(k), str(v)) for k, v in performance_stats.items()))),
+            hide_index=True,
+            use_container_width=True
+        )
+    else:
+        st.info("暂无性能数据")
+    
+    # 使用提示
+    st.markdown("### 💡 使用提示")
+    st.markdown(_USAGE_TIPS_MD)
+
+# 欢迎页文案
+_WELCOME_MD: Final[str] = """
     ## 👋 欢迎使用智能邮件搜索工具
     
     这是一个基于AI的邮件语义搜索系统，帮助您快速找到需要的邮件。
@@ -1667,13 +2127,38 @@ def display_welcome_page():
     - 邮件数据仅在本地处理
     - 支持SSL/TLS加密连接
     - 不存储邮箱密码
-    """)
+    """
+
+def display_welcome_page():
+    """显示欢迎页面"""
+    st.markdown(_WELCOME_MD)
+
+# 跳转到邮件管理页的导航提示
+_NAV_HINT_HTML: Final[str] = """
+        <div style="background-color: #d1ecf1; padding: 15px; border-radius: 8px; border: 2px solid #17a2b8; margin-bottom: 15px; text-align: center; animation: pulse 2s infinite;">
+        <h3 style="color: #0c5460; margin: 0 0 10px 0;">👇 请点击下方的 "📧 邮件管理" 标签页 👇</h3>
+        <p style="color: #0c5460; margin: 0; font-size: 16px; font-weight: bold;">在那里您可以配置同步选项并开始同步邮件</p>
+        </div>
+        """
 
 def main():
     """主应用函数"""
     # 调试：检查session_state状态
-    logger.info(f"主函数开始执行，show_email_details: {st.session_state.get('show_email_details', False)}")
-    logger.info(f"主函数开始执行，selected_email存在: {st.session_state.get('selected_email') is not None}")
+    logger.info("主函数开始执行，show_email_details: %s", st.session_state.get('show_email_details', False))
+    logger.info("主函数开始执行，selected_email存在: %s", st.session_state.get('selected_email') is not None)
+    
+    # 每个会话首次运行时，若有与邮件数据一致的旁路索引则直接加载，无需重建
+    ss = st.session_state
+    if not ss.get('latest_index_checked') and ss.get('emails_data') and not ss.get('search_engine'):
+        ss.latest_index_checked = True
+        try:
+            latest_engine = load_latest_index(ss.emails_data)
+        except Exception as e:
+            logger.warning("加载旁路索引失败: %s", e)
+            latest_engine = None
+        if latest_engine:
+            ss.search_engine = latest_engine
+            logger.info("从旁路文件加载了搜索索引")
     
     st.title("📧 智能邮件搜索工具")
     st.markdown("基于AI的语义搜索，快速找到您需要的邮件")
@@ -1696,19 +2181,7 @@ def main():
     
     # 显示导航提示（如果需要）
     if st.session_state.get('show_detailed_guide', False):
-        st.markdown("""
-        <div style="background-color: #d1ecf1; padding: 15px; border-radius: 8px; border: 2px solid #17a2b8; margin-bottom: 15px; text-align: center; animation: pulse 2s infinite;">
-        <h3 style="color: #0c5460; margin: 0 0 10px 0;">👇 请点击下方的 "📧 邮件管理" 标签页 👇</h3>
-        <p style="color: #0c5460; margin: 0; font-size: 16px; font-weight: bold;">在那里您可以配置同步选项并开始同步邮件</p>
-        </div>
-        <style>
-        @keyframes pulse {
-            0% { transform: scale(1); }
-            50% { transform: scale(1.02); }
-            100% { transform: scale(1); }
-        }
-        </style>
-        """, unsafe_allow_html=True)
+        st.markdown(_NAV_HINT_HTML, unsafe_allow_html=True)
     
 
     
@@ -1732,6 +2205,10 @@ def main():
     # 页脚（移除对第三方平台的显式文案）
     # 保留分隔线以视觉收尾
     st.markdown("---")
+    
+    # 后台索引构建未完成时只定时刷新进度元素，完成后整页刷新一次
+    if st.session_state.get('index_future') is not None:
+        _index_build_progress()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
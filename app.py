@@ -8,7 +8,9 @@ import sys
 
 # 添加项目根目录到Python路径
 project_root = os.path.dirname(__file__)
-sys.path.insert(0, project_root)
+# 避免每次rerun重复插入同一路径
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 # 导入主应用模块
 try:
@@ -19,9 +21,5 @@ except ImportError as e:
     st.error("请确保所有依赖都已正确安装")
     st.stop()
 
-# 调用主函数
-if __name__ == "__main__":
-    main()
-else:
-    # 当作为模块导入时也运行主函数
-    main()
\ No newline at end of file
+# 调用主函数（直接运行或作为模块导入时均执行）
+main()
\ No newline at end of file
@@ -1,6 +1,7 @@
 """智能邮件搜索工具 - 测试版本"""
 
 import streamlit as st
+import pandas as pd
 import os
 import sys
 
@@ -77,14 +78,12 @@ with tab1:
     
     # 搜索结果
     if search_button and search_query:
-        st.markdown("### 搜索结果")
-        
         # 模拟搜索结果
         with st.container():
             st.info("🔍 正在搜索中...")
             
-            # 模拟结果
-            results = [
+            # 模拟结果（保存到session state，选中行触发rerun后仍可显示）
+            st.session_state.test_results = [
                 {
                     "subject": "关于项目报价的邮件",
                     "sender": "client@example.com",
@@ -100,19 +99,34 @@ with tab1:
                     "relevance": 0.87
                 }
             ]
-            
-            for i, result in enumerate(results):
-                with st.container():
-                    col1, col2 = st.columns([3, 1])
-                    with col1:
-                        st.markdown(f"**{result['subject']}**")
-                        st.text(f"发件人: {result['sender']} | 日期: {result['date']}")
-                        st.text(result['preview'])
-                    with col2:
-                        st.metric("相关度", f"{result['relevance']:.0%}")
-                        if st.button(f"查看详情", key=f"view_{i}"):
-                            st.info("邮件详情功能开发中...")
-                    st.markdown("---")
+    
+    results = st.session_state.get('test_results')
+    if results:
+        st.markdown("### 搜索结果")
+        
+        # 全部结果以单个表格展示，选中一行查看详情
+        event = st.dataframe(
+            pd.DataFrame(results),
+            column_config={
+                'subject': st.column_config.TextColumn("主题", width='large'),
+                'sender': "发件人",
+                'date': "日期",
+                'preview': "预览",
+                'relevance': st.column_config.ProgressColumn("相关度", min_value=0, max_value=1)
+            },
+            hide_index=True,
+            use_container_width=True,
+            on_select="rerun",
+            selection_mode="single-row"
+        )
+        
+        selected = event.selection.rows
+        if selected:
+            result = results[selected[0]]
+            with st.expander(f"📧 {result['subject']}", expanded=True):
+                st.text(f"发件人: {result['sender']} | 日期: {result['date']}")
+                st.text(result['preview'])
+                st.info("邮件详情功能开发中...")
 
 with tab2:
     st.header("邮件管理")
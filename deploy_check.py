@@ -8,6 +8,7 @@ import os
 import sys
 import json
 import importlib
+from collections import defaultdict
 from pathlib import Path
 
 def check_python_version():
@@ -23,11 +24,29 @@ def check_python_version():
         print("   ❌ Python版本不兼容，需要Python 3.8+")
         return False
 
+def _try_import(package):
+    """实际导入依赖包，返回(包名, 是否可用)
+    
+    部署检查需要发现安装损坏的包（元数据在但导入失败），所以真正执行导入而不是只查找模块规格。
+    """
+    # 特殊处理一些包名映射
+    import_name = package
+    if package == 'faiss-cpu':
+        import_name = 'faiss'
+    elif package == 'python-dotenv':
+        import_name = 'dotenv'
+    
+    try:
+        importlib.import_module(import_name)
+        return package, True
+    except Exception:
+        return package, False
+
 def check_dependencies():
     """检查依赖包"""
     print("\n📦 检查依赖包...")
     
-    required_packages = [
+    required_packages = (
         'streamlit',
         'sentence_transformers',
         'faiss-cpu',
@@ -38,23 +57,16 @@ def check_dependencies():
         'python-dotenv',
         'tqdm',
         'requests'
-    ]
+    )
     
     missing_packages = []
     
     for package in required_packages:
-        try:
-            # 特殊处理一些包名映射
-            import_name = package
-            if package == 'faiss-cpu':
-                import_name = 'faiss'
-            elif package == 'python-dotenv':
-                import_name = 'dotenv'
-            
-            importlib.import_module(import_name)
+        package, ok = _try_import(package)
+        if ok:
             print(f"   ✅ {package}")
-        except ImportError:
-            print(f"   ❌ {package} - 未安装")
+        else:
+            print(f"   ❌ {package} - 未安装或导入失败")
             missing_packages.append(package)
     
     if missing_packages:
@@ -78,7 +90,7 @@ def check_vercel_config():
             config = json.load(f)
         
         # 检查必要的配置项
-        required_keys = ['version', 'builds', 'routes']
+        required_keys = ('version', 'builds', 'routes')
         for key in required_keys:
             if key not in config:
                 print(f"   ❌ 缺少配置项: {key}")
@@ -120,23 +132,27 @@ def check_environment_variables():
         return False
     
     try:
-        with open(env_example_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
         # 检查必要的环境变量
-        required_vars = [
+        required_vars = (
             'OSS_ACCESS_KEY_ID',
             'OSS_ACCESS_KEY_SECRET',
             'OSS_BUCKET_NAME',
             'OSS_ENDPOINT',
             'AI_MODEL_NAME',
             'APP_CACHE_DIR'
-        ]
+        )
+        
+        # 逐行读取变量名（忽略注释行），全部找到后提前结束
+        remaining = set(required_vars)
+        with open(env_example_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if '=' not in line or line.lstrip().startswith('#'):
+                    continue
+                remaining.discard(line.split('=', 1)[0].strip())
+                if not remaining:
+                    break
         
-        missing_vars = []
-        for var in required_vars:
-            if var not in content:
-                missing_vars.append(var)
+        missing_vars = [var for var in required_vars if var in remaining]
         
         if missing_vars:
             print(f"   ❌ 缺少环境变量配置: {', '.join(missing_vars)}")
@@ -149,38 +165,58 @@ def check_environment_variables():
         print(f"   ❌ 读取环境变量配置失败: {str(e)}")
         return False
 
+def _existing_paths(paths):
+    """按所在目录分组，每个目录只扫描一次，返回其中存在的路径集合"""
+    by_dir = defaultdict(list)
+    for path in paths:
+        by_dir[os.path.dirname(path)].append(path)
+    
+    existing = set()
+    for directory, dir_paths in by_dir.items():
+        try:
+            with os.scandir(directory or '.') as entries:
+                present = {entry.name for entry in entries}
+        except OSError:
+            continue
+        existing.update(path for path in dir_paths if os.path.basename(path) in present)
+    return existing
+
 def check_project_structure():
     """检查项目结构"""
     print("\n📁 检查项目结构...")
     
-    required_files = [
+    required_files = (
         'app.py',
         'requirements.txt',
         'vercel.json',
         '.env.example',
         'README.md'
-    ]
+    )
     
-    required_dirs = [
+    required_dirs = (
         'src',
         'src/email_connector.py',
         'src/semantic_search.py',
+        'src/embedding_cache.py',
+        'src/onnx_embedder.py',
+        'src/keyword_matcher.py',
         'src/oss_storage.py',
         'src/utils.py'
-    ]
+    )
     
     missing_items = []
+    existing = _existing_paths(required_files + required_dirs)
     
     # 检查文件
     for file_path in required_files:
-        if not Path(file_path).exists():
+        if file_path not in existing:
             missing_items.append(f"文件: {file_path}")
         else:
             print(f"   ✅ {file_path}")
     
     # 检查目录和模块
     for item in required_dirs:
-        if not Path(item).exists():
+        if item not in existing:
             missing_items.append(f"模块: {item}")
         else:
             print(f"   ✅ {item}")
@@ -203,12 +239,15 @@ def check_app_imports():
         sys.path.insert(0, str(Path('src').absolute()))
         
         # 尝试导入主要模块
-        modules_to_check = [
+        modules_to_check = (
             'src.email_connector',
             'src.semantic_search',
+            'src.embedding_cache',
+            'src.onnx_embedder',
+            'src.keyword_matcher',
             'src.oss_storage',
             'src.utils'
-        ]
+        )
         
         for module_name in modules_to_check:
             try:
@@ -234,7 +273,7 @@ def check_streamlit_compatibility():
         print(f"   Streamlit版本: {st.__version__}")
         
         # 检查关键功能
-        required_features = [
+        required_features = (
             'set_page_config',
             'sidebar',
             'tabs',
@@ -242,10 +281,11 @@ def check_streamlit_compatibility():
             'spinner',
             'progress',
             'cache_data'
-        ]
+        )
         
+        st_attrs = set(dir(st))
         for feature in required_features:
-            if hasattr(st, feature):
+            if feature in st_attrs:
                 print(f"   ✅ {feature}")
             else:
                 print(f"   ❌ {feature} - 功能不可用")
@@ -6,21 +6,308 @@
 import imaplib
 import email
 import ssl
+import time
+import atexit
+import asyncio
+import threading
+import queue
+import base64
+import codecs
+import binascii
+import quopri
+import hashlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Dict, Optional, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import re
 from email.header import decode_header
-from email.utils import parsedate_to_datetime
+from email.errors import HeaderParseError
+from email.utils import parsedate_tz, mktime_tz, decode_rfc2231
+from urllib.parse import unquote
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
+try:
+    import aioimaplib
+except ImportError:  # aioimaplib为可选依赖，仅异步获取邮件时需要
+    aioimaplib = None
+
+# 配置日志（库模块不配置根日志，由应用入口统一配置）
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# 每次FETCH请求的默认邮件数量，过大时部分服务器会拒绝过长的命令
+DEFAULT_FETCH_BATCH_SIZE = 100
+
+# 连接池中每个账号保留的空闲连接数上限，以及空闲多久后复用前需NOOP探测（秒）
+POOL_MAX_IDLE_PER_KEY = 8
+POOL_IDLE_CHECK_SECONDS = 60
+
+# 实时搜索时的文件夹数量上限，以及并发搜索使用的会话数（每个会话一个IMAP连接）
+REALTIME_SEARCH_FOLDERS = 5
+REALTIME_SEARCH_WORKERS = 4
+
+# 批量获取时下载线程最多领先解析的批次数，限制已下载未解析响应占用的内存
+FETCH_PIPELINE_DEPTH = 4
+
+# 默认只获取的邮件头字段，正文与附件名由BODYSTRUCTURE按需获取
+HEADER_FIELDS = "SUBJECT FROM TO DATE MESSAGE-ID"
+
+# 构建邮件时读取的邮件头（小写字段名 -> 规范字段名），只提取这几项，无需完整解析邮件头
+_HEADER_KEYS = {
+    b'subject': 'Subject',
+    b'from': 'From',
+    b'to': 'To',
+    b'date': 'Date',
+    b'message-id': 'Message-ID',
+}
+
+# Date头缺失或无法解析时使用的固定日期，避免逐封调用datetime.now()
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# datetime可表示的时间戳范围（0001-01-01至9999-12-31 UTC）
+_MIN_TIMESTAMP = -62135596800
+_MAX_TIMESTAMP = 253402300799
+
+# 直接走bytes.decode的UTF-8快速路径的字符集（ASCII是UTF-8的子集）
+_UTF8_CHARSETS = frozenset(('utf-8', 'utf8', 'ascii', 'us-ascii'))
+
+# IMAP LIST响应行：(flags) "delimiter" name，分隔符可能为NIL
+_LIST_RE = re.compile(rb'\((?P<flags>[^)]*)\) (?:"(?P<delim>[^"]*)"|NIL) (?P<name>.+)')
+
+# Modified UTF-7编码段：&<修改版base64>-，其中"&-"表示字符&本身
+_MUTF7_SEGMENT_RE = re.compile(r'&([A-Za-z0-9+,]*)-')
+
+# IMAP响应的词法单元：括号、带引号字符串、字面量长度标记、原子（含BODY[...]<n>形式）
+_IMAP_TOKEN_RE = re.compile(rb'\(|\)|"(?:[^"\\]|\\.)*"|\{\d+\}|[^\s()"\[\]]+(?:\[[^\]]*\](?:<\d+>)?)?')
+# 带引号字符串中的转义字符
+_QUOTED_ESCAPE_RE = re.compile(rb'\\(.)')
+_OPEN, _CLOSE = object(), object()
+
+def _tokenize_fetch_response(data: List) -> List:
+    """
+    将imaplib返回的FETCH数据转换为词法单元序列
+    
+    Args:
+        data: connection.fetch返回的数据，字面量以(前缀, 内容)元组形式出现
+        
+    Returns:
+        List: 词法单元，括号为_OPEN/_CLOSE，NIL为None，其余为bytes
+    """
+    tokens = []
+    for item in data:
+        text, literal = (item[0], item[1]) if isinstance(item, tuple) else (item, None)
+        if not isinstance(text, bytes):
+            continue
+        for match in _IMAP_TOKEN_RE.finditer(text):
+            token = match.group()
+            if token == b'(':
+                tokens.append(_OPEN)
+            elif token == b')':
+                tokens.append(_CLOSE)
+            elif token.startswith(b'"'):
+                tokens.append(_QUOTED_ESCAPE_RE.sub(rb'\1', token[1:-1]))
+            elif token.startswith(b'{'):
+                continue  # 字面量内容在元组的第二个元素中
+            elif token.upper() == b'NIL':
+                tokens.append(None)
+            else:
+                tokens.append(token)
+        if literal is not None:
+            tokens.append(literal)
+    return tokens
+
+def _parse_fetch_response(data: List) -> Dict[bytes, Dict[bytes, object]]:
+    """
+    解析FETCH响应为 {邮件序号: {数据项名称: 值}}，括号列表解析为嵌套list
+    
+    Args:
+        data: connection.fetch返回的数据
+        
+    Returns:
+        Dict[bytes, Dict[bytes, object]]: 每封邮件的数据项，同一邮件的多条响应合并
+    """
+    root = []
+    stack = [root]
+    for token in _tokenize_fetch_response(data):
+        if token is _OPEN:
+            stack.append([])
+        elif token is _CLOSE:
+            if len(stack) > 1:
+                closed = stack.pop()
+                stack[-1].append(closed)
+        else:
+            stack[-1].append(token)
+    
+    responses = {}
+    for seq, attrs in zip(root[::2], root[1::2]):
+        if not isinstance(seq, bytes) or not isinstance(attrs, list):
+            continue
+        items = responses.setdefault(seq, {})
+        for key, value in zip(attrs[::2], attrs[1::2]):
+            if isinstance(key, bytes):
+                items[key.upper()] = value
+    return responses
+
+def _structure_params(params) -> Dict[str, str]:
+    """将BODYSTRUCTURE参数列表转为小写键的字典，RFC 2231编码的值（name*=）会被还原"""
+    result = {}
+    if not isinstance(params, list):
+        return result
+    for key, value in zip(params[::2], params[1::2]):
+        if not isinstance(key, bytes) or not isinstance(value, bytes):
+            continue
+        name = key.decode('ascii', errors='ignore').lower()
+        text = value.decode('utf-8', errors='ignore')
+        if name.endswith('*'):
+            name = name[:-1]
+            charset, _, encoded = decode_rfc2231(text)
+            if not charset or not _known_charset(charset):
+                charset = 'utf-8'
+            text = unquote(encoded, encoding=charset, errors='replace')
+        result[name] = text
+    return result
+
+def _walk_bodystructure(structure, prefix: str = '') -> Tuple[List[Tuple[str, str, str, str]], List[str]]:
+    """
+    遍历BODYSTRUCTURE，找出正文部分及附件文件名
+    
+    Args:
+        structure: 解析后的BODYSTRUCTURE嵌套列表
+        prefix: 当前部分编号前缀
+        
+    Returns:
+        Tuple: ([(部分编号, 子类型, 字符集, 传输编码)], [附件文件名])
+    """
+    text_parts, attachments = [], []
+    if not isinstance(structure, list) or not structure:
+        return text_parts, attachments
+    
+    # 多部分：前若干个元素为子部分，之后是子类型等扩展字段
+    if isinstance(structure[0], list):
+        index = 0
+        for child in structure:
+            if not isinstance(child, list):
+                break
+            index += 1
+            child_parts, child_attachments = _walk_bodystructure(child, f"{prefix}{index}.")
+            text_parts.extend(child_parts)
+            attachments.extend(child_attachments)
+        return text_parts, attachments
+    
+    part_no = prefix[:-1] if prefix else '1'
+    main_type = (structure[0] or b'').decode('ascii', errors='ignore').lower()
+    sub_type = (structure[1] or b'').decode('ascii', errors='ignore').lower()
+    params = _structure_params(structure[2])
+    encoding = (structure[5] or b'7bit').decode('ascii', errors='ignore').lower()
+    
+    # 扩展字段中Content-Disposition的位置随类型不同而变化
+    if main_type == 'text':
+        disposition_index = 9
+    elif main_type == 'message' and sub_type == 'rfc822':
+        disposition_index = 11
+    else:
+        disposition_index = 8
+    disposition = structure[disposition_index] if len(structure) > disposition_index else None
+    
+    if isinstance(disposition, list) and disposition and isinstance(disposition[0], bytes) \
+            and disposition[0].lower() == b'attachment':
+        disposition_params = _structure_params(disposition[1] if len(disposition) > 1 else None)
+        filename = disposition_params.get('filename') or params.get('name')
+        if filename:
+            attachments.append(filename)
+        return text_parts, attachments
+    
+    # 顶层单部分邮件的正文即使不是text类型也按原有逻辑作为纯文本处理
+    if (main_type == 'text' and sub_type in ('plain', 'html')) or not prefix:
+        text_parts.append((part_no, sub_type, params.get('charset', 'utf-8'), encoding))
+    return text_parts, attachments
+
+@lru_cache(maxsize=2)
+def _shared_ssl_context(disable_verify: bool) -> ssl.SSLContext:
+    """
+    按是否校验证书缓存SSL上下文，避免每次连接都重新加载系统证书库（SSLContext可在多线程握手中共享）
+    
+    Args:
+        disable_verify: 是否禁用证书验证
+        
+    Returns:
+        ssl.SSLContext: SSL上下文
+    """
+    context = ssl.create_default_context()
+    if disable_verify:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+def _decode_mutf7_segment(match: re.Match) -> str:
+    """解码一个Modified UTF-7编码段（base64中以,代替/，内容为UTF-16BE）"""
+    encoded = match.group(1)
+    if not encoded:
+        return '&'
+    # 长度不合法的编码段（无法构成完整的UTF-16码元）原样保留
+    if len(encoded) % 4 == 1 or (len(encoded) * 6 // 8) % 2:
+        return match.group(0)
+    encoded = encoded.replace(',', '/')
+    encoded += '=' * (-len(encoded) % 4)
+    return base64.b64decode(encoded).decode('utf-16-be', 'replace')
+
+@lru_cache(maxsize=64)
+def _known_charset(charset: str) -> bool:
+    """按名称缓存字符集是否可用，解码前先行判断，避免以LookupError作为常规分支"""
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        return False
+    return True
+
+@lru_cache(maxsize=32)
+def _get_decoder(charset: str):
+    """按字符集名称缓存解码函数，避免每次解码都重新查找编解码器"""
+    return codecs.lookup(charset).decode
+
+def _decode_bytes(data: bytes, charset: str) -> str:
+    """
+    按字符集解码字节内容，忽略无法解码的字节
+    
+    Args:
+        data: 字节内容
+        charset: 字符集，为空或无法识别时使用utf-8
+        
+    Returns:
+        str: 解码后的文本
+    """
+    if not charset or charset.lower() in _UTF8_CHARSETS:
+        return data.decode('utf-8', 'ignore')
+    if not _known_charset(charset):
+        charset = 'utf-8'
+    return _get_decoder(charset)(data, 'ignore')[0]
+
+def _decode_part(payload: bytes, encoding: str, charset: str) -> str:
+    """
+    按传输编码和字符集解码正文部分
+    
+    Args:
+        payload: 部分原始内容
+        encoding: Content-Transfer-Encoding
+        charset: 字符集
+        
+    Returns:
+        str: 解码后的文本
+    """
+    if encoding == 'base64':
+        try:
+            payload = base64.b64decode(payload)
+        except (binascii.Error, ValueError):
+            return ""
+    elif encoding == 'quoted-printable':
+        payload = quopri.decodestring(payload)
+    return _decode_bytes(payload, charset)
 
-@dataclass
+@dataclass(slots=True)
 class EmailMessage:
-    """邮件消息数据类"""
+    """邮件消息数据类（使用__slots__，大批量同步时不再为每封邮件分配__dict__）"""
     uid: str
     subject: str
     sender: str
@@ -31,6 +318,185 @@ class EmailMessage:
     attachments: List[str]
     message_id: str
     folder: str
+    # 入库时预先小写化的筛选字段，筛选时无需逐次转换
+    sender_lc: str = field(init=False, repr=False, compare=False)
+    subject_lc: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.sender_lc = (self.sender or '').lower()
+        self.subject_lc = (self.subject or '').lower()
+
+def _extract_header_fields(header_bytes: bytes) -> Dict[str, str]:
+    """
+    从邮件头原文中提取_HEADER_KEYS所列字段（处理折行，同名字段取第一次出现的值）
+    
+    Args:
+        header_bytes: 邮件头原文
+        
+    Returns:
+        Dict[str, str]: 规范字段名到未解码字段值的映射
+    """
+    fields = {}
+    current = None
+    for line in header_bytes.split(b'\n'):
+        line = line.rstrip(b'\r')
+        if not line:
+            break
+        if line[:1] in (b' ', b'\t'):
+            # 折行：续行拼接到上一字段
+            if current is not None:
+                fields[current].append(line)
+            continue
+        name, sep, value = line.partition(b':')
+        key = _HEADER_KEYS.get(name.strip().lower()) if sep else None
+        if key is None or key in fields:
+            current = None
+            continue
+        fields[key] = [value.lstrip()]
+        current = key
+    # 8位原始字节（未做RFC 2047编码的头部）按utf-8解码
+    return {key: _decode_bytes(b''.join(parts), 'utf-8').strip() for key, parts in fields.items()}
+
+def _parse_date(date_str: str) -> datetime:
+    """
+    解析邮件Date头，保留发件方时区偏移
+    
+    Args:
+        date_str: Date头原文
+        
+    Returns:
+        datetime: 带时区的日期，无法解析时返回_EPOCH
+    """
+    parsed = parsedate_tz(date_str) if date_str else None
+    if parsed is None or not 1 <= parsed[0] <= 9999:
+        return _EPOCH
+    
+    # 未标注时区（-0000）按UTC处理
+    offset = parsed[9] or 0
+    timestamp = mktime_tz(parsed[:9] + (offset,))
+    if not _MIN_TIMESTAMP <= timestamp - offset <= _MAX_TIMESTAMP:
+        return _EPOCH
+    return (_EPOCH + timedelta(seconds=timestamp)).astimezone(timezone(timedelta(seconds=offset)))
+
+@lru_cache(maxsize=4096)
+def _decode_header_cached(header: str) -> str:
+    """
+    解码邮件头部信息（纯函数，按头部原文缓存）
+    
+    Args:
+        header: 邮件头部字符串
+        
+    Returns:
+        str: 解码后的字符串
+    """
+    # 不含编码字(encoded-word)的纯ASCII头部（最常见的情况）无需解码；
+    # compat32策略下含未编码8位字节的头部为email.header.Header对象，直接交给decode_header
+    if isinstance(header, str) and header.isascii() and '=?' not in header:
+        return header
+    
+    try:
+        parts = decode_header(header)
+    except HeaderParseError as e:
+        logger.error(f"解码头部失败: {str(e)}")
+        return header
+    
+    decoded_parts = []
+    for part, encoding in parts:
+        if isinstance(part, bytes):
+            # 未知字符集按utf-8解码，不再依赖异常回退
+            decoded_parts.append(_decode_bytes(part, encoding))
+        else:
+            decoded_parts.append(part)
+    
+    return "".join(decoded_parts)
+
+class _ConnectionPool:
+    """已认证IMAP连接池，按(服务器, 端口, 账号, 凭据, SSL模式)复用连接，避免重复的TLS握手与登录"""
+    
+    _idle: Dict[Tuple, List[Tuple[imaplib.IMAP4_SSL, Optional[str], float]]] = {}
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def _key(config: Dict) -> Tuple:
+        """
+        连接池键：服务器、端口、账号、密码摘要与SSL校验模式
+        
+        密码与SSL模式参与键计算，只有凭据相同且校验模式一致的连接器才能复用已认证的连接
+        """
+        password_digest = hashlib.blake2b(
+            str(config.get('password') or '').encode('utf-8'), digest_size=16
+        ).digest()
+        return (config.get('server'), config.get('port', 993), config.get('email'),
+                password_digest, bool(config.get('disable_ssl_verify', False)))
+    
+    @classmethod
+    def get(cls, config: Dict) -> Optional[Tuple[imaplib.IMAP4_SSL, Optional[str]]]:
+        """
+        取出一个空闲连接
+        
+        Args:
+            config: 邮箱配置字典
+            
+        Returns:
+            Optional[Tuple]: (连接, 当前已选择的文件夹)，无可用连接时返回None
+        """
+        key = cls._key(config)
+        while True:
+            with cls._lock:
+                entries = cls._idle.get(key)
+                if not entries:
+                    return None
+                conn, selected_folder, last_used = entries.pop()
+            
+            # 空闲过久的连接可能已被服务器断开，先用NOOP探测
+            if time.monotonic() - last_used > POOL_IDLE_CHECK_SECONDS:
+                try:
+                    if conn.noop()[0] != 'OK':
+                        raise imaplib.IMAP4.error("NOOP失败")
+                except Exception:
+                    cls._close(conn)
+                    continue
+            return conn, selected_folder
+    
+    @classmethod
+    def release(cls, config: Dict, conn: imaplib.IMAP4_SSL, selected_folder: Optional[str]):
+        """
+        归还连接，空闲连接数已满时直接登出
+        
+        Args:
+            config: 邮箱配置字典
+            conn: 已认证的连接
+            selected_folder: 连接当前已选择的文件夹
+        """
+        if getattr(conn, 'state', None) not in ('AUTH', 'SELECTED'):
+            cls._close(conn)
+            return
+        
+        with cls._lock:
+            entries = cls._idle.setdefault(cls._key(config), [])
+            if len(entries) < POOL_MAX_IDLE_PER_KEY:
+                entries.append((conn, selected_folder, time.monotonic()))
+                return
+        cls._close(conn)
+    
+    @classmethod
+    def close_all(cls):
+        """登出所有空闲连接（进程退出时调用）"""
+        with cls._lock:
+            entries = [entry for key_entries in cls._idle.values() for entry in key_entries]
+            cls._idle.clear()
+        for conn, _, _ in entries:
+            cls._close(conn)
+    
+    @staticmethod
+    def _close(conn: imaplib.IMAP4_SSL):
+        """登出连接，忽略已断开等错误"""
+        try:
+            conn.logout()
+        except Exception:
+            pass
+
+atexit.register(_ConnectionPool.close_all)
 
 class EmailConnector:
     """邮件连接器类"""
@@ -40,11 +506,20 @@ class EmailConnector:
         初始化邮件连接器
         
         Args:
-            config: 邮箱配置字典，包含server, port, email, password等
+            config: 邮箱配置字典，包含server, port, email, password等；
+                可选fetch_batch_size指定每次FETCH请求的邮件数量（默认100），
+                服务器报告请求过长时会自动减半；可选fetch_full为True时
+                下载完整RFC822原文，默认只获取邮件头、正文部分和附件名
         """
         self.config = config
         self.connection = None
         self.is_connected = False
+        # 当前连接已选择的文件夹，重复选择同一文件夹时跳过SELECT
+        self._selected_folder = None
+        # 已选择文件夹的邮件数量（SELECT响应中的EXISTS），未知时为None
+        self._exists = None
+        # 命令因连接中断(IMAP4.abort/套接字错误)失败后置位，断开时直接关闭而不归还连接池
+        self._broken = False
         
         # 预定义的邮箱服务器配置
         self.server_configs = {
@@ -70,6 +545,19 @@ class EmailConnector:
             }
         }
     
+    def _ssl_context(self) -> ssl.SSLContext:
+        """
+        获取SSL上下文（配置disable_ssl_verify时禁用证书验证）
+        
+        Returns:
+            ssl.SSLContext: 进程内共享的SSL上下文
+        """
+        # 检查是否禁用SSL验证
+        disable_verify = bool(self.config.get('disable_ssl_verify', False))
+        if disable_verify:
+            logger.warning("SSL证书验证已禁用")
+        return _shared_ssl_context(disable_verify)
+    
     def test_connection(self) -> bool:
         """
         测试邮箱连接
@@ -79,13 +567,7 @@ class EmailConnector:
         """
         try:
             # 创建SSL上下文
-            context = ssl.create_default_context()
-            
-            # 检查是否禁用SSL验证
-            if self.config.get('disable_ssl_verify', False):
-                context.check_hostname = False
-                context.verify_mode = ssl.CERT_NONE
-                logger.warning("SSL证书验证已禁用")
+            context = self._ssl_context()
             
             # 连接到IMAP服务器
             server = self.config.get('server')
@@ -125,14 +607,18 @@ class EmailConnector:
             if self.is_connected:
                 return True
             
-            # 创建SSL上下文
-            context = ssl.create_default_context()
+            # 优先复用连接池中已认证的连接
+            pooled = _ConnectionPool.get(self.config)
+            if pooled:
+                self.connection, self._selected_folder = pooled
+                self._exists = None
+                self._broken = False
+                self.is_connected = True
+                logger.info("复用连接池中的邮箱连接")
+                return True
             
-            # 检查是否禁用SSL验证
-            if self.config.get('disable_ssl_verify', False):
-                context.check_hostname = False
-                context.verify_mode = ssl.CERT_NONE
-                logger.warning("SSL证书验证已禁用")
+            # 创建SSL上下文
+            context = self._ssl_context()
             
             # 连接到IMAP服务器
             server = self.config.get('server')
@@ -148,6 +634,9 @@ class EmailConnector:
             
             if result[0] == 'OK':
                 self.is_connected = True
+                self._selected_folder = None
+                self._exists = None
+                self._broken = False
                 logger.info("邮箱连接建立成功")
                 return True
             else:
@@ -160,15 +649,66 @@ class EmailConnector:
             return False
     
     def disconnect(self):
-        """断开邮箱连接"""
+        """断开邮箱连接（正常连接归还连接池，供后续调用复用；已中断的连接直接关闭）"""
         try:
             if self.connection and self.is_connected:
-                self.connection.logout()
+                if self._broken:
+                    _ConnectionPool._close(self.connection)
+                    logger.info("邮箱连接已中断，不再归还连接池")
+                else:
+                    _ConnectionPool.release(self.config, self.connection, self._selected_folder)
+                    logger.info("邮箱连接已归还连接池")
+                self.connection = None
                 self.is_connected = False
-                logger.info("邮箱连接已断开")
+                self._broken = False
         except Exception as e:
             logger.error(f"断开连接时出错: {str(e)}")
     
+    def _note_error(self, error: Exception):
+        """
+        记录命令异常，连接中断类错误标记当前连接不可复用
+        
+        Args:
+            error: 捕获的异常
+        """
+        # imaplib在连接被服务器关闭时抛出abort或套接字错误，但不会修改state
+        if isinstance(error, (imaplib.IMAP4.abort, OSError)):
+            self._broken = True
+    
+    def _select_folder(self, folder: str) -> bool:
+        """
+        选择文件夹，与当前已选择的文件夹相同时跳过SELECT
+        
+        Args:
+            folder: 文件夹名称
+            
+        Returns:
+            bool: 是否选择成功
+        """
+        if folder == self._selected_folder:
+            return True
+        
+        result = self.connection.select(folder)
+        if result[0] != 'OK':
+            self._selected_folder = None
+            self._exists = None
+            return False
+        self._selected_folder = folder
+        self._exists = int(result[1][0]) if result[1] and result[1][0] else None
+        return True
+    
+    def _message_count(self) -> Optional[int]:
+        """
+        当前已选择文件夹的邮件数量，优先采用服务器随后推送的EXISTS更新
+        
+        Returns:
+            Optional[int]: 邮件数量，未知时返回None
+        """
+        _, data = self.connection.response('EXISTS')
+        if data and data[-1] is not None:
+            self._exists = int(data[-1])
+        return self._exists
+    
     def get_folders(self) -> List[str]:
         """
         获取邮箱文件夹列表
@@ -185,18 +725,19 @@ class EmailConnector:
             if result == 'OK':
                 folder_list = []
                 for folder in folders:
-                    # 解析文件夹名称
-                    folder_str = folder.decode('utf-8', errors='ignore')
-                    
-                    # 提取文件夹名称（处理IMAP LIST响应格式）
+                    # 提取文件夹名称（处理IMAP LIST响应格式），直接匹配原始字节，只解码名称部分
                     # 格式通常是: (flags) "delimiter" "folder_name"
-                    parts = folder_str.split('"')
-                    if len(parts) >= 3:
-                        folder_name = parts[-2]  # 倒数第二个引号内的内容
+                    match = _LIST_RE.match(folder) if isinstance(folder, bytes) else None
+                    if match:
+                        name = match.group('name').strip()
+                        if len(name) >= 2 and name.startswith(b'"') and name.endswith(b'"'):
+                            name = _QUOTED_ESCAPE_RE.sub(rb'\1', name[1:-1])
+                        folder_name = name.decode('utf-8', errors='ignore')
                     else:
-                        # 如果没有引号，尝试提取最后一部分
+                        # 无法匹配时按空白切分取最后一部分
+                        folder_str = folder.decode('utf-8', errors='ignore') if isinstance(folder, bytes) else str(folder)
                         parts = folder_str.split()
-                        folder_name = parts[-1] if parts else folder_str
+                        folder_name = parts[-1].strip('"') if parts else folder_str
                     
                     # 处理Modified UTF-7编码（IMAP标准编码）
                     folder_name = self._decode_folder_name(folder_name)
@@ -204,11 +745,12 @@ class EmailConnector:
                 return folder_list
             return []
         except Exception as e:
+            self._note_error(e)
             logger.error(f"获取文件夹失败: {str(e)}")
             return []
     
     def get_emails(self, folder: str = "INBOX", limit: Optional[int] = 100, 
-                   days_back: Optional[int] = 30) -> List[EmailMessage]:
+                   days_back: Optional[int] = 30, fetch_body: bool = True) -> List[EmailMessage]:
         """
         获取邮件列表
         
@@ -216,6 +758,7 @@ class EmailConnector:
             folder: 邮箱文件夹名称
             limit: 获取邮件数量限制，None表示无限制
             days_back: 获取多少天前的邮件，None表示获取所有邮件
+            fetch_body: 是否获取正文和附件信息，False时只获取邮件头
             
         Returns:
             List[EmailMessage]: 邮件消息列表
@@ -226,48 +769,151 @@ class EmailConnector:
 
         try:
             # 选择文件夹
-            result = self.connection.select(folder)
-            if result[0] != 'OK':
+            if not self._select_folder(folder):
                 logger.error(f"无法选择文件夹: {folder}")
                 return []
             
-            # 构建搜索条件
-            if days_back is not None:
-                since_date = (datetime.now() - timedelta(days=days_back)).strftime("%d-%b-%Y")
-                search_criteria = f'(SINCE "{since_date}")'
+            exists = self._message_count() if days_back is None and limit and limit > 0 else None
+            if exists is not None:
+                # 不按时间筛选时最新的邮件就是序号最大的limit封，无需SEARCH取回全部ID
+                email_ids = [str(seq).encode() for seq in range(max(1, exists - limit + 1), exists + 1)]
             else:
-                search_criteria = 'ALL'  # 获取所有邮件
+                # 构建搜索条件
+                search_criteria = self._date_criteria(days_back)
+                
+                # 搜索邮件
+                result, message_ids = self.connection.search(None, search_criteria)
+                if result != 'OK':
+                    logger.error("搜索邮件失败")
+                    return []
+                
+                # 获取邮件ID列表
+                email_ids = message_ids[0].split()
+                
+                # 限制邮件数量
+                if limit is not None and limit > 0:
+                    email_ids = email_ids[-limit:]  # 获取最新的邮件
             
-            # 搜索邮件
-            result, message_ids = self.connection.search(None, search_criteria)
-            if result != 'OK':
-                logger.error("搜索邮件失败")
+            # 批量获取，减少逐封FETCH的网络往返
+            emails = self._fetch_emails_bulk(email_ids, folder, fetch_body=fetch_body)
+            
+            logger.info(f"成功获取 {len(emails)} 封邮件")
+            return emails
+            
+        except Exception as e:
+            self._note_error(e)
+            logger.error(f"获取邮件失败: {str(e)}")
+            return []
+    
+    @staticmethod
+    def _date_criteria(days_back: Optional[int]) -> str:
+        """
+        构建按时间范围筛选的IMAP搜索条件
+        
+        Args:
+            days_back: 获取多少天前的邮件，None表示获取所有邮件
+            
+        Returns:
+            str: IMAP搜索条件
+        """
+        if days_back is not None:
+            since_date = (datetime.now() - timedelta(days=days_back)).strftime("%d-%b-%Y")
+            return f'(SINCE "{since_date}")'
+        return 'ALL'  # 获取所有邮件
+    
+    async def get_emails_async(self, folder: str = "INBOX", limit: Optional[int] = 100,
+                               days_back: Optional[int] = 30) -> List[EmailMessage]:
+        """
+        异步获取邮件列表（使用aioimaplib的独立连接，参数与get_emails一致）
+        
+        各批FETCH以协程并发提交，aioimaplib在同一连接上按顺序发送同类命令，
+        适合在已有事件循环中获取邮件而不阻塞其他任务
+        
+        Args:
+            folder: 邮箱文件夹名称
+            limit: 获取邮件数量限制，None表示无限制
+            days_back: 获取多少天前的邮件，None表示获取所有邮件
+            
+        Returns:
+            List[EmailMessage]: 邮件消息列表
+        """
+        if aioimaplib is None:
+            raise ImportError("异步获取邮件需要安装aioimaplib")
+        
+        client = aioimaplib.IMAP4_SSL(
+            host=self.config.get('server'),
+            port=self.config.get('port', 993),
+            ssl_context=self._ssl_context()
+        )
+        try:
+            await client.wait_hello_from_server()
+            response = await client.login(self.config.get('email'), self.config.get('password'))
+            if response.result != 'OK':
+                logger.error(f"登录失败: {response.lines}")
                 return []
             
-            # 获取邮件ID列表
-            email_ids = message_ids[0].split()
+            response = await client.select(folder)
+            if response.result != 'OK':
+                logger.error(f"无法选择文件夹: {folder}")
+                return []
+            
+            response = await client.search(self._date_criteria(days_back), charset=None)
+            if response.result != 'OK':
+                logger.error("搜索邮件失败")
+                return []
+            email_ids = response.lines[0].split() if response.lines else []
             
             # 限制邮件数量
             if limit is not None and limit > 0:
                 email_ids = email_ids[-limit:]  # 获取最新的邮件
             
-            emails = []
+            batch_size = max(1, int(self.config.get('fetch_batch_size', DEFAULT_FETCH_BATCH_SIZE)))
+            batches = [email_ids[start:start + batch_size] for start in range(0, len(email_ids), batch_size)]
+            responses = await asyncio.gather(*(
+                client.fetch(b','.join(batch).decode(), '(RFC822)') for batch in batches
+            ))
             
-            for email_id in email_ids:
-                try:
-                    email_msg = self._fetch_email(email_id, folder)
-                    if email_msg:
-                        emails.append(email_msg)
-                except Exception as e:
-                    logger.error(f"获取邮件 {email_id} 失败: {str(e)}")
+            # 响应行为 b'<ID> FETCH (RFC822 {size}'、邮件原文(bytearray)、b')' 交替出现
+            emails = []
+            for response in responses:
+                if response.result != 'OK':
                     continue
+                email_id = None
+                for line in response.lines:
+                    if isinstance(line, bytearray):
+                        email_msg = self._parse_email(email_id, bytes(line), folder) if email_id else None
+                        if email_msg:
+                            emails.append(email_msg)
+                        email_id = None
+                    elif b' FETCH ' in line:
+                        email_id = line.split(b' ', 1)[0]
             
-            logger.info(f"成功获取 {len(emails)} 封邮件")
+            logger.info(f"异步获取 {len(emails)} 封邮件")
             return emails
             
         except Exception as e:
-            logger.error(f"获取邮件失败: {str(e)}")
+            logger.error(f"异步获取邮件失败: {str(e)}")
             return []
+        finally:
+            try:
+                await client.logout()
+            except Exception:
+                pass
+    
+    def get_emails_pipelined(self, folder: str = "INBOX", limit: Optional[int] = 100,
+                             days_back: Optional[int] = 30) -> List[EmailMessage]:
+        """
+        get_emails_async的同步封装（调用线程中不能已有运行中的事件循环）
+        
+        Args:
+            folder: 邮箱文件夹名称
+            limit: 获取邮件数量限制，None表示无限制
+            days_back: 获取多少天前的邮件，None表示获取所有邮件
+            
+        Returns:
+            List[EmailMessage]: 邮件消息列表
+        """
+        return asyncio.run(self.get_emails_async(folder=folder, limit=limit, days_back=days_back))
     
     def search_emails_realtime(self, query: str, limit: int = 50) -> List[EmailMessage]:
         """
@@ -287,53 +933,26 @@ class EmailConnector:
         try:
             # 获取所有文件夹进行搜索
             folders = self.get_folders()
-            all_results = []
+            target_folders = folders[:REALTIME_SEARCH_FOLDERS]  # 限制搜索的文件夹数量以提高性能
+            if not target_folders:
+                return []
             
-            for folder in folders[:5]:  # 限制搜索前5个文件夹以提高性能
-                try:
-                    # 选择文件夹
-                    result = self.connection.select(folder)
-                    if result[0] != 'OK':
-                        continue
-                    
-                    # 构建IMAP搜索条件
-                    search_criteria = []
-                    
-                    # 简单的关键词搜索
-                    keywords = query.split()
-                    for keyword in keywords[:3]:  # 限制关键词数量
-                        if len(keyword) > 2:  # 忽略太短的词
-                            # 搜索主题和正文
-                            search_criteria.append(f'OR SUBJECT "{keyword}" BODY "{keyword}"')
-                    
-                    if not search_criteria:
-                        # 如果没有有效关键词，搜索主题
-                        search_criteria = [f'SUBJECT "{query}"']
-                    
-                    # 组合搜索条件
-                    final_criteria = ' '.join(search_criteria)
-                    
-                    # 执行搜索
-                    result, message_ids = self.connection.search(None, final_criteria)
-                    if result == 'OK' and message_ids[0]:
-                        email_ids = message_ids[0].split()
-                        
-                        # 限制每个文件夹的结果数量
-                        folder_limit = min(limit // len(folders) + 1, 20)
-                        email_ids = email_ids[-folder_limit:]  # 获取最新的邮件
-                        
-                        for email_id in email_ids:
-                            try:
-                                email_msg = self._fetch_email(email_id, folder)
-                                if email_msg:
-                                    all_results.append(email_msg)
-                            except Exception as e:
-                                logger.error(f"获取搜索结果邮件失败: {str(e)}")
-                                continue
-                                
-                except Exception as e:
-                    logger.error(f"搜索文件夹 {folder} 失败: {str(e)}")
-                    continue
+            criteria = self._realtime_criteria(query)
+            # 限制每个文件夹的结果数量
+            folder_limit = min(limit // len(folders) + 1, 20)
+            
+            if len(target_folders) == 1:
+                all_results = self._search_folder(target_folders[0], criteria, folder_limit)
+            else:
+                # 各文件夹相互独立，使用连接池中的多个会话并发搜索
+                all_results = []
+                workers = min(REALTIME_SEARCH_WORKERS, len(target_folders))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="imap-search") as executor:
+                    for folder_results in executor.map(
+                        lambda folder: self._search_folder_in_session(folder, criteria, folder_limit),
+                        target_folders
+                    ):
+                        all_results.extend(folder_results)
             
             # 按日期排序，最新的在前
             all_results.sort(key=lambda x: x.date, reverse=True)
@@ -348,6 +967,391 @@ class EmailConnector:
             logger.error(f"实时搜索失败: {str(e)}")
             return []
     
+    @staticmethod
+    def _realtime_criteria(query: str) -> str:
+        """
+        由查询字符串构建IMAP搜索条件
+        
+        Args:
+            query: 搜索查询字符串
+            
+        Returns:
+            str: IMAP搜索条件
+        """
+        search_criteria = []
+        
+        # 简单的关键词搜索
+        keywords = query.split()
+        for keyword in keywords[:3]:  # 限制关键词数量
+            if len(keyword) > 2:  # 忽略太短的词
+                # 搜索主题和正文
+                search_criteria.append(f'OR SUBJECT "{keyword}" BODY "{keyword}"')
+        
+        if not search_criteria:
+            # 如果没有有效关键词，搜索主题
+            search_criteria = [f'SUBJECT "{query}"']
+        
+        # 组合搜索条件
+        return ' '.join(search_criteria)
+    
+    def _search_folder(self, folder: str, criteria: str, folder_limit: int) -> List[EmailMessage]:
+        """
+        在当前连接上搜索单个文件夹并获取最新的匹配邮件
+        
+        Args:
+            folder: 文件夹名称
+            criteria: IMAP搜索条件
+            folder_limit: 该文件夹返回的邮件数量上限
+            
+        Returns:
+            List[EmailMessage]: 匹配的邮件列表
+        """
+        try:
+            # 选择文件夹
+            if not self._select_folder(folder):
+                return []
+            
+            # 服务器支持SORT扩展（RFC 5256）时直接按日期倒序取前N封，只获取需要的邮件
+            email_ids = self._sorted_search(criteria, folder_limit)
+            if email_ids is None:
+                # 执行搜索
+                result, message_ids = self.connection.search(None, criteria)
+                if result != 'OK' or not message_ids[0]:
+                    return []
+                email_ids = message_ids[0].split()[-folder_limit:]  # 获取最新的邮件
+            
+            if not email_ids:
+                return []
+            return self._fetch_emails_bulk(email_ids, folder)
+            
+        except Exception as e:
+            self._note_error(e)
+            logger.error(f"搜索文件夹 {folder} 失败: {str(e)}")
+            return []
+    
+    def _sorted_search(self, criteria: str, count: int) -> Optional[List[bytes]]:
+        """
+        使用SORT扩展按日期倒序搜索
+        
+        Args:
+            criteria: IMAP搜索条件
+            count: 返回的邮件数量上限
+            
+        Returns:
+            Optional[List[bytes]]: 最新的邮件ID列表，服务器不支持SORT或命令失败时返回None
+        """
+        # 能力列表在建立连接时已由imaplib获取，无需额外往返
+        if 'SORT' not in getattr(self.connection, 'capabilities', ()):
+            return None
+        
+        try:
+            result, data = self.connection.sort('(REVERSE DATE)', 'UTF-8', criteria)
+        except imaplib.IMAP4.error as e:
+            self._note_error(e)
+            logger.debug(f"SORT命令失败，改用SEARCH: {str(e)}")
+            return None
+        if result != 'OK':
+            return None
+        return data[0].split()[:count] if data and data[0] else []
+    
+    def _search_folder_in_session(self, folder: str, criteria: str, folder_limit: int) -> List[EmailMessage]:
+        """
+        在独立会话中搜索单个文件夹（供线程池调用，会话取自并归还连接池）
+        
+        Args:
+            folder: 文件夹名称
+            criteria: IMAP搜索条件
+            folder_limit: 该文件夹返回的邮件数量上限
+            
+        Returns:
+            List[EmailMessage]: 匹配的邮件列表
+        """
+        with EmailConnector(self.config) as connector:
+            if not connector.is_connected:
+                return []
+            return connector._search_folder(folder, criteria, folder_limit)
+    
+    def _fetch_emails_bulk(self, email_ids: List[bytes], folder: str,
+                           batch_size: Optional[int] = None,
+                           fetch_full: Optional[bool] = None,
+                           fetch_body: bool = True) -> List[EmailMessage]:
+        """
+        批量获取邮件，每次FETCH请求一组邮件ID
+        
+        下载与解析流水线执行：后台线程依次发出FETCH请求并把原始响应放入有界队列，
+        当前线程同时解析已取回的批次，网络等待与MIME解析相互重叠
+        
+        Args:
+            email_ids: 邮件ID列表
+            folder: 文件夹名称
+            batch_size: 每次FETCH请求的邮件数量，None表示使用配置的fetch_batch_size
+            fetch_full: 是否下载完整原文，None表示使用配置的fetch_full
+            fetch_body: 是否获取正文和附件信息，False时只获取邮件头
+            
+        Returns:
+            List[EmailMessage]: 邮件消息列表
+        """
+        if batch_size is None:
+            batch_size = int(self.config.get('fetch_batch_size', DEFAULT_FETCH_BATCH_SIZE))
+        batch_size = max(1, batch_size)
+        if fetch_full is None:
+            fetch_full = bool(self.config.get('fetch_full', False))
+        if not fetch_body:
+            download, parse = self._download_batch_headers, self._parse_batch_headers
+        elif fetch_full:
+            download, parse = self._download_batch_full, self._parse_batch_full
+        else:
+            download, parse = self._download_batch_partial, self._parse_batch_partial
+        
+        batches = queue.Queue(maxsize=FETCH_PIPELINE_DEPTH)
+        producer = threading.Thread(
+            target=self._bulk_producer,
+            args=(email_ids, folder, batch_size, download, batches),
+            name="imap-fetch",
+            daemon=True
+        )
+        producer.start()
+        
+        # 单一生产者按顺序入队，结果顺序与email_ids一致
+        emails = []
+        failed = []
+        while (item := batches.get()) is not None:
+            batch, raw, fetched = item
+            if raw is None:
+                emails.extend(fetched)
+                continue
+            try:
+                emails.extend(parse(batch, raw, folder))
+            except Exception as e:
+                logger.error(f"批量解析邮件失败: {str(e)}")
+                failed.extend(batch)
+        producer.join()
+        
+        # 解析失败的批次在连接空闲后逐封重新获取
+        for email_id in failed:
+            email_msg = self._fetch_email(email_id, folder)
+            if email_msg:
+                emails.append(email_msg)
+        
+        return emails
+    
+    def _bulk_producer(self, email_ids: List[bytes], folder: str, batch_size: int,
+                       download, batches: queue.Queue):
+        """
+        批量下载线程：按批次发出FETCH请求，原始响应依次放入队列，结束时放入None
+        
+        Args:
+            email_ids: 邮件ID列表
+            folder: 文件夹名称
+            batch_size: 每次FETCH请求的邮件数量
+            download: 批量下载函数，请求失败时返回None
+            batches: 输出队列，元素为(批次ID, 原始响应, 已解析邮件)
+        """
+        try:
+            start = 0
+            while start < len(email_ids):
+                batch = email_ids[start:start + batch_size]
+                try:
+                    raw = download(batch)
+                except imaplib.IMAP4.error as e:
+                    self._note_error(e)
+                    # 部分服务器限制命令长度（maximum request size exceeded），减半后重试同一批
+                    message = str(e).lower()
+                    if batch_size > 1 and ('parse error' in message or 'too long' in message):
+                        batch_size //= 2
+                        logger.warning(f"FETCH请求过长，批量大小降为 {batch_size}")
+                        continue
+                    logger.error(f"批量获取邮件失败: {str(e)}")
+                    raw = None
+                except Exception as e:
+                    self._note_error(e)
+                    logger.error(f"批量获取邮件失败: {str(e)}")
+                    raw = None
+                start += len(batch)
+                
+                if raw is None:
+                    # 批量请求失败时退回逐封获取（连接只在本线程中使用）
+                    fetched = [email_msg for email_msg in
+                               (self._fetch_email(email_id, folder) for email_id in batch)
+                               if email_msg]
+                    batches.put((batch, None, fetched))
+                else:
+                    batches.put((batch, raw, None))
+        finally:
+            batches.put(None)
+    
+    def _download_batch_full(self, batch: List[bytes]) -> Optional[list]:
+        """
+        以RFC822原文批量下载一组邮件
+        
+        Args:
+            batch: 邮件ID列表
+            
+        Returns:
+            Optional[list]: FETCH响应数据，请求失败时返回None
+        """
+        result, msg_data = self.connection.fetch(b','.join(batch).decode(), '(RFC822)')
+        return msg_data if result == 'OK' else None
+    
+    def _parse_batch_full(self, batch: List[bytes], msg_data: list, folder: str) -> List[EmailMessage]:
+        """
+        解析RFC822批量响应
+        
+        Args:
+            batch: 邮件ID列表
+            msg_data: FETCH响应数据
+            folder: 文件夹名称
+            
+        Returns:
+            List[EmailMessage]: 邮件消息列表
+        """
+        # 响应中的元组为 (b'<ID> (RFC822 {size}', 邮件原文)，其余为结束标记
+        emails = []
+        for item in msg_data:
+            if not isinstance(item, tuple):
+                continue
+            email_id = item[0].split(b' ', 1)[0]
+            email_msg = self._parse_email(email_id, item[1], folder)
+            if email_msg:
+                emails.append(email_msg)
+        return emails
+    
+    def _download_batch_headers(self, batch: List[bytes]) -> Optional[list]:
+        """
+        只下载一组邮件的邮件头（不含正文与附件）
+        
+        Args:
+            batch: 邮件ID列表
+            
+        Returns:
+            Optional[list]: FETCH响应数据，请求失败时返回None
+        """
+        result, data = self.connection.fetch(b','.join(batch).decode(), '(BODY.PEEK[HEADER])')
+        return data if result == 'OK' else None
+    
+    def _parse_batch_headers(self, batch: List[bytes], data: list, folder: str) -> List[EmailMessage]:
+        """
+        解析邮件头批量响应
+        
+        Args:
+            batch: 邮件ID列表
+            data: FETCH响应数据
+            folder: 文件夹名称
+            
+        Returns:
+            List[EmailMessage]: 邮件消息列表
+        """
+        responses = _parse_fetch_response(data)
+        emails = []
+        for email_id in batch:
+            header = responses.get(email_id, {}).get(b'BODY[HEADER]')
+            if not isinstance(header, bytes):
+                continue
+            email_msg = self._parse_headers(email_id, header, folder)
+            if email_msg:
+                emails.append(email_msg)
+        return emails
+    
+    def _download_batch_partial(self, batch: List[bytes]) -> Optional[Tuple[dict, dict, dict]]:
+        """
+        只下载邮件头、BODYSTRUCTURE和正文部分（不下载附件，PEEK不改变已读状态）
+        
+        第一次FETCH取回邮件头与结构，第二次按正文部分编号分组批量取回正文；
+        结构无法解析的邮件合并为一次RFC822请求取回完整原文
+        
+        Args:
+            batch: 邮件ID列表
+            
+        Returns:
+            Optional[Tuple[dict, dict, dict]]: (解析计划, 正文部分, 完整原文)，请求失败时返回None
+        """
+        result, data = self.connection.fetch(
+            b','.join(batch).decode(),
+            f'(BODYSTRUCTURE BODY.PEEK[HEADER.FIELDS ({HEADER_FIELDS})])'
+        )
+        if result != 'OK':
+            return None
+        
+        plans = {}
+        groups = defaultdict(list)
+        for seq, items in _parse_fetch_response(data).items():
+            header = next((value for key, value in items.items()
+                           if key.startswith(b'BODY[HEADER') and isinstance(value, bytes)), None)
+            structure = items.get(b'BODYSTRUCTURE')
+            if header is None or not isinstance(structure, list):
+                continue
+            try:
+                text_parts, attachments = _walk_bodystructure(structure)
+            except (IndexError, TypeError, AttributeError) as e:
+                logger.debug(f"解析邮件 {seq} 的BODYSTRUCTURE失败: {str(e)}")
+                continue
+            plans[seq] = (header, text_parts, attachments)
+            groups[tuple(part[0] for part in text_parts)].append(seq)
+        
+        # 正文部分编号相同的邮件合并为一次FETCH
+        bodies = {}
+        for sections, seqs in groups.items():
+            if not sections:
+                continue
+            fetch_items = ' '.join(f'BODY.PEEK[{section}]' for section in sections)
+            result, data = self.connection.fetch(b','.join(seqs).decode(), f'({fetch_items})')
+            if result != 'OK':
+                for seq in seqs:
+                    plans.pop(seq, None)
+                continue
+            for seq, items in _parse_fetch_response(data).items():
+                bodies[seq] = {key[5:-1].decode('ascii', errors='ignore'): value
+                               for key, value in items.items() if key.startswith(b'BODY[')}
+        
+        raw_messages = {}
+        missing = [email_id for email_id in batch if email_id not in plans]
+        if missing:
+            result, data = self.connection.fetch(b','.join(missing).decode(), '(RFC822)')
+            if result == 'OK':
+                for item in data:
+                    if isinstance(item, tuple):
+                        raw_messages[item[0].split(b' ', 1)[0]] = item[1]
+        
+        return plans, bodies, raw_messages
+    
+    def _parse_batch_partial(self, batch: List[bytes], downloaded: Tuple[dict, dict, dict],
+                             folder: str) -> List[EmailMessage]:
+        """
+        由邮件头、结构和正文部分组装邮件
+        
+        Args:
+            batch: 邮件ID列表
+            downloaded: _download_batch_partial的返回值
+            folder: 文件夹名称
+            
+        Returns:
+            List[EmailMessage]: 邮件消息列表
+        """
+        plans, bodies, raw_messages = downloaded
+        emails = []
+        for email_id in batch:
+            plan = plans.get(email_id)
+            if plan is None:
+                raw = raw_messages.get(email_id)
+                email_msg = self._parse_email(email_id, raw, folder) if raw else None
+            else:
+                header, text_parts, attachments = plan
+                parts = bodies.get(email_id, {})
+                text_chunks, html_chunks = [], []
+                for section, sub_type, charset, encoding in text_parts:
+                    payload = parts.get(section)
+                    if not isinstance(payload, bytes):
+                        continue
+                    chunks = html_chunks if sub_type == 'html' else text_chunks
+                    chunks.append(_decode_part(payload, encoding, charset))
+                email_msg = self._build_email(
+                    email_id, _extract_header_fields(header), "".join(text_chunks), "".join(html_chunks),
+                    [self._decode_header(name) for name in attachments], folder
+                )
+            if email_msg:
+                emails.append(email_msg)
+        return emails
+    
     def _fetch_email(self, email_id: bytes, folder: str) -> Optional[EmailMessage]:
         """
         获取单封邮件的详细信息
@@ -364,30 +1368,78 @@ class EmailConnector:
             result, msg_data = self.connection.fetch(email_id, '(RFC822)')
             if result != 'OK':
                 return None
+        except Exception as e:
+            self._note_error(e)
+            logger.error(f"获取邮件 {email_id} 失败: {str(e)}")
+            return None
+        
+        return self._parse_email(email_id, msg_data[0][1], folder)
+    
+    def _parse_email(self, email_id: bytes, email_body: bytes, folder: str) -> Optional[EmailMessage]:
+        """
+        解析邮件原文
+        
+        Args:
+            email_id: 邮件ID
+            email_body: 邮件原文（RFC822）
+            folder: 文件夹名称
             
+        Returns:
+            Optional[EmailMessage]: 邮件消息对象
+        """
+        try:
             # 解析邮件
-            email_body = msg_data[0][1]
             email_message = email.message_from_bytes(email_body)
             
-            # 提取邮件信息
-            subject = self._decode_header(email_message.get('Subject', ''))
-            sender = self._decode_header(email_message.get('From', ''))
-            recipient = self._decode_header(email_message.get('To', ''))
-            date_str = email_message.get('Date', '')
-            message_id = email_message.get('Message-ID', '')
+            # 提取邮件正文和附件信息
+            body_text, body_html, attachments = self._walk_once(email_message)
             
-            # 解析日期
-            try:
-                date = parsedate_to_datetime(date_str)
-            except (ValueError, TypeError, OverflowError) as e:
-                logger.debug(f"日期解析失败，使用当前时间: {date_str}, 错误: {str(e)}")
-                date = datetime.now()
+        except Exception as e:
+            logger.error(f"解析邮件失败: {str(e)}")
+            return None
+        
+        return self._build_email(email_id, email_message, body_text, body_html, attachments, folder)
+    
+    def _parse_headers(self, email_id: bytes, header_bytes: bytes, folder: str) -> Optional[EmailMessage]:
+        """
+        只解析邮件头（正文与附件留空）
+        
+        Args:
+            email_id: 邮件ID
+            header_bytes: 邮件头原文
+            folder: 文件夹名称
+            
+        Returns:
+            Optional[EmailMessage]: 邮件消息对象
+        """
+        return self._build_email(email_id, _extract_header_fields(header_bytes), "", "", [], folder)
+    
+    def _build_email(self, email_id: bytes, headers, body_text: str, body_html: str,
+                     attachments: List[str], folder: str) -> Optional[EmailMessage]:
+        """
+        由邮件头和已提取的正文、附件构建邮件消息对象
+        
+        Args:
+            email_id: 邮件ID
+            headers: 至少包含邮件头的邮件消息对象
+            body_text: 纯文本正文
+            body_html: HTML正文
+            attachments: 附件文件名列表
+            folder: 文件夹名称
             
-            # 提取邮件正文
-            body_text, body_html = self._extract_body(email_message)
+        Returns:
+            Optional[EmailMessage]: 邮件消息对象
+        """
+        try:
+            # 提取邮件信息
+            subject = self._decode_header(headers.get('Subject', ''))
+            sender = self._decode_header(headers.get('From', ''))
+            recipient = self._decode_header(headers.get('To', ''))
+            date_str = headers.get('Date', '')
+            message_id = headers.get('Message-ID', '')
             
-            # 提取附件信息
-            attachments = self._extract_attachments(email_message)
+            # 解析日期
+            date = _parse_date(date_str)
             
             return EmailMessage(
                 uid=email_id.decode(),
@@ -408,7 +1460,7 @@ class EmailConnector:
     
     def _decode_header(self, header: str) -> str:
         """
-        解码邮件头部信息
+        解码邮件头部信息（字符串头部按值缓存，发件人/收件人等重复值无需重复解码）
         
         Args:
             header: 邮件头部字符串
@@ -418,99 +1470,58 @@ class EmailConnector:
         """
         if not header:
             return ""
-        
-        try:
-            decoded_parts = decode_header(header)
-            decoded_string = ""
-            
-            for part, encoding in decoded_parts:
-                if isinstance(part, bytes):
-                    if encoding:
-                        decoded_string += part.decode(encoding)
-                    else:
-                        decoded_string += part.decode('utf-8', errors='ignore')
-                else:
-                    decoded_string += part
-            
-            return decoded_string
-        except Exception as e:
-            logger.error(f"解码头部失败: {str(e)}")
-            return header
+        if isinstance(header, str):
+            return _decode_header_cached(header)
+        # email.header.Header等不可哈希的对象不走缓存
+        return _decode_header_cached.__wrapped__(header)
     
-    def _extract_body(self, email_message) -> Tuple[str, str]:
+    def _walk_once(self, email_message) -> Tuple[str, str, List[str]]:
         """
-        提取邮件正文
+        单次遍历MIME结构，同时提取邮件正文和附件信息
         
         Args:
             email_message: 邮件消息对象
             
         Returns:
-            Tuple[str, str]: (纯文本正文, HTML正文)
+            Tuple[str, str, List[str]]: (纯文本正文, HTML正文, 附件文件名列表)
         """
-        body_text = ""
-        body_html = ""
+        # 各部分先收集到列表，最后统一拼接，避免多部分邮件反复复制字符串
+        text_parts = []
+        html_parts = []
+        attachments = []
         
         try:
             if email_message.is_multipart():
                 for part in email_message.walk():
-                    content_type = part.get_content_type()
-                    content_disposition = str(part.get("Content-Disposition"))
-                    
-                    # 跳过附件
-                    if "attachment" in content_disposition:
+                    # 附件只记录文件名，不解码内容
+                    if part.get_content_disposition() == 'attachment':
+                        filename = part.get_filename()
+                        if filename:
+                            # 解码文件名
+                            attachments.append(self._decode_header(filename))
                         continue
                     
+                    content_type = part.get_content_type()
                     if content_type == "text/plain":
                         charset = part.get_content_charset() or 'utf-8'
-                        body_text += part.get_payload(decode=True).decode(charset, errors='ignore')
+                        text_parts.append(_decode_bytes(part.get_payload(decode=True), charset))
                     elif content_type == "text/html":
                         charset = part.get_content_charset() or 'utf-8'
-                        body_html += part.get_payload(decode=True).decode(charset, errors='ignore')
+                        html_parts.append(_decode_bytes(part.get_payload(decode=True), charset))
             else:
                 content_type = email_message.get_content_type()
                 charset = email_message.get_content_charset() or 'utf-8'
-                body = email_message.get_payload(decode=True).decode(charset, errors='ignore')
+                body = _decode_bytes(email_message.get_payload(decode=True), charset)
                 
-                if content_type == "text/plain":
-                    body_text = body
-                elif content_type == "text/html":
-                    body_html = body
+                if content_type == "text/html":
+                    html_parts.append(body)
                 else:
-                    body_text = body
+                    text_parts.append(body)
         
         except Exception as e:
-            logger.error(f"提取邮件正文失败: {str(e)}")
+            logger.error(f"提取邮件正文和附件失败: {str(e)}")
         
-        return body_text, body_html
-    
-    def _extract_attachments(self, email_message) -> List[str]:
-        """
-        提取附件信息
-        
-        Args:
-            email_message: 邮件消息对象
-            
-        Returns:
-            List[str]: 附件文件名列表
-        """
-        attachments = []
-        
-        try:
-            if email_message.is_multipart():
-                for part in email_message.walk():
-                    content_disposition = str(part.get("Content-Disposition"))
-                    
-                    if "attachment" in content_disposition:
-                        filename = part.get_filename()
-                        if filename:
-                            # 解码文件名
-                            filename = self._decode_header(filename)
-                            attachments.append(filename)
-        
-        except Exception as e:
-            logger.error(f"提取附件信息失败: {str(e)}")
-        
-        return attachments
+        return "".join(text_parts), "".join(html_parts), attachments
     
     def get_email_count(self, folder: str = "INBOX") -> int:
         """
@@ -527,11 +1538,17 @@ class EmailConnector:
                 return 0
         
         try:
+            # 需要SELECT响应中的邮件数量，不跳过选择
             result = self.connection.select(folder)
             if result[0] == 'OK':
-                return int(result[1][0])
+                self._selected_folder = folder
+                self._exists = int(result[1][0])
+                return self._exists
+            self._selected_folder = None
+            self._exists = None
             return 0
         except Exception as e:
+            self._note_error(e)
             logger.error(f"获取邮件数量失败: {str(e)}")
             return 0
     
@@ -544,85 +1561,26 @@ class EmailConnector:
         """上下文管理器出口"""
         self.disconnect()
     
-    def _decode_folder_name(self, folder_name: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _decode_folder_name(folder_name: str) -> str:
         """
-        解码文件夹名称，处理Modified UTF-7编码和其他编码格式
+        解码文件夹名称（IMAP Modified UTF-7，RFC 3501 §5.1.3），结果按名称缓存
         
         Args:
             folder_name: 原始文件夹名称
             
         Returns:
-            str: 解码后的文件夹名称
+            str: 解码后的文件夹名称，无法解码时返回原始名称
         """
-        if not folder_name:
+        # 纯ASCII名称（最常见的情况）无需解码
+        if not folder_name or '&' not in folder_name:
             return folder_name
         
-        try:
-            # 首先尝试处理Modified UTF-7编码（IMAP标准）
-            if '&' in folder_name:
-                try:
-                    # 使用Python的内置Modified UTF-7解码器
-                    import codecs
-                    
-                    # 将Modified UTF-7转换为标准UTF-7格式
-                    # Modified UTF-7使用&和-作为转义字符，而标准UTF-7使用+和-
-                    utf7_name = folder_name.replace('&', '+').replace(',', '/')
-                    
-                    # 如果以-结尾，确保正确的UTF-7格式
-                    if utf7_name.endswith('-'):
-                        utf7_name = utf7_name[:-1] + '-'
-                    elif not utf7_name.endswith('-') and '+' in utf7_name:
-                        utf7_name += '-'
-                    
-                    # 尝试UTF-7解码
-                    try:
-                        decoded = utf7_name.encode('ascii').decode('utf-7')
-                        if decoded and decoded != folder_name:
-                            logger.info(f"成功解码文件夹名称: {folder_name} -> {decoded}")
-                            return decoded
-                    except (UnicodeDecodeError, UnicodeEncodeError):
-                        pass
-                    
-                    # 如果UTF-7失败，尝试imap4-utf-7
-                    try:
-                        decoded = folder_name.encode('ascii').decode('imap4-utf-7')
-                        if decoded and decoded != folder_name:
-                            logger.info(f"成功解码文件夹名称: {folder_name} -> {decoded}")
-                            return decoded
-                    except (UnicodeDecodeError, UnicodeEncodeError, LookupError):
-                        pass
-                        
-                except Exception as e:
-                    logger.debug(f"Modified UTF-7解码失败: {folder_name}, 错误: {str(e)}")
-            
-            # 如果不是Modified UTF-7或解码失败，尝试其他常见编码
-            encodings = ['utf-8', 'gbk', 'gb2312', 'shift_jis', 'euc-jp', 'iso-2022-jp']
-            
-            for encoding in encodings:
-                try:
-                    # 如果已经是字符串，先编码为bytes再解码
-                    if isinstance(folder_name, str):
-                        # 尝试不同的编码方式
-                        decoded = folder_name.encode('latin1').decode(encoding)
-                        if decoded != folder_name:
-                            logger.info(f"使用{encoding}编码解码文件夹名称: {folder_name} -> {decoded}")
-                            return decoded
-                    else:
-                        decoded = folder_name.decode(encoding)
-                        if decoded != folder_name:
-                            logger.info(f"使用{encoding}编码解码文件夹名称: {folder_name} -> {decoded}")
-                            return decoded
-                except (UnicodeDecodeError, UnicodeEncodeError, AttributeError):
-                    continue
-            
-            # 如果所有编码都失败，返回一个友好的显示名称
-            if '&' in folder_name and folder_name.startswith('&') and folder_name.endswith('-'):
-                # 对于无法解码的Modified UTF-7，提供一个描述性名称
-                logger.warning(f"无法解码文件夹名称: {folder_name}，使用描述性名称")
-                return f"[编码文件夹: {folder_name}]"
-            
+        # 先确认存在合法的编码段，非法编码段原样保留
+        if not _MUTF7_SEGMENT_RE.search(folder_name):
             return folder_name
-            
-        except Exception as e:
-            logger.error(f"解码文件夹名称失败: {folder_name}, 错误: {str(e)}")
-            return f"[解码失败: {folder_name}]"
\ No newline at end of file
+        
+        decoded = _MUTF7_SEGMENT_RE.sub(_decode_mutf7_segment, folder_name)
+        logger.debug("成功解码文件夹名称: %s -> %s", folder_name, decoded)
+        return decoded
@@ -0,0 +1,113 @@
+"""
+嵌入向量缓存模块
+基于SQLite按内容哈希持久化文本向量，重建索引时只对变化的邮件重新编码
+"""
+
+import os
+import sqlite3
+import hashlib
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# SQLite单条语句的参数数量上限较低，IN查询分批执行
+_QUERY_CHUNK_SIZE = 500
+
+class EmbeddingCache:
+    """嵌入向量缓存类"""
+    
+    def __init__(self, db_path: str, model_name: str):
+        """
+        初始化嵌入向量缓存
+        
+        Args:
+            db_path: SQLite数据库文件路径
+            model_name: 嵌入模型名称，模型变化时旧向量自动失效
+        """
+        self.db_path = db_path
+        self.model_name = model_name
+        
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache ("
+                "hash BLOB NOT NULL, model TEXT NOT NULL, vec BLOB NOT NULL, "
+                "PRIMARY KEY (hash, model))"
+            )
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        创建数据库连接（每次调用新建连接，可在后台线程中安全使用），退出时提交并关闭
+        
+        Yields:
+            sqlite3.Connection: 数据库连接
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def content_hash(text: str) -> bytes:
+        """
+        计算文本内容哈希
+        
+        Args:
+            text: 用于向量化的文本
+        
+        Returns:
+            bytes: 16字节的blake2b摘要
+        """
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    
+    def lookup_many(self, hashes: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        批量查询已缓存的向量
+        
+        Args:
+            hashes: 内容哈希列表
+        
+        Returns:
+            Dict[bytes, np.ndarray]: 命中的哈希到向量的映射
+        """
+        found = {}
+        unique_hashes = list(dict.fromkeys(hashes))
+        with self._connect() as conn:
+            for start in range(0, len(unique_hashes), _QUERY_CHUNK_SIZE):
+                chunk = unique_hashes[start:start + _QUERY_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT hash, vec FROM embedding_cache WHERE model = ? AND hash IN ({placeholders})",
+                    [self.model_name, *chunk]
+                )
+                for content_hash, vec in rows:
+                    found[content_hash] = np.frombuffer(vec, dtype=np.float32)
+        return found
+    
+    def write_many(self, hashes: List[bytes], vectors: np.ndarray):
+        """
+        批量写入向量（已存在的记录会被覆盖）
+        
+        Args:
+            hashes: 内容哈希列表
+            vectors: 与哈希一一对应的向量矩阵
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (hash, model, vec) VALUES (?, ?, ?)",
+                ((h, self.model_name, v.tobytes()) for h, v in zip(hashes, vectors))
+            )
+        logger.debug("写入嵌入缓存 %d 条", len(hashes))
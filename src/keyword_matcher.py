@@ -0,0 +1,67 @@
+"""
+多关键词匹配模块
+安装pyahocorasick时使用Aho-Corasick自动机对文本单次扫描匹配全部关键词，否则逐词子串查找
+"""
+
+from collections import defaultdict
+from typing import Hashable, Iterable, List, Set, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick为可选依赖，缺失时退回逐词查找
+    ahocorasick = None
+
+class KeywordMatcher:
+    """多关键词子串匹配器（不区分大小写，调用方传入已小写化的文本）"""
+    
+    def __init__(self, pairs: Iterable[Tuple[str, Hashable]]):
+        """
+        初始化匹配器
+        
+        Args:
+            pairs: (关键词, 标签)对，同一关键词可对应多个标签
+        """
+        self.labels = defaultdict(list)
+        for keyword, label in pairs:
+            self.labels[keyword.lower()].append(label)
+        
+        self.automaton = None
+        if ahocorasick is not None and self.labels:
+            automaton = ahocorasick.Automaton()
+            for keyword in self.labels:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            self.automaton = automaton
+    
+    @classmethod
+    def from_keywords(cls, keywords: List[str]) -> 'KeywordMatcher':
+        """按列表位置作为标签构建匹配器，重复出现的关键词分别计数"""
+        return cls((keyword, i) for i, keyword in enumerate(keywords))
+    
+    def keywords_in(self, text: str) -> Set[str]:
+        """
+        查找文本中出现的关键词
+        
+        Args:
+            text: 已小写化的文本
+        
+        Returns:
+            Set[str]: 出现的关键词（小写）
+        """
+        if self.automaton is not None:
+            return {keyword for _, keyword in self.automaton.iter(text)}
+        return {keyword for keyword in self.labels if keyword in text}
+    
+    def labels_in(self, text: str) -> Set[Hashable]:
+        """查找文本中命中的标签"""
+        return {label for keyword in self.keywords_in(text) for label in self.labels[keyword]}
+    
+    def count(self, text: str) -> int:
+        """统计文本中命中的标签数量"""
+        return len(self.labels_in(text))
+    
+    def any(self, text: str) -> bool:
+        """文本中是否出现任一关键词"""
+        if self.automaton is not None:
+            return next(self.automaton.iter(text), None) is not None
+        return any(keyword in text for keyword in self.labels)
@@ -0,0 +1,116 @@
+"""
+ONNX向量编码模块
+使用ONNX Runtime在CPU上运行Sentence Transformers模型，可选int8动态量化
+"""
+
+import os
+import logging
+from typing import List
+
+import numpy as np
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+class OnnxEmbedder:
+    """ONNX Runtime向量编码器，encode接口与SentenceTransformer保持一致"""
+    
+    def __init__(self, model_name: str, cache_dir: str = "./cache/onnx",
+                 quantize: bool = False, max_seq_length: int = 256):
+        """
+        初始化ONNX编码器，首次使用时导出（并量化）模型，之后直接加载导出结果
+        
+        Args:
+            model_name: Sentence Transformers模型名称
+            cache_dir: 导出模型的存放目录
+            quantize: 是否进行int8动态量化
+            max_seq_length: 文本截断长度
+        """
+        # 按需导入，未选择ONNX后端时不引入optimum/onnxruntime
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+        
+        model_id = model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+        export_dir = os.path.join(cache_dir, model_id.replace('/', '__'))
+        self.max_seq_length = max_seq_length
+        
+        if not os.path.exists(os.path.join(export_dir, 'model.onnx')):
+            logger.info(f"正在导出ONNX模型: {model_id}")
+            model = ORTModelForFeatureExtraction.from_pretrained(
+                model_id, export=True, provider='CPUExecutionProvider'
+            )
+            model.save_pretrained(export_dir)
+            AutoTokenizer.from_pretrained(model_id).save_pretrained(export_dir)
+        
+        file_name = 'model.onnx'
+        if quantize:
+            file_name = self._quantize(export_dir)
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            export_dir, file_name=file_name, provider='CPUExecutionProvider'
+        )
+        logger.info(f"ONNX模型加载完成: {export_dir}/{file_name}")
+    
+    @staticmethod
+    def _quantize(export_dir: str) -> str:
+        """
+        对导出的模型做int8动态量化（AVX512-VNNI指令集配置），已量化时直接复用
+        
+        Args:
+            export_dir: 导出模型目录
+        
+        Returns:
+            str: 量化后的模型文件名
+        """
+        file_name = 'model_quantized.onnx'
+        if not os.path.exists(os.path.join(export_dir, file_name)):
+            from optimum.onnxruntime import ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+            
+            quantizer = ORTQuantizer.from_pretrained(export_dir, file_name='model.onnx')
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            quantizer.quantize(save_dir=export_dir, quantization_config=qconfig)
+            logger.info("ONNX模型已完成int8动态量化")
+        return file_name
+    
+    def encode(self, sentences: List[str], batch_size: int = 32,
+               show_progress_bar: bool = False, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False) -> np.ndarray:
+        """
+        批量编码文本（均值池化，可选L2标准化）
+        
+        Args:
+            sentences: 文本列表
+            batch_size: 每批文本数量
+            show_progress_bar: 兼容参数，ONNX编码不显示进度条
+            convert_to_numpy: 兼容参数，始终返回numpy数组
+            normalize_embeddings: 是否对向量做L2标准化
+        
+        Returns:
+            np.ndarray: float32向量矩阵
+        """
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            inputs = self.tokenizer(
+                sentences[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors='np'
+            )
+            hidden = self.model(**inputs).last_hidden_state
+            
+            # 按注意力掩码做均值池化
+            mask = inputs['attention_mask'][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled.astype(np.float32))
+        
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        embeddings = np.vstack(batches)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.clip(norms, 1e-12, None)
+        return embeddings
@@ -8,21 +8,112 @@ import os
 import json
 import pickle
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import time
+import zlib
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import logging
 import gzip
 import io
+import shutil
+
+from .utils import email_message_to_dict, dict_to_email_message
+
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，缺失时退回标准库json
+    orjson = None
+
+try:
+    import zstandard as zstd
+except ImportError:  # zstandard为可选依赖，缺失时使用gzip压缩
+    zstd = None
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 流式压缩上传时每次读取的原始数据大小
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# FAISS向量数据压缩率本就不高，使用最快的压缩级别
+GZIP_COMPRESS_LEVEL = 1
+ZSTD_COMPRESS_LEVEL = 3
+
+# 超过该大小的文件先压缩到临时文件，再分片并发上传（可断点续传）
+MULTIPART_THRESHOLD = 50 * 1024 * 1024
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+DEFAULT_UPLOAD_THREADS = 8
+
+# 超过该大小的对象以多线程分段(Range)并发下载到临时文件后再解压
+MULTIGET_THRESHOLD = 20 * 1024 * 1024
+DOWNLOAD_PART_SIZE = 8 * 1024 * 1024
+
+# 超过该大小的对象备份时使用分片服务端复制(UploadPartCopy)并发进行
+COPY_MULTIPART_THRESHOLD = 128 * 1024 * 1024
+COPY_PART_SIZE = 64 * 1024 * 1024
+
+# 列出索引时并发读取配置文件的线程数
+CONFIG_FETCH_WORKERS = 16
+
+# 复用的HTTP连接池大小，需覆盖分片上传/下载的并发线程数
+OSS_CONNECTION_POOL_SIZE = 32
+OSS_CONNECT_TIMEOUT = 10
+
+# 索引列表与存储用量的内存缓存有效期（秒），上传、删除、备份后立即失效
+LIST_CACHE_TTL = 30
+
+# 压缩对象的后缀，下载、复制、删除时按此顺序查找（旧版本上传的对象为.gz）
+COMPRESSED_SUFFIXES = ('.zst', '.gz')
+
+def _iter_gzip_chunks(local_file: str, chunk_size: int = UPLOAD_CHUNK_SIZE):
+    """
+    分块读取文件并逐块产出gzip压缩数据，无需把整个文件及其压缩结果读入内存
+    
+    Args:
+        local_file: 本地文件路径
+        chunk_size: 每次读取的原始数据大小
+        
+    Yields:
+        bytes: 压缩数据块
+    """
+    buffer = io.BytesIO()
+    with open(local_file, 'rb') as reader:
+        with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=GZIP_COMPRESS_LEVEL) as gz:
+            for chunk in iter(lambda: reader.read(chunk_size), b''):
+                gz.write(chunk)
+                data = buffer.getvalue()
+                if data:
+                    buffer.seek(0)
+                    buffer.truncate()
+                    yield data
+    # 关闭GzipFile时写入剩余压缩数据与文件尾
+    tail = buffer.getvalue()
+    if tail:
+        yield tail
+
+def _iter_zstd_chunks(local_file: str, chunk_size: int = UPLOAD_CHUNK_SIZE):
+    """
+    分块读取文件并逐块产出zstd压缩数据（多线程压缩）
+    
+    Args:
+        local_file: 本地文件路径
+        chunk_size: 每次读取的原始数据大小
+        
+    Yields:
+        bytes: 压缩数据块
+    """
+    compressor = zstd.ZstdCompressor(level=ZSTD_COMPRESS_LEVEL, threads=-1)
+    with open(local_file, 'rb') as reader:
+        yield from compressor.read_to_iter(reader, read_size=chunk_size, write_size=chunk_size)
+
 class OSSStorage:
     """阿里云OSS存储管理类"""
     
     def __init__(self, access_key_id: str, access_key_secret: str, 
-                 endpoint: str, bucket_name: str):
+                 endpoint: str, bucket_name: str,
+                 part_size: int = DEFAULT_PART_SIZE,
+                 num_threads: int = DEFAULT_UPLOAD_THREADS):
         """
         初始化OSS存储
         
@@ -31,16 +122,22 @@ class OSSStorage:
             access_key_secret: 阿里云访问密钥Secret
             endpoint: OSS服务端点
             bucket_name: 存储桶名称
+            part_size: 大文件分片上传时的分片大小（字节）
+            num_threads: 大文件分片上传的并发线程数
         """
         self.access_key_id = access_key_id
         self.access_key_secret = access_key_secret
         self.endpoint = endpoint
         self.bucket_name = bucket_name
+        self.part_size = part_size
+        self.num_threads = num_threads
         
-        # 初始化OSS客户端
+        # 初始化OSS客户端（持有长连接会话，各次请求复用keep-alive连接）
         try:
             auth = oss2.Auth(access_key_id, access_key_secret)
-            self.bucket = oss2.Bucket(auth, endpoint, bucket_name)
+            session = oss2.Session(pool_size=max(OSS_CONNECTION_POOL_SIZE, num_threads))
+            self.bucket = oss2.Bucket(auth, endpoint, bucket_name,
+                                      session=session, connect_timeout=OSS_CONNECT_TIMEOUT)
             self.is_connected = True
             logger.info(f"OSS连接成功: {bucket_name}")
         except Exception as e:
@@ -48,6 +145,9 @@ class OSSStorage:
             self.is_connected = False
             self.bucket = None
         
+        # 列表类查询的内存缓存：键 -> (写入时间, 结果)
+        self._list_cache: Dict[str, Tuple[float, object]] = {}
+        
         # 定义存储路径结构
         self.paths = {
             'indices': 'emails/indices/',
@@ -56,6 +156,58 @@ class OSSStorage:
             'config': 'emails/config/'
         }
     
+    @staticmethod
+    def _shard(index_name: str) -> str:
+        """
+        由索引名称计算稳定的分片前缀（00-ff），把对象分散到不同前缀下以避开单前缀的请求速率限制
+        
+        Args:
+            index_name: 索引名称
+            
+        Returns:
+            str: 分片前缀，如"3f/"
+        """
+        return f"{zlib.crc32(index_name.encode('utf-8')) & 0xff:02x}/"
+    
+    def _index_keys(self, kind: str, index_name: str) -> Tuple[str, str]:
+        """
+        获取索引对象键（不含压缩后缀）
+        
+        Args:
+            kind: 对象类型（indices/metadata/config）
+            index_name: 索引名称
+            
+        Returns:
+            Tuple[str, str]: (分片后的对象键, 旧版未分片的对象键)
+        """
+        suffix = {'indices': '.faiss', 'metadata': '.metadata', 'config': '.config'}[kind]
+        return (f"{self.paths[kind]}{self._shard(index_name)}{index_name}{suffix}",
+                f"{self.paths[kind]}{index_name}{suffix}")
+    
+    def _cache_get(self, key: str, ttl: float = LIST_CACHE_TTL):
+        """
+        读取未过期的缓存结果
+        
+        Args:
+            key: 缓存键
+            ttl: 有效期（秒）
+            
+        Returns:
+            缓存的结果，不存在或已过期时返回None
+        """
+        entry = self._list_cache.get(key)
+        if entry is None or time.monotonic() - entry[0] > ttl:
+            return None
+        return entry[1]
+    
+    def _cache_put(self, key: str, value):
+        """写入缓存结果"""
+        self._list_cache[key] = (time.monotonic(), value)
+    
+    def _invalidate_cache(self):
+        """存储内容变化后清空列表缓存"""
+        self._list_cache.clear()
+    
     def test_connection(self) -> bool:
         """
         测试OSS连接
@@ -97,26 +249,27 @@ class OSSStorage:
             # 上传FAISS索引文件
             faiss_file = f"{local_index_path}.faiss"
             if os.path.exists(faiss_file):
-                oss_key = f"{self.paths['indices']}{index_name}.faiss"
+                oss_key = self._index_keys('indices', index_name)[0]
                 self._upload_file_with_compression(faiss_file, oss_key)
                 logger.info(f"FAISS索引已上传: {oss_key}")
             
             # 上传元数据文件
             metadata_file = f"{local_index_path}.metadata"
             if os.path.exists(metadata_file):
-                oss_key = f"{self.paths['metadata']}{index_name}.metadata"
+                oss_key = self._index_keys('metadata', index_name)[0]
                 self._upload_file_with_compression(metadata_file, oss_key)
                 logger.info(f"元数据已上传: {oss_key}")
             
             # 上传配置文件
             config_file = f"{local_index_path}.config"
             if os.path.exists(config_file):
-                oss_key = f"{self.paths['config']}{index_name}.config"
+                oss_key = self._index_keys('config', index_name)[0]
                 self.bucket.put_object_from_file(oss_key, config_file)
                 logger.info(f"配置文件已上传: {oss_key}")
             
             # 更新索引列表
             self._update_index_list(index_name)
+            self._invalidate_cache()
             
             logger.info(f"索引 {index_name} 上传完成")
             return True
@@ -144,26 +297,29 @@ class OSSStorage:
             # 创建本地目录
             os.makedirs(os.path.dirname(local_path), exist_ok=True)
             
-            # 下载FAISS索引文件
-            faiss_key = f"{self.paths['indices']}{index_name}.faiss"
+            # 下载FAISS索引文件（先查找分片路径，再查找旧版未分片路径）
             faiss_file = f"{local_path}.faiss"
-            if self._download_file_with_decompression(faiss_key, faiss_file):
+            if any(self._download_file_with_decompression(key, faiss_file)
+                   for key in self._index_keys('indices', index_name)):
                 logger.info(f"FAISS索引已下载: {faiss_file}")
             
             # 下载元数据文件
-            metadata_key = f"{self.paths['metadata']}{index_name}.metadata"
             metadata_file = f"{local_path}.metadata"
-            if self._download_file_with_decompression(metadata_key, metadata_file):
+            if any(self._download_file_with_decompression(key, metadata_file)
+                   for key in self._index_keys('metadata', index_name)):
                 logger.info(f"元数据已下载: {metadata_file}")
             
             # 下载配置文件
-            config_key = f"{self.paths['config']}{index_name}.config"
             config_file = f"{local_path}.config"
-            try:
-                self.bucket.get_object_to_file(config_key, config_file)
-                logger.info(f"配置文件已下载: {config_file}")
-            except oss2.exceptions.NoSuchKey:
-                logger.warning(f"配置文件不存在: {config_key}")
+            for config_key in self._index_keys('config', index_name):
+                try:
+                    self.bucket.get_object_to_file(config_key, config_file)
+                    logger.info(f"配置文件已下载: {config_file}")
+                    break
+                except oss2.exceptions.NoSuchKey:
+                    continue
+            else:
+                logger.warning(f"配置文件不存在: {index_name}")
             
             logger.info(f"索引 {index_name} 下载完成")
             return True
@@ -174,18 +330,80 @@ class OSSStorage:
     
     def _upload_file_with_compression(self, local_file: str, oss_key: str):
         """
-        压缩并上传文件
+        压缩并上传文件，安装zstandard时使用zstd，否则使用gzip
+        
+        小文件边压缩边发送；超过MULTIPART_THRESHOLD的文件先压缩到临时文件，
+        再以分片并发上传（resumable_upload需要可定位的本地文件）
         
         Args:
             local_file: 本地文件路径
             oss_key: OSS对象键
         """
-        with open(local_file, 'rb') as f:
-            # 压缩文件内容
-            compressed_data = gzip.compress(f.read())
+        if zstd is not None:
+            compressed_key, chunks = oss_key + '.zst', _iter_zstd_chunks(local_file)
+        else:
+            compressed_key, chunks = oss_key + '.gz', _iter_gzip_chunks(local_file)
+        
+        if os.path.getsize(local_file) <= MULTIPART_THRESHOLD:
+            # oss2接受可迭代对象作为请求体，以分块传输编码上传
+            self.bucket.put_object(compressed_key, chunks)
+            return
+        
+        with tempfile.NamedTemporaryFile(suffix=os.path.splitext(compressed_key)[1], delete=False) as temp_file:
+            for chunk in chunks:
+                temp_file.write(chunk)
+            temp_file_path = temp_file.name
+        try:
+            oss2.resumable_upload(
+                self.bucket, compressed_key, temp_file_path,
+                multipart_threshold=MULTIPART_THRESHOLD,
+                part_size=self.part_size,
+                num_threads=self.num_threads
+            )
+        finally:
+            os.unlink(temp_file_path)
+    
+    def _upload_bytes_with_compression(self, data: bytes, oss_key: str):
+        """
+        压缩内存中的数据并上传
+        
+        Args:
+            data: 原始数据
+            oss_key: OSS对象键
+        """
+        if zstd is not None:
+            compressed = zstd.ZstdCompressor(level=ZSTD_COMPRESS_LEVEL, threads=-1).compress(data)
+            self.bucket.put_object(oss_key + '.zst', compressed)
+        else:
+            self.bucket.put_object(oss_key + '.gz', gzip.compress(data, compresslevel=GZIP_COMPRESS_LEVEL))
+    
+    def _download_bytes_with_decompression(self, oss_key: str) -> Optional[bytes]:
+        """
+        下载对象并在内存中解压
+        
+        Args:
+            oss_key: OSS对象键
             
-            # 上传压缩后的数据
-            self.bucket.put_object(oss_key + '.gz', compressed_data)
+        Returns:
+            Optional[bytes]: 解压后的数据，对象不存在时返回None
+        """
+        for ext in COMPRESSED_SUFFIXES:
+            if ext == '.zst' and zstd is None:
+                continue
+            try:
+                raw = self.bucket.get_object(oss_key + ext).read()
+            except oss2.exceptions.NoSuchKey:
+                continue
+            if ext == '.zst':
+                # 流式上传的帧头中不含原始大小，使用流式解压
+                return zstd.ZstdDecompressor().stream_reader(io.BytesIO(raw)).read()
+            return gzip.decompress(raw)
+        
+        try:
+            return self.bucket.get_object(oss_key).read()
+        except oss2.exceptions.NoSuchKey:
+            logger.warning(f"文件不存在: {oss_key}")
+            return None
     
     def _download_file_with_decompression(self, oss_key: str, local_file: str) -> bool:
         """
@@ -199,30 +417,75 @@ class OSSStorage:
             bool: 下载是否成功
         """
         try:
-            # 尝试下载压缩文件
-            compressed_key = oss_key + '.gz'
-            try:
-                compressed_data = self.bucket.get_object(compressed_key).read()
-                # 解压数据
-                decompressed_data = gzip.decompress(compressed_data)
-                
-                # 保存到本地文件
-                with open(local_file, 'wb') as f:
-                    f.write(decompressed_data)
+            # 优先下载zstd压缩文件，其次gzip压缩文件
+            for ext in COMPRESSED_SUFFIXES:
+                if ext == '.zst' and zstd is None:
+                    continue
+                compressed_key = oss_key + ext
+                try:
+                    size = self.bucket.head_object(compressed_key).content_length
+                except oss2.exceptions.NotFound:
+                    continue
                 
+                if size > MULTIGET_THRESHOLD:
+                    self._download_large_compressed(compressed_key, ext, local_file)
+                else:
+                    # 边下载边解压写入本地文件，内存中只保留一个缓冲块
+                    result = self.bucket.get_object(compressed_key)
+                    with open(local_file, 'wb') as out:
+                        if ext == '.zst':
+                            zstd.ZstdDecompressor().copy_stream(
+                                result, out, read_size=UPLOAD_CHUNK_SIZE, write_size=UPLOAD_CHUNK_SIZE
+                            )
+                        else:
+                            with gzip.GzipFile(fileobj=result, mode='rb') as gz:
+                                shutil.copyfileobj(gz, out, UPLOAD_CHUNK_SIZE)
                 return True
-            except oss2.exceptions.NoSuchKey:
-                # 如果压缩文件不存在，尝试下载原始文件
-                self.bucket.get_object_to_file(oss_key, local_file)
-                return True
+            
+            # 如果压缩文件不存在，尝试下载原始文件（大文件分段并发下载）
+            oss2.resumable_download(
+                self.bucket, oss_key, local_file,
+                multiget_threshold=MULTIGET_THRESHOLD,
+                part_size=DOWNLOAD_PART_SIZE,
+                num_threads=self.num_threads
+            )
+            return True
                 
-        except oss2.exceptions.NoSuchKey:
+        except oss2.exceptions.NotFound:
             logger.warning(f"文件不存在: {oss_key}")
             return False
         except Exception as e:
             logger.error(f"下载文件失败: {str(e)}")
             return False
     
+    def _download_large_compressed(self, compressed_key: str, ext: str, local_file: str):
+        """
+        分段并发下载大压缩对象到临时文件，再流式解压到本地文件
+        
+        Args:
+            compressed_key: 压缩对象键
+            ext: 压缩后缀（.zst或.gz）
+            local_file: 解压后的本地文件路径
+        """
+        temp_file_path = local_file + ext
+        try:
+            oss2.resumable_download(
+                self.bucket, compressed_key, temp_file_path,
+                multiget_threshold=MULTIGET_THRESHOLD,
+                part_size=DOWNLOAD_PART_SIZE,
+                num_threads=self.num_threads
+            )
+            with open(local_file, 'wb') as out:
+                if ext == '.zst':
+                    with open(temp_file_path, 'rb') as src:
+                        zstd.ZstdDecompressor().copy_stream(src, out)
+                else:
+                    with gzip.open(temp_file_path, 'rb') as src:
+                        shutil.copyfileobj(src, out, UPLOAD_CHUNK_SIZE)
+        finally:
+            if os.path.exists(temp_file_path):
+                os.unlink(temp_file_path)
+    
     def list_indices(self) -> List[Dict]:
         """
         列出所有可用的索引
@@ -233,46 +496,78 @@ class OSSStorage:
         if not self.is_connected:
             return []
         
+        cached = self._cache_get('indices')
+        if cached is not None:
+            return list(cached)
+        
         try:
             indices = []
+            seen = set()
+            
+            # 一次列举配置目录，只为存在配置文件的索引发起读取
+            config_keys = {obj.key for obj in oss2.ObjectIterator(self.bucket, prefix=self.paths['config'])}
             
             # 列出索引文件
             for obj in oss2.ObjectIterator(self.bucket, prefix=self.paths['indices']):
-                if obj.key.endswith('.faiss') or obj.key.endswith('.faiss.gz'):
-                    # 提取索引名称
-                    filename = os.path.basename(obj.key)
-                    index_name = filename.replace('.faiss.gz', '').replace('.faiss', '')
-                    
-                    # 获取文件信息
-                    index_info = {
-                        'name': index_name,
-                        'size': obj.size,
-                        'last_modified': obj.last_modified,
-                        'key': obj.key
-                    }
-                    
-                    # 尝试获取配置信息
-                    config_key = f"{self.paths['config']}{index_name}.config"
-                    try:
-                        config_obj = self.bucket.get_object(config_key)
-                        config_data = json.loads(config_obj.read().decode('utf-8'))
-                        index_info.update(config_data)
-                    except (oss2.exceptions.NoSuchKey, json.JSONDecodeError) as e:
-                        logger.debug(f"无法加载索引配置 {config_key}: {str(e)}")
-                    except Exception as e:
-                        logger.warning(f"加载索引配置时出错 {config_key}: {str(e)}")
-                    
-                    indices.append(index_info)
+                filename = os.path.basename(obj.key)
+                # 提取索引名称（同一索引可能同时存在不同压缩格式的对象）
+                for suffix in ('.faiss', *(f'.faiss{ext}' for ext in COMPRESSED_SUFFIXES)):
+                    if filename.endswith(suffix):
+                        index_name = filename[:-len(suffix)]
+                        break
+                else:
+                    continue
+                if index_name in seen:
+                    continue
+                seen.add(index_name)
+                
+                # 获取文件信息
+                indices.append({
+                    'name': index_name,
+                    'size': obj.size,
+                    'last_modified': obj.last_modified,
+                    'key': obj.key
+                })
+            
+            # 并发读取存在的配置文件，合并到对应的索引信息
+            index_config_keys = [next((key for key in self._index_keys('config', info['name'])
+                                       if key in config_keys), None) for info in indices]
+            pending = [(info, key) for info, key in zip(indices, index_config_keys) if key is not None]
+            if pending:
+                with ThreadPoolExecutor(max_workers=min(CONFIG_FETCH_WORKERS, len(pending))) as executor:
+                    configs = executor.map(self._safe_get_config, [key for _, key in pending])
+                    for (info, _), config_data in zip(pending, configs):
+                        info.update(config_data)
             
             # 按修改时间排序
             indices.sort(key=lambda x: x['last_modified'], reverse=True)
             
-            return indices
+            self._cache_put('indices', indices)
+            return list(indices)
             
         except Exception as e:
             logger.error(f"列出索引失败: {str(e)}")
             return []
     
+    def _safe_get_config(self, config_key: str) -> Dict:
+        """
+        读取索引配置文件
+        
+        Args:
+            config_key: 配置文件对象键
+            
+        Returns:
+            Dict: 配置内容，不存在或无法解析时返回空字典
+        """
+        try:
+            config_obj = self.bucket.get_object(config_key)
+            return json.loads(config_obj.read().decode('utf-8'))
+        except (oss2.exceptions.NoSuchKey, json.JSONDecodeError) as e:
+            logger.debug(f"无法加载索引配置 {config_key}: {str(e)}")
+        except Exception as e:
+            logger.warning(f"加载索引配置时出错 {config_key}: {str(e)}")
+        return {}
+    
     def delete_index(self, index_name: str) -> bool:
         """
         删除指定的索引
@@ -288,24 +583,21 @@ class OSSStorage:
         
         try:
             # 删除相关文件
-            files_to_delete = [
-                f"{self.paths['indices']}{index_name}.faiss",
-                f"{self.paths['indices']}{index_name}.faiss.gz",
-                f"{self.paths['metadata']}{index_name}.metadata",
-                f"{self.paths['metadata']}{index_name}.metadata.gz",
-                f"{self.paths['config']}{index_name}.config"
-            ]
-            
-            deleted_count = 0
-            for file_key in files_to_delete:
-                try:
-                    self.bucket.delete_object(file_key)
-                    deleted_count += 1
-                except oss2.exceptions.NoSuchKey:
-                    pass  # 文件不存在，忽略
+            # 删除相关文件（分片路径与旧版未分片路径）
+            files_to_delete = []
+            for kind in ('indices', 'metadata', 'config'):
+                for key in self._index_keys(kind, index_name):
+                    files_to_delete.append(key)
+                    if kind != 'config':
+                        files_to_delete.extend(key + ext for ext in COMPRESSED_SUFFIXES)
+            
+            # 一次请求批量删除（不存在的对象不会导致失败）
+            result = self.bucket.batch_delete_objects(files_to_delete)
+            deleted_count = len(result.deleted_keys)
             
             # 更新索引列表
             self._update_index_list(index_name, remove=True)
+            self._invalidate_cache()
             
             logger.info(f"索引 {index_name} 已删除，删除了 {deleted_count} 个文件")
             return True
@@ -342,6 +634,7 @@ class OSSStorage:
                 if index_name not in existing_names:
                     index_list['indices'].append({
                         'name': index_name,
+                        'shard': self._shard(index_name),
                         'created_at': datetime.now().isoformat()
                     })
             
@@ -364,6 +657,10 @@ class OSSStorage:
         if not self.is_connected:
             return {}
         
+        cached = self._cache_get('usage')
+        if cached is not None:
+            return cached
+        
         try:
             usage = {
                 'total_size': 0,
@@ -387,6 +684,7 @@ class OSSStorage:
             # 转换为可读格式
             usage['total_size_mb'] = round(usage['total_size'] / (1024 * 1024), 2)
             
+            self._cache_put('usage', usage)
             return usage
             
         except Exception as e:
@@ -408,27 +706,23 @@ class OSSStorage:
             backup_name = f"{index_name}_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
         try:
-            # 复制索引文件
-            source_files = [
-                (f"{self.paths['indices']}{index_name}.faiss", 
-                 f"{self.paths['indices']}{backup_name}.faiss"),
-                (f"{self.paths['metadata']}{index_name}.metadata", 
-                 f"{self.paths['metadata']}{backup_name}.metadata"),
-                (f"{self.paths['config']}{index_name}.config", 
-                 f"{self.paths['config']}{backup_name}.config")
-            ]
-            
-            for source_key, dest_key in source_files:
-                try:
-                    # 检查源文件是否存在（可能是压缩版本）
-                    source_key_gz = source_key + '.gz'
+            # 复制索引文件，备份写入备份名称对应的分片路径
+            for kind in ('indices', 'metadata', 'config'):
+                dest_key = self._index_keys(kind, backup_name)[0]
+                # 检查源文件是否存在（可能是压缩版本或旧版未分片路径）
+                candidates = [(source_key, ext) for source_key in self._index_keys(kind, index_name)
+                              for ext in (*COMPRESSED_SUFFIXES, '')]
+                for source_key, ext in candidates:
                     try:
-                        self.bucket.copy_object(self.bucket_name, source_key_gz, dest_key + '.gz')
-                    except oss2.exceptions.NoSuchKey:
-                        self.bucket.copy_object(self.bucket_name, source_key, dest_key)
-                except oss2.exceptions.NoSuchKey:
-                    logger.warning(f"源文件不存在: {source_key}")
-            
+                        size = self.bucket.head_object(source_key + ext).content_length
+                    except oss2.exceptions.NotFound:
+                        continue
+                    self._server_side_copy(source_key + ext, dest_key + ext, size)
+                    break
+                else:
+                    logger.warning(f"源文件不存在: {kind}/{index_name}")
+            
+            self._invalidate_cache()
             logger.info(f"索引备份完成: {index_name} -> {backup_name}")
             return True
             
@@ -436,6 +730,39 @@ class OSSStorage:
             logger.error(f"备份索引失败: {str(e)}")
             return False
     
+    def _server_side_copy(self, source_key: str, dest_key: str, size: int):
+        """
+        在存储桶内复制对象，大对象按分片并发进行服务端复制
+        
+        Args:
+            source_key: 源对象键
+            dest_key: 目标对象键
+            size: 源对象大小（字节）
+        """
+        if size <= COPY_MULTIPART_THRESHOLD:
+            self.bucket.copy_object(self.bucket_name, source_key, dest_key)
+            return
+        
+        upload_id = self.bucket.init_multipart_upload(dest_key).upload_id
+        
+        def copy_part(part_number: int) -> oss2.models.PartInfo:
+            start = (part_number - 1) * COPY_PART_SIZE
+            byte_range = (start, min(start + COPY_PART_SIZE, size) - 1)
+            result = self.bucket.upload_part_copy(
+                self.bucket_name, source_key, byte_range, dest_key, upload_id, part_number
+            )
+            return oss2.models.PartInfo(part_number, result.etag)
+        
+        part_count = (size + COPY_PART_SIZE - 1) // COPY_PART_SIZE
+        try:
+            with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+                parts = list(executor.map(copy_part, range(1, part_count + 1)))
+            self.bucket.complete_multipart_upload(dest_key, upload_id, parts)
+        except Exception:
+            # 复制失败时取消分片上传，避免残留未完成的分片
+            self.bucket.abort_multipart_upload(dest_key, upload_id)
+            raise
+    
     def cleanup_old_backups(self, keep_count: int = 5) -> int:
         """
         清理旧的备份文件
@@ -449,12 +776,12 @@ class OSSStorage:
         if not self.is_connected:
             return 0
     
-    def upload_emails_index(self, emails_data: List[Dict]) -> bool:
+    def upload_emails_index(self, emails_data: List) -> bool:
         """
         上传邮件数据到OSS
         
         Args:
-            emails_data: 邮件数据列表
+            emails_data: 邮件数据列表（EmailMessage对象或字典）
             
         Returns:
             bool: 上传是否成功
@@ -464,17 +791,17 @@ class OSSStorage:
             return False
         
         try:
-            # 创建临时文件保存邮件数据
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as temp_file:
-                json.dump(emails_data, temp_file, ensure_ascii=False, indent=2, default=str)
-                temp_file_path = temp_file.name
+            # 统一转换为字典后再序列化，orjson与标准库json写出相同的结构
+            email_dicts = [email_message_to_dict(email) for email in emails_data]
             
-            # 上传到OSS
+            # 在内存中序列化并压缩后直接上传，不经过临时文件
+            if orjson is not None:
+                payload = orjson.dumps(email_dicts, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+            else:
+                payload = json.dumps(email_dicts, ensure_ascii=False, default=str).encode('utf-8')
             oss_key = f"{self.paths['cache']}emails_data.json"
-            self._upload_file_with_compression(temp_file_path, oss_key)
-            
-            # 清理临时文件
-            os.unlink(temp_file_path)
+            self._upload_bytes_with_compression(payload, oss_key)
+            self._invalidate_cache()
             
             logger.info(f"邮件数据已上传到OSS: {len(emails_data)} 封邮件")
             return True
@@ -483,38 +810,28 @@ class OSSStorage:
             logger.error(f"上传邮件数据失败: {str(e)}")
             return False
     
-    def download_emails_index(self) -> Optional[List[Dict]]:
+    def download_emails_index(self) -> Optional[List]:
         """
         从OSS下载邮件数据
         
         Returns:
-            Optional[List[Dict]]: 邮件数据列表，失败时返回None
+            Optional[List[EmailMessage]]: 邮件列表，失败时返回None
         """
         if not self.is_connected:
             logger.error("OSS未连接")
             return None
         
         try:
-            # 创建临时文件
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as temp_file:
-                temp_file_path = temp_file.name
-            
-            # 从OSS下载
+            # 从OSS下载并在内存中解压
             oss_key = f"{self.paths['cache']}emails_data.json"
-            if self._download_file_with_decompression(oss_key, temp_file_path):
-                # 读取邮件数据
-                with open(temp_file_path, 'r', encoding='utf-8') as f:
-                    emails_data = json.load(f)
-                
-                # 清理临时文件
-                os.unlink(temp_file_path)
-                
-                logger.info(f"从OSS下载了 {len(emails_data)} 封邮件")
-                return emails_data
-            else:
-                # 清理临时文件
-                os.unlink(temp_file_path)
+            payload = self._download_bytes_with_decompression(oss_key)
+            if payload is None:
                 return None
+            
+            email_dicts = orjson.loads(payload) if orjson is not None else json.loads(payload)
+            emails_data = [dict_to_email_message(email_dict) for email_dict in email_dicts]
+            logger.info(f"从OSS下载了 {len(emails_data)} 封邮件")
+            return emails_data
                 
         except Exception as e:
             logger.error(f"下载邮件数据失败: {str(e)}")
@@ -4,6 +4,7 @@
 """
 
 import numpy as np
+import pandas as pd
 import faiss
 from sentence_transformers import SentenceTransformer
 from typing import List, Dict, Tuple, Optional
@@ -15,12 +16,149 @@ import logging
 from dataclasses import dataclass
 import json
 import jieba
-from collections import Counter
+import heapq
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+try:
+    import bm25s
+except ImportError:  # 可选依赖，缺失时关键词搜索退回逐条匹配
+    bm25s = None
+
+from .embedding_cache import EmbeddingCache
+from .keyword_matcher import KeywordMatcher
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 索引类型选择阈值：小规模精确检索，中等规模HNSW，超大规模IVF-PQ
+HNSW_MIN_VECTORS = 5000
+IVFPQ_MIN_VECTORS = 200000
+
+# 长正文滑动窗口切块：窗口长度与步长（按模型分词计），单封邮件最多切块数
+CHUNK_TOKENS = 150
+CHUNK_STRIDE = 100
+MAX_CHUNKS_PER_EMAIL = 32
+# 检索时按块多取候选，再按邮件聚合
+CHUNK_OVERSAMPLE = 4
+# 加载旧版本fp16向量矩阵时每块转换的行数
+EMBEDDING_BLOCK_ROWS = 8192
+
+# 技能匹配搜索的结果方向过滤关键词（模块加载时构建匹配器，所有查询共享）
+# 人员信息相关的关键词（需要排除的）
+PERSON_KEYWORDS = KeywordMatcher.from_keywords([
+    # 基本人员信息
+    "名前", "年齢", "歳", "性別", "男性", "女性", "国籍", "中国籍", "日本籍",
+    "最寄駅", "駅", "稼働", "即日", "所属", "正社員", "単価", "万", "精算",
+    "実務経験", "年", "ヶ月", "日本語", "N1", "N2", "N3", "状況", "並行営業",
+    "推薦理由", "性格", "明るく", "コミュニケーション", "チーム意識",
+    "積極的", "継続的", "学び続ける", "意欲", "挑戦", "理解", "把握",
+    
+    # 人员类型和身份
+    "要員", "社員", "プロパー", "人材", "人員", "メンバー", "スタッフ",
+    "弊社", "営業中", "ご紹介", "紹介", "推薦", "候補者", "応募者",
+    "フリーランス", "派遣", "契約社員", "業務委託", "外注", "協力会社",
+    
+    # 人员状态和条件
+    "稼働中", "稼働可能", "アサイン", "参画", "常駐", "リモート可",
+    "即戦力", "ベテラン", "シニア", "ジュニア", "新人", "若手",
+    "経歴", "職歴", "学歴", "資格", "認定", "取得済み",
+    
+    # 人员评价和特征
+    "優秀", "真面目", "責任感", "協調性", "リーダーシップ", "向上心",
+    "几帳面", "丁寧", "細かい", "気配り", "サポート力", "対応力"
+])
+
+# 项目需求相关的关键词（应该保留的）
+PROJECT_KEYWORDS = KeywordMatcher.from_keywords([
+    "プロジェクト", "開発", "案件", "募集", "求人", "採用", "必要", "要求",
+    "条件", "資格", "スキル", "技術", "経験者", "エンジニア", "プログラマー",
+    "開発者", "技術者", "業務", "システム", "アプリケーション", "Web",
+    "フロントエンド", "バックエンド", "データベース", "インフラ"
+])
+
+# 标题中的强人员信息指示词（出现在标题中时直接排除）
+TITLE_PERSON_EXCLUSION_KEYWORDS = KeywordMatcher.from_keywords([
+    "プロパー", "人材", "要員", "社員", "営業中", "ご紹介", 
+    "推薦", "候補者", "応募者", "稼働中", "稼働可能", "アサイン", "参画可能",
+    # 人员信息相关
+    "要員情報", "人材情報", "人員情報", "社員情報", "メンバー情報",
+    "技術者情報", "エンジニア情報", "開発者情報", "プログラマー情報",
+    # 新增的人员介绍关键词
+    "人財配信", "弊社直個人", "直個人", "個人情報", "履歴書", "経歴書",
+    "人財紹介", "人材紹介", "技術者紹介", "エンジニア紹介", "プログラマー紹介",
+    "スキルシート", "技術シート", "経験シート", "プロフィール",
+    # 人员状态相关
+    "即日稼働", "稼働希望", "参画希望", "アサイン希望", "就業希望",
+    "転職希望", "求職", "就職活動", "キャリアチェンジ",
+    # 人员评价和推荐
+    "優秀な", "実力のある", "経験豊富な", "ベテランの", "即戦力の",
+    "おすすめの", "推奨の", "イチオシの", "注目の",
+    # 自由职业者和直接人员相关
+    "フリーランス", "直フリーランス", "フリー", "個人事業主", "業務委託",
+    "外部パートナー", "協力会社", "外注先", "委託先"
+])
+
+# 一般人员信息指示词（用于内容分析）
+GENERAL_PERSON_INDICATORS = KeywordMatcher.from_keywords([
+    "弊社", "営業中", "ご紹介", "推薦", "候補者", "応募者", 
+    "稼働中", "稼働可能", "アサイン", "参画可能",
+    # 新增的人员信息指示词
+    "人財配信", "弊社直個人", "直個人", "個人情報", "履歴書", "経歴書",
+    "人財紹介", "人材紹介", "技術者紹介", "エンジニア紹介", "プログラマー紹介",
+    "スキルシート", "技術シート", "経験シート", "プロフィール",
+    "即日稼働", "稼働希望", "参画希望", "アサイン希望", "就業希望",
+    "転職希望", "求職", "就職活動", "キャリアチェンジ",
+    "優秀な", "実力のある", "経験豊富な", "ベテランの", "即戦力の",
+    "おすすめの", "推奨の", "イチオシの", "注目の",
+    # 人员配信相关
+    "配信", "配属", "派遣", "出向", "常駐", "客先常駐",
+    # 自由职业者相关
+    "フリーランス", "直フリーランス", "フリー", "個人事業主", "業務委託",
+    "外部パートナー", "協力会社", "外注先", "委託先",
+    # 人员寻找项目的典型表达
+    "見合う案件", "案件ございましたら", "ご紹介いただけます", "案件をお探し",
+    "プロジェクトをお探し", "お仕事をお探し", "参画できる案件", "マッチする案件",
+    "適した案件", "条件に合う案件", "希望に合う案件"
+])
+
+# 双向匹配加成使用的方向指示词
+PROJECT_INDICATORS = KeywordMatcher.from_keywords(['プロジェクト', '案件', '募集', '求人', '採用', '開発', '要求', '必要'])
+PERSON_INDICATORS = KeywordMatcher.from_keywords(['プログラマー', 'エンジニア', '開発者', '経験', '技術', '専門', '得意', 'スキル'])
+PROJECT_INPUT_TERMS = KeywordMatcher.from_keywords(['プロジェクト', '案件', '募集', '求人'])
+PERSON_INPUT_TERMS = KeywordMatcher.from_keywords(['プログラマー', 'エンジニア', '開発者', '経験'])
+PROJECT_BONUS_KEYWORDS = KeywordMatcher.from_keywords(['プロジェクト', '案件', '開発', '求人', '募集'])
+
+def create_faiss_index(dimension: int, total: int, train_vectors: Optional[np.ndarray] = None):
+    """
+    按数据规模创建FAISS索引（均使用内积度量，配合标准化向量即余弦相似度）
+    
+    Args:
+        dimension: 向量维度
+        total: 预计向量总数
+        train_vectors: 训练向量，仅IVF-PQ需要；不足以训练时退回HNSW
+        
+    Returns:
+        faiss.Index: 未添加向量的索引
+    """
+    if total < HNSW_MIN_VECTORS:
+        return faiss.IndexFlatIP(dimension)
+    
+    if total >= IVFPQ_MIN_VECTORS and train_vectors is not None and dimension % 32 == 0:
+        nlist = int(4 * np.sqrt(total))
+        if len(train_vectors) >= 39 * nlist:
+            quantizer = faiss.IndexFlatIP(dimension)
+            index = faiss.IndexIVFPQ(quantizer, dimension, nlist, 32, 8, faiss.METRIC_INNER_PRODUCT)
+            index.train(train_vectors)
+            index.nprobe = 16
+            return index
+    
+    index = faiss.IndexHNSWFlat(dimension, 32, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = 200
+    index.hnsw.efSearch = 64
+    return index
+
 @dataclass
 class SearchResult:
     """搜索结果数据类"""
@@ -34,21 +172,73 @@ class SearchResult:
     attachments: List[str]
     body_text: str = ""  # 添加完整正文字段
 
+def reciprocal_rank_fusion(result_lists: List[List[SearchResult]], top_k: int,
+                           k: int = 60) -> List[SearchResult]:
+    """
+    倒数排名融合（RRF）：score = Σ 1/(k + rank)，无需调节各路检索的分数权重
+    
+    Args:
+        result_lists: 各路检索按相关度排序的结果列表
+        top_k: 返回结果数量
+        k: 平滑常数
+    
+    Returns:
+        List[SearchResult]: 融合后的结果，score为RRF分数
+    """
+    scores = defaultdict(float)
+    first_seen = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            scores[result.email_id] += 1.0 / (k + rank)
+            first_seen.setdefault(result.email_id, result)
+    
+    fused = []
+    for email_id, score in heapq.nlargest(top_k, scores.items(), key=lambda x: x[1]):
+        result = first_seen[email_id]
+        result.score = score
+        fused.append(result)
+    return fused
+
 class SemanticSearchEngine:
     """语义搜索引擎类"""
     
-    def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2"):
+    def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2",
+                 embedding_cache_path: Optional[str] = None,
+                 encode_batch_size: int = 256, quantize: bool = False,
+                 backend: str = "torch", onnx_cache_dir: str = "./cache/onnx"):
         """
         初始化语义搜索引擎
         
         Args:
             model_name: Sentence Transformers模型名称
+            embedding_cache_path: 嵌入向量缓存数据库路径，为None时不使用缓存
+            encode_batch_size: 批量编码时每批的文本数量
+            quantize: 无CUDA时是否对模型做int8动态量化
+            backend: 编码后端，"torch"使用sentence-transformers，"onnx"使用ONNX Runtime
+            onnx_cache_dir: ONNX后端导出模型的存放目录
         """
         self.model_name = model_name
+        self.encode_batch_size = encode_batch_size
+        self.quantize = quantize
+        self.backend = backend
+        self.onnx_cache_dir = onnx_cache_dir
         self.model = None
         self.index = None
         self.email_metadata = []
+        self.meta_df = None  # 与email_metadata行号对齐的小写筛选列
+        self.chunk_owner = np.empty(0, dtype=np.int64)  # FAISS向量行号 -> 所属邮件行号
         self.is_initialized = False
+        self.embedding_cache = None
+        self._bm25 = None  # (BM25检索器, 词表)，首次关键词搜索时构建
+        self._skill_matchers = {}  # 技能组合 -> 关键词匹配器
+        # 查询向量LRU缓存（按实例创建，缓存键为标准化后的查询文本）
+        self._cached_query_embedding = lru_cache(maxsize=256)(self._encode_query)
+        
+        if embedding_cache_path:
+            try:
+                self.embedding_cache = EmbeddingCache(embedding_cache_path, self._embedding_cache_key())
+            except Exception as e:
+                logger.warning(f"嵌入缓存初始化失败，将不使用缓存: {str(e)}")
         
         # 搜索配置
         self.max_preview_length = 200
@@ -81,21 +271,8 @@ class SemanticSearchEngine:
         try:
             logger.info(f"正在加载模型: {self.model_name}")
             
-            # 尝试多种方式加载模型以解决兼容性问题
-            try:
-                # 方法1: 直接加载
-                self.model = SentenceTransformer(self.model_name)
-            except Exception as e1:
-                logger.warning(f"直接加载失败: {str(e1)}, 尝试其他方法...")
-                try:
-                    # 方法2: 使用device参数
-                    import torch
-                    device = 'mps' if torch.backends.mps.is_available() else 'cpu'
-                    self.model = SentenceTransformer(self.model_name, device=device)
-                except Exception as e2:
-                    logger.warning(f"指定设备加载失败: {str(e2)}, 尝试CPU模式...")
-                    # 方法3: 强制使用CPU
-                    self.model = SentenceTransformer(self.model_name, device='cpu')
+            if not (self.backend == "onnx" and self._load_onnx_model()):
+                self._load_torch_model()
             
             # 测试模型是否正常工作
             test_text = "测试文本"
@@ -112,6 +289,64 @@ class SemanticSearchEngine:
             # 提供降级方案
             logger.info("将使用关键词搜索作为降级方案")
     
+    def _load_torch_model(self):
+        """加载sentence-transformers模型，并按配置降低推理精度"""
+        # 尝试多种方式加载模型以解决兼容性问题
+        try:
+            # 方法1: 直接加载
+            self.model = SentenceTransformer(self.model_name)
+        except Exception as e1:
+            logger.warning(f"直接加载失败: {str(e1)}, 尝试其他方法...")
+            try:
+                # 方法2: 使用device参数
+                import torch
+                device = 'mps' if torch.backends.mps.is_available() else 'cpu'
+                self.model = SentenceTransformer(self.model_name, device=device)
+            except Exception as e2:
+                logger.warning(f"指定设备加载失败: {str(e2)}, 尝试CPU模式...")
+                # 方法3: 强制使用CPU
+                self.model = SentenceTransformer(self.model_name, device='cpu')
+        
+        self._reduce_model_precision()
+    
+    def _load_onnx_model(self) -> bool:
+        """
+        加载ONNX Runtime编码器
+        
+        Returns:
+            bool: 是否加载成功；失败时退回sentence-transformers，并同步切换嵌入缓存键
+        """
+        try:
+            from .onnx_embedder import OnnxEmbedder
+            self.model = OnnxEmbedder(self.model_name, cache_dir=self.onnx_cache_dir, quantize=self.quantize)
+            return True
+        except Exception as e:
+            logger.warning(f"ONNX后端加载失败，改用sentence-transformers: {str(e)}")
+            self.backend = "torch"
+            if self.embedding_cache:
+                self.embedding_cache.model_name = self._embedding_cache_key()
+            return False
+    
+    def _embedding_cache_key(self) -> str:
+        """嵌入缓存键：包含编码后端与向量形式（标准化/量化），配置变化时旧向量自动失效"""
+        backend = "#onnx" if self.backend == "onnx" else ""
+        return f"{self.model_name}#l2{backend}" + ("#int8" if self.quantize else "")
+    
+    def _reduce_model_precision(self):
+        """降低推理精度以提升编码吞吐：CUDA上使用fp16，CPU上按配置使用int8动态量化"""
+        try:
+            import torch
+            if torch.cuda.is_available():
+                self.model = self.model.half().to('cuda')
+                logger.info("模型已切换为fp16 (CUDA)")
+            elif self.quantize:
+                self.model = torch.quantization.quantize_dynamic(
+                    self.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+                logger.info("模型已进行int8动态量化 (CPU)")
+        except Exception as e:
+            logger.warning(f"降低模型精度失败，继续使用fp32: {str(e)}")
+    
     def _parse_skill_query(self, query: str) -> Dict:
         """
         解析技能描述查询，支持双向匹配
@@ -331,15 +566,10 @@ class SemanticSearchEngine:
         try:
             logger.info(f"开始构建索引，邮件数量: {len(emails)}")
             
-            # 准备文本数据和元数据
-            texts = []
+            # 准备元数据
             metadata = []
             
             for i, email in enumerate(emails):
-                # 组合邮件文本用于向量化
-                combined_text = self._prepare_email_text(email)
-                texts.append(combined_text)
-                
                 # 调试日志 - 检查前几封邮件的数据
                 if i < 3:
                     logger.info(f"构建索引 - 邮件 {i}: {email.uid}")
@@ -350,19 +580,11 @@ class SemanticSearchEngine:
                         logger.info(f"  - 发现body_text为空但body_html有内容的邮件")
                 
                 # 保存元数据
-                metadata.append({
-                    'uid': email.uid,
-                    'subject': email.subject,
-                    'sender': email.sender,
-                    'date': email.date,
-                    'folder': email.folder,
-                    'attachments': email.attachments,
-                    'body_text': email.body_text,
-                    'body_html': email.body_html
-                })
+                metadata.append(self.metadata_entry(email))
             
             # 无论语义搜索引擎是否初始化成功，都保存元数据以支持关键词搜索
             self.email_metadata = metadata
+            self.build_meta_frame()
             logger.info(f"邮件元数据加载完成，包含 {len(metadata)} 封邮件")
             
             # 尝试初始化语义搜索引擎
@@ -372,21 +594,20 @@ class SemanticSearchEngine:
             # 如果语义搜索引擎初始化成功，构建向量索引
             if self.is_initialized:
                 try:
-                    # 生成向量
+                    # 切块并生成向量（需在模型加载后进行，切块使用模型分词器）
                     logger.info("正在生成文本向量...")
-                    embeddings = self.model.encode(texts, show_progress_bar=True)
+                    texts, owners = self.chunk_emails(emails)
+                    embeddings = self.encode_texts(texts, show_progress_bar=True)
                     
-                    # 构建FAISS索引
+                    # 构建FAISS索引（向量在编码时已标准化，内积即余弦相似度）
                     dimension = embeddings.shape[1]
-                    self.index = faiss.IndexFlatIP(dimension)  # 使用内积相似度
-                    
-                    # 标准化向量（用于余弦相似度）
-                    faiss.normalize_L2(embeddings)
+                    self.index = create_faiss_index(dimension, len(embeddings), embeddings)
                     
                     # 添加向量到索引
                     self.index.add(embeddings.astype('float32'))
+                    self.chunk_owner = owners
                     
-                    logger.info(f"语义索引构建完成，包含 {self.index.ntotal} 个向量")
+                    logger.info(f"语义索引构建完成，包含 {self.index.ntotal} 个向量（{len(emails)} 封邮件）")
                     return True
                     
                 except Exception as e:
@@ -401,6 +622,137 @@ class SemanticSearchEngine:
             logger.error(f"构建索引失败: {str(e)}")
             return False
     
+    def metadata_entry(self, email) -> Dict:
+        """
+        生成单封邮件的索引元数据，预先计算清理后的正文预览
+        
+        Args:
+            email: EmailMessage对象
+            
+        Returns:
+            Dict: 邮件元数据
+        """
+        body = email.body_text if email.body_text.strip() else self._clean_html(email.body_html)
+        return {
+            'uid': email.uid,
+            'subject': email.subject,
+            'sender': email.sender,
+            'date': email.date,
+            'folder': email.folder,
+            'attachments': email.attachments,
+            'body_text': email.body_text,
+            'body_html': email.body_html,
+            'preview': re.sub(r'\s+', ' ', body).strip()[:300]
+        }
+    
+    def build_meta_frame(self):
+        """根据email_metadata构建筛选用的列式元数据（行号与FAISS向量ID一致）"""
+        metadata = self.email_metadata
+        self._bm25 = None  # 元数据变化后BM25索引需要重建
+        self.meta_df = pd.DataFrame({
+            'sender_lc': [(m.get('sender') or '').lower() for m in metadata],
+            'subject_lc': [(m.get('subject') or '').lower() for m in metadata],
+            'has_attach': [bool(m.get('attachments')) for m in metadata]
+        })
+    
+    def filter_ids(self, sender_sub: str = "", subject_sub: str = "",
+                   has_attach: bool = False) -> Optional[np.ndarray]:
+        """
+        按发件人、主题和附件条件预筛选邮件
+        
+        Args:
+            sender_sub: 发件人包含的文本（不区分大小写）
+            subject_sub: 主题包含的文本（不区分大小写）
+            has_attach: 是否只保留带附件的邮件
+            
+        Returns:
+            Optional[np.ndarray]: 满足条件的行号（int64），无筛选条件时返回None
+        """
+        if not (sender_sub or subject_sub or has_attach):
+            return None
+        if self.meta_df is None or len(self.meta_df) != len(self.email_metadata):
+            self.build_meta_frame()
+        
+        df = self.meta_df
+        mask = np.ones(len(df), dtype=bool)
+        if sender_sub:
+            mask &= df['sender_lc'].str.contains(sender_sub.lower(), regex=False).to_numpy()
+        if subject_sub:
+            mask &= df['subject_lc'].str.contains(subject_sub.lower(), regex=False).to_numpy()
+        if has_attach:
+            mask &= df['has_attach'].to_numpy()
+        return np.flatnonzero(mask).astype(np.int64)
+    
+    def _encode_batch(self, texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+        """
+        调用模型批量编码，并在编码阶段完成L2标准化
+        
+        Args:
+            texts: 文本列表
+            show_progress_bar: 是否显示编码进度条
+            
+        Returns:
+            np.ndarray: 已标准化的float32向量矩阵
+        """
+        embeddings = self.model.encode(
+            texts,
+            batch_size=self.encode_batch_size,
+            show_progress_bar=show_progress_bar,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+    
+    def _encode_query(self, query: str) -> np.ndarray:
+        """
+        生成标准化的查询向量
+        
+        Args:
+            query: 查询文本
+            
+        Returns:
+            np.ndarray: 形状为(1, dim)的只读float32向量，由LRU缓存在多次搜索间共享
+        """
+        query_embedding = np.asarray(self.model.encode([query]), dtype=np.float32)
+        faiss.normalize_L2(query_embedding)
+        query_embedding.flags.writeable = False
+        return query_embedding
+    
+    def encode_texts(self, texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+        """
+        生成文本向量，命中嵌入缓存的文本不再重复编码
+        
+        Args:
+            texts: 文本列表
+            show_progress_bar: 是否显示编码进度条
+            
+        Returns:
+            np.ndarray: 已L2标准化的float32向量矩阵
+        """
+        if self.embedding_cache is None:
+            return self._encode_batch(texts, show_progress_bar)
+        
+        hashes = [EmbeddingCache.content_hash(text) for text in texts]
+        try:
+            cached = self.embedding_cache.lookup_many(hashes)
+        except Exception as e:
+            logger.warning(f"读取嵌入缓存失败: {str(e)}")
+            cached = {}
+        
+        miss_positions = [i for i, h in enumerate(hashes) if h not in cached]
+        logger.info(f"嵌入缓存命中 {len(texts) - len(miss_positions)}/{len(texts)}")
+        
+        if miss_positions:
+            fresh = self._encode_batch([texts[i] for i in miss_positions], show_progress_bar)
+            miss_hashes = [hashes[i] for i in miss_positions]
+            try:
+                self.embedding_cache.write_many(miss_hashes, fresh)
+            except Exception as e:
+                logger.warning(f"写入嵌入缓存失败: {str(e)}")
+            cached.update(zip(miss_hashes, fresh))
+        
+        return np.stack([cached[h] for h in hashes]).astype(np.float32, copy=False)
+    
     def _prepare_email_text(self, email) -> str:
         """
         准备邮件文本用于向量化，增强项目需求信息提取
@@ -438,6 +790,91 @@ class SemanticSearchEngine:
         
         return combined_text
     
+    def _split_windows(self, text: str) -> List[str]:
+        """
+        按模型分词将长文本切分为重叠窗口（CHUNK_TOKENS长度，CHUNK_STRIDE步长）
+        
+        Args:
+            text: 正文文本
+            
+        Returns:
+            List[str]: 窗口文本列表，文本不足一个窗口时返回空列表
+        """
+        tokenizer = getattr(self.model, 'tokenizer', None)
+        try:
+            encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+            offsets = encoding['offset_mapping']
+        except Exception:
+            # 无可用的快速分词器时按字符近似切分（约2字符/词）
+            offsets = [(i, min(i + 2, len(text))) for i in range(0, len(text), 2)]
+        
+        if len(offsets) <= CHUNK_TOKENS:
+            return []
+        
+        windows = []
+        for start in range(0, len(offsets), CHUNK_STRIDE):
+            end = min(start + CHUNK_TOKENS, len(offsets))
+            windows.append(text[offsets[start][0]:offsets[end - 1][1]])
+            if end == len(offsets) or len(windows) >= MAX_CHUNKS_PER_EMAIL:
+                break
+        return windows
+    
+    def _prepare_email_chunks(self, email) -> List[str]:
+        """
+        准备邮件的向量化文本块：首块为带项目信息的摘要文本，长正文再追加重叠窗口块
+        
+        Args:
+            email: 邮件数据对象
+            
+        Returns:
+            List[str]: 文本块列表
+        """
+        chunks = [self._prepare_email_text(email)]
+        
+        body_text = email.body_text
+        if email.body_html and not body_text:
+            body_text = self._clean_html(email.body_html)
+        
+        header = f"主题: {email.subject}\n发件人: {email.sender}\n"
+        chunks.extend(f"{header}{window}" for window in self._split_windows(body_text or ""))
+        return chunks
+    
+    def chunk_emails(self, emails: List, offset: int = 0) -> Tuple[List[str], np.ndarray]:
+        """
+        批量切块邮件
+        
+        Args:
+            emails: 邮件列表 (EmailMessage对象)
+            offset: 第一封邮件在email_metadata中的行号
+            
+        Returns:
+            Tuple[List[str], np.ndarray]: 文本块列表，以及每个文本块所属邮件的行号
+        """
+        texts = []
+        owners = []
+        for i, email in enumerate(emails, start=offset):
+            chunks = self._prepare_email_chunks(email)
+            texts.extend(chunks)
+            owners.extend([i] * len(chunks))
+        return texts, np.asarray(owners, dtype=np.int64)
+    
+    def add_chunk_vectors(self, embeddings: np.ndarray, owners: np.ndarray):
+        """
+        向索引追加文本块向量（用于分批构建）
+        
+        Args:
+            embeddings: 已标准化的向量矩阵
+            owners: 每个向量所属邮件的行号
+        """
+        self.index.add(embeddings.astype('float32'))
+        self.chunk_owner = np.concatenate([self.chunk_owner, owners])
+    
+    def _owner_rows(self) -> np.ndarray:
+        """FAISS向量行号到邮件行号的映射（旧版一邮件一向量的索引按恒等映射处理）"""
+        if self.index is not None and len(self.chunk_owner) != self.index.ntotal:
+            return np.arange(self.index.ntotal, dtype=np.int64)
+        return self.chunk_owner
+    
     def _extract_project_requirements(self, text: str) -> str:
         """
         提取项目需求信息
@@ -546,7 +983,7 @@ class SemanticSearchEngine:
         return clean_text.strip()
     
     def search(self, query: str, top_k: int = None, 
-               filters: Dict = None) -> List[SearchResult]:
+               filters: Dict = None, id_filter: Optional[np.ndarray] = None) -> List[SearchResult]:
         """
         执行智能语义搜索
         
@@ -554,13 +991,18 @@ class SemanticSearchEngine:
             query: 搜索查询
             top_k: 返回结果数量
             filters: 搜索过滤条件
+            id_filter: 允许返回的邮件行号（见filter_ids），在FAISS检索阶段直接筛选
             
         Returns:
             List[SearchResult]: 搜索结果列表
         """
         if not self.is_initialized or self.index is None:
             logger.warning("语义搜索引擎未初始化，使用关键词搜索作为降级方案")
-            return self.keyword_search(query, top_k)
+            results = self.keyword_search(query, top_k)
+            if id_filter is not None:
+                allowed_uids = {self.email_metadata[i]['uid'] for i in id_filter}
+                results = [r for r in results if r.email_id in allowed_uids]
+            return results
         
         if top_k is None:
             top_k = self.default_top_k
@@ -578,19 +1020,35 @@ class SemanticSearchEngine:
             # 标准化查询文本
             search_query = self._normalize_text(search_query)
             
-            # 生成查询向量
-            query_embedding = self.model.encode([search_query])
-            faiss.normalize_L2(query_embedding)
+            # 生成查询向量（相同查询复用LRU缓存中的向量）
+            query_embedding = self._cached_query_embedding(search_query).copy()
             
-            # 执行搜索
-            scores, indices = self.index.search(query_embedding.astype('float32'), top_k)
+            # 按块检索，多取候选以便聚合后仍有top_k封邮件
+            owner_rows = self._owner_rows()
+            chunk_k = min(top_k * CHUNK_OVERSAMPLE, self.index.ntotal)
             
-            # 处理结果
-            results = []
-            for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
+            # 执行搜索（有预筛选ID时在检索阶段过滤，避免事后丢弃结果）
+            if id_filter is not None:
+                chunk_ids = np.flatnonzero(np.isin(owner_rows, id_filter)).astype(np.int64)
+                if len(chunk_ids) == 0:
+                    return []
+                params = self._search_params(faiss.IDSelectorBatch(chunk_ids))
+                scores, indices = self.index.search(query_embedding, chunk_k, params=params)
+            else:
+                scores, indices = self.index.search(query_embedding, chunk_k)
+            
+            # 按邮件聚合块得分（取最高分，结果已按得分降序）
+            email_scores = {}
+            for score, idx in zip(scores[0], indices[0]):
                 if idx == -1:  # FAISS返回-1表示无效结果
                     continue
-                
+                email_scores.setdefault(int(owner_rows[idx]), score)
+                if len(email_scores) >= top_k:
+                    break
+            
+            # 处理结果
+            results = []
+            for idx, score in email_scores.items():
                 metadata = self.email_metadata[idx]
                 
                 # 应用过滤器
@@ -640,6 +1098,22 @@ class SemanticSearchEngine:
             logger.error(f"搜索失败: {str(e)}")
             return []
     
+    def _search_params(self, selector):
+        """
+        按索引类型构造带ID筛选的检索参数（HNSW/IVF索引要求使用各自的参数类型）
+        
+        Args:
+            selector: FAISS ID选择器
+            
+        Returns:
+            faiss.SearchParameters: 检索参数
+        """
+        if isinstance(self.index, faiss.IndexHNSW):
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=self.index.hnsw.efSearch)
+        if isinstance(self.index, faiss.IndexIVF):
+            return faiss.SearchParametersIVF(sel=selector, nprobe=self.index.nprobe)
+        return faiss.SearchParameters(sel=selector)
+    
     def _apply_filters(self, metadata: Dict, filters: Dict) -> bool:
         """
         应用搜索过滤器
@@ -701,9 +1175,9 @@ class SemanticSearchEngine:
         body_text = metadata.get('body_text', '')
         body_html = metadata.get('body_html', '')
         
-        # 如果body_text为空但有body_html，尝试从HTML中提取文本
+        # 如果body_text为空但有body_html，优先使用建索引时预计算的预览，避免逐条清理HTML
         if not body_text.strip() and body_html:
-            body_text = self._clean_html(body_html)
+            body_text = metadata.get('preview') or self._clean_html(body_html)
         
         # 如果仍然没有正文内容，使用主题作为预览
         if not body_text.strip():
@@ -919,92 +1393,13 @@ class SemanticSearchEngine:
         
         filtered_results = []
         
-        # 人员信息相关的关键词（需要排除的）
-        person_keywords = [
-            # 基本人员信息
-            "名前", "年齢", "歳", "性別", "男性", "女性", "国籍", "中国籍", "日本籍",
-            "最寄駅", "駅", "稼働", "即日", "所属", "正社員", "単価", "万", "精算",
-            "実務経験", "年", "ヶ月", "日本語", "N1", "N2", "N3", "状況", "並行営業",
-            "推薦理由", "性格", "明るく", "コミュニケーション", "チーム意識",
-            "積極的", "継続的", "学び続ける", "意欲", "挑戦", "理解", "把握",
-            
-            # 人员类型和身份
-            "要員", "社員", "プロパー", "人材", "人員", "メンバー", "スタッフ",
-            "弊社", "営業中", "ご紹介", "紹介", "推薦", "候補者", "応募者",
-            "フリーランス", "派遣", "契約社員", "業務委託", "外注", "協力会社",
-            
-            # 人员状态和条件
-            "稼働中", "稼働可能", "アサイン", "参画", "常駐", "リモート可",
-            "即戦力", "ベテラン", "シニア", "ジュニア", "新人", "若手",
-            "経歴", "職歴", "学歴", "資格", "認定", "取得済み",
-            
-            # 人员评价和特征
-            "優秀", "真面目", "責任感", "協調性", "リーダーシップ", "向上心",
-            "几帳面", "丁寧", "細かい", "気配り", "サポート力", "対応力"
-        ]
-        
-        # 项目需求相关的关键词（应该保留的）
-        project_keywords = [
-            "プロジェクト", "開発", "案件", "募集", "求人", "採用", "必要", "要求",
-            "条件", "資格", "スキル", "技術", "経験者", "エンジニア", "プログラマー",
-            "開発者", "技術者", "業務", "システム", "アプリケーション", "Web",
-            "フロントエンド", "バックエンド", "データベース", "インフラ"
-        ]
-        
-        # 标题中的强人员信息指示词（出现在标题中时直接排除）
-        title_person_exclusion_keywords = [
-            "プロパー", "人材", "要員", "社員", "営業中", "ご紹介", 
-            "推薦", "候補者", "応募者", "稼働中", "稼働可能", "アサイン", "参画可能",
-            # 人员信息相关
-            "要員情報", "人材情報", "人員情報", "社員情報", "メンバー情報",
-            "技術者情報", "エンジニア情報", "開発者情報", "プログラマー情報",
-            # 新增的人员介绍关键词
-            "人財配信", "弊社直個人", "直個人", "個人情報", "履歴書", "経歴書",
-            "人財紹介", "人材紹介", "技術者紹介", "エンジニア紹介", "プログラマー紹介",
-            "スキルシート", "技術シート", "経験シート", "プロフィール",
-            # 人员状态相关
-            "即日稼働", "稼働希望", "参画希望", "アサイン希望", "就業希望",
-            "転職希望", "求職", "就職活動", "キャリアチェンジ",
-            # 人员评价和推荐
-            "優秀な", "実力のある", "経験豊富な", "ベテランの", "即戦力の",
-            "おすすめの", "推奨の", "イチオシの", "注目の",
-            # 自由职业者和直接人员相关
-            "フリーランス", "直フリーランス", "フリー", "個人事業主", "業務委託",
-            "外部パートナー", "協力会社", "外注先", "委託先"
-        ]
-        
-        # 一般人员信息指示词（用于内容分析）
-        general_person_indicators = [
-            "弊社", "営業中", "ご紹介", "推薦", "候補者", "応募者", 
-            "稼働中", "稼働可能", "アサイン", "参画可能",
-            # 新增的人员信息指示词
-            "人財配信", "弊社直個人", "直個人", "個人情報", "履歴書", "経歴書",
-            "人財紹介", "人材紹介", "技術者紹介", "エンジニア紹介", "プログラマー紹介",
-            "スキルシート", "技術シート", "経験シート", "プロフィール",
-            "即日稼働", "稼働希望", "参画希望", "アサイン希望", "就業希望",
-            "転職希望", "求職", "就職活動", "キャリアチェンジ",
-            "優秀な", "実力のある", "経験豊富な", "ベテランの", "即戦力の",
-            "おすすめの", "推奨の", "イチオシの", "注目の",
-            # 人员配信相关
-            "配信", "配属", "派遣", "出向", "常駐", "客先常駐",
-            # 自由职业者相关
-            "フリーランス", "直フリーランス", "フリー", "個人事業主", "業務委託",
-            "外部パートナー", "協力会社", "外注先", "委託先",
-            # 人员寻找项目的典型表达
-            "見合う案件", "案件ございましたら", "ご紹介いただけます", "案件をお探し",
-            "プロジェクトをお探し", "お仕事をお探し", "参画できる案件", "マッチする案件",
-            "適した案件", "条件に合う案件", "希望に合う案件"
-        ]
-        
         for result in results:
             # 检查邮件内容（主题和预览）
             content_text = f"{result.subject} {result.preview}".lower()
             subject_text = result.subject.lower()
             
             # 检查标题中是否包含强人员信息指示词（直接排除）
-            has_title_person_keyword = any(
-                keyword.lower() in subject_text for keyword in title_person_exclusion_keywords
-            )
+            has_title_person_keyword = TITLE_PERSON_EXCLUSION_KEYWORDS.any(subject_text)
             
             # 如果标题中包含强人员信息指示词，直接排除
             if has_title_person_keyword:
@@ -1012,15 +1407,13 @@ class SemanticSearchEngine:
                 continue
             
             # 检查内容中是否包含一般人员信息指示词
-            has_general_person_indicator = any(
-                keyword.lower() in content_text for keyword in general_person_indicators
-            )
+            has_general_person_indicator = GENERAL_PERSON_INDICATORS.any(content_text)
             
             # 计算人员信息关键词出现次数
-            person_count = sum(1 for keyword in person_keywords if keyword.lower() in content_text)
+            person_count = PERSON_KEYWORDS.count(content_text)
             
             # 计算项目需求关键词出现次数
-            project_count = sum(1 for keyword in project_keywords if keyword.lower() in content_text)
+            project_count = PROJECT_KEYWORDS.count(content_text)
             
             # 调整后的过滤条件：更加平衡
             should_exclude = False
@@ -1137,28 +1530,44 @@ class SemanticSearchEngine:
         
         if query_info['search_direction'] == 'person_to_project':
             # 人员→项目：优先匹配项目需求
-            project_indicators = ['プロジェクト', '案件', '募集', '求人', '採用', '開発', '要求', '必要']
-            project_matches = sum(1 for indicator in project_indicators if indicator in text_content)
+            project_matches = PROJECT_INDICATORS.count(text_content)
             bonus += project_matches * 0.15
             
         elif query_info['search_direction'] == 'project_to_person':
             # 项目→人员：优先匹配人员信息
-            person_indicators = ['プログラマー', 'エンジニア', '開発者', '経験', '技術', '専門', '得意', 'スキル']
-            person_matches = sum(1 for indicator in person_indicators if indicator in text_content)
+            person_matches = PERSON_INDICATORS.count(text_content)
             bonus += person_matches * 0.15
         
         # 输入类型匹配加成
         if query_info['input_type'] == 'person':
             # 输入人员信息时，优先匹配项目需求
-            if any(term in text_content for term in ['プロジェクト', '案件', '募集', '求人']):
+            if PROJECT_INPUT_TERMS.any(text_content):
                 bonus += 0.2
         elif query_info['input_type'] == 'project':
             # 输入项目信息时，优先匹配人员简历
-            if any(term in text_content for term in ['プログラマー', 'エンジニア', '開発者', '経験']):
+            if PERSON_INPUT_TERMS.any(text_content):
                 bonus += 0.2
         
         return bonus
     
+    def _skill_matcher(self, skills: Tuple[str, ...]) -> KeywordMatcher:
+        """
+        获取查询技能的关键词匹配器（按技能组合缓存，同一查询的所有结果共用）
+        
+        Args:
+            skills: 查询中检测到的技能
+            
+        Returns:
+            KeywordMatcher: 标签为技能名的匹配器
+        """
+        matcher = self._skill_matchers.get(skills)
+        if matcher is None:
+            matcher = KeywordMatcher(
+                (keyword, skill) for skill in skills for keyword in self.skill_keywords[skill]
+            )
+            self._skill_matchers[skills] = matcher
+        return matcher
+    
     def _calculate_skill_bonus(self, result: SearchResult, query_info: Dict) -> float:
         """
         计算技能匹配奖励分数
@@ -1173,13 +1582,8 @@ class SemanticSearchEngine:
         bonus = 0.0
         text_content = f"{result.subject} {result.preview}".lower()
         
-        # 技能匹配奖励
-        for skill in query_info['skills']:
-            skill_keywords = self.skill_keywords[skill]
-            for keyword in skill_keywords:
-                if keyword.lower() in text_content:
-                    bonus += 0.1
-                    break
+        # 技能匹配奖励（每个命中的技能加分一次）
+        bonus += 0.1 * len(self._skill_matcher(tuple(query_info['skills'])).labels_in(text_content))
         
         # 经验年限匹配奖励
         if query_info['experience_years']:
@@ -1194,10 +1598,7 @@ class SemanticSearchEngine:
                     break
         
         # 项目相关词汇奖励
-        project_keywords = ['プロジェクト', '案件', '開発', '求人', '募集']
-        for keyword in project_keywords:
-            if keyword in text_content:
-                bonus += 0.05
+        bonus += 0.05 * PROJECT_BONUS_KEYWORDS.count(text_content)
         
         return min(bonus, 0.5)  # 最大奖励0.5分
     
@@ -1218,8 +1619,60 @@ class SemanticSearchEngine:
         if top_k is None:
             top_k = self.default_top_k
         
-        query_words = query.lower().split()
+        if bm25s is not None:
+            scored = self._bm25_scores(query, top_k)
+        else:
+            scored = heapq.nlargest(top_k, self._substring_scores(query), key=lambda x: x[1])
+        
         results = []
+        for i, score in scored:
+            metadata = self.email_metadata[i]
+            preview = self._generate_preview(metadata, query)
+            
+            # 获取完整正文内容 - 优先使用body_text，如果为空则从body_html转换
+            original_body_text = metadata.get('body_text', '')
+            body_html = metadata.get('body_html', '')
+            
+            logger.info(f"关键词搜索SearchResult创建 - 邮件ID: {metadata.get('uid', 'unknown')}")
+            logger.info(f"  - 原始body_text长度: {len(original_body_text)}")
+            logger.info(f"  - body_html长度: {len(body_html)}")
+            
+            full_body_text = original_body_text
+            if not full_body_text.strip() and body_html:
+                # 如果body_text为空但有body_html，则清理HTML标签
+                full_body_text = self._clean_html(body_html)
+                logger.info(f"  - 从body_html转换后长度: {len(full_body_text)}")
+            else:
+                logger.info(f"  - 使用原始body_text，长度: {len(full_body_text)}")
+            
+            result = SearchResult(
+                email_id=metadata['uid'],
+                score=score,
+                subject=metadata['subject'],
+                sender=metadata['sender'],
+                date=metadata['date'],
+                preview=preview,
+                folder=metadata['folder'],
+                attachments=metadata['attachments'],
+                body_text=full_body_text
+            )
+            
+            results.append(result)
+        
+        return results
+    
+    def _substring_scores(self, query: str) -> List[Tuple[int, float]]:
+        """
+        逐条子串匹配打分（未安装bm25s时使用）
+        
+        Args:
+            query: 搜索查询
+        
+        Returns:
+            List[Tuple[int, float]]: 命中邮件的(行号, 分数)
+        """
+        query_words = query.lower().split()
+        scored = []
         
         for i, metadata in enumerate(self.email_metadata):
             score = 0
@@ -1237,49 +1690,83 @@ class SemanticSearchEngine:
             score += sum(1 for word in query_words if word in body)
             
             if score > 0:
-                preview = self._generate_preview(metadata, query)
-                
-                # 获取完整正文内容 - 优先使用body_text，如果为空则从body_html转换
-                original_body_text = metadata.get('body_text', '')
-                body_html = metadata.get('body_html', '')
-                
-                logger.info(f"关键词搜索SearchResult创建 - 邮件ID: {metadata.get('uid', 'unknown')}")
-                logger.info(f"  - 原始body_text长度: {len(original_body_text)}")
-                logger.info(f"  - body_html长度: {len(body_html)}")
-                
-                full_body_text = original_body_text
-                if not full_body_text.strip() and body_html:
-                    # 如果body_text为空但有body_html，则清理HTML标签
-                    full_body_text = self._clean_html(body_html)
-                    logger.info(f"  - 从body_html转换后长度: {len(full_body_text)}")
-                else:
-                    logger.info(f"  - 使用原始body_text，长度: {len(full_body_text)}")
-                
-                result = SearchResult(
-                    email_id=metadata['uid'],
-                    score=score,
-                    subject=metadata['subject'],
-                    sender=metadata['sender'],
-                    date=metadata['date'],
-                    preview=preview,
-                    folder=metadata['folder'],
-                    attachments=metadata['attachments'],
-                    body_text=full_body_text
-                )
-                
-                results.append(result)
+                scored.append((i, score))
         
-        # 按分数排序
-        results.sort(key=lambda x: x.score, reverse=True)
+        return scored
+    
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        """使用jieba分词并去除空白与单个标点"""
+        return [t for t in jieba.lcut(text.lower()) if t.strip() and (len(t) > 1 or t.isalnum())]
+    
+    def _get_bm25(self):
+        """
+        获取BM25检索器，首次调用时对全部邮件分词建索引（主题加倍计权）
         
-        return results[:top_k]
+        Returns:
+            Tuple: (bm25s.BM25, 词到ID的映射)
+        """
+        if self._bm25 is None:
+            vocab = {}
+            corpus_ids = []
+            for metadata in self.email_metadata:
+                subject = metadata.get('subject') or ''
+                text = f"{subject} {subject} {metadata.get('sender') or ''} {metadata.get('body_text') or ''}"
+                corpus_ids.append([vocab.setdefault(t, len(vocab)) for t in self._tokenize(text)])
+            
+            retriever = bm25s.BM25()
+            retriever.index(bm25s.tokenization.Tokenized(ids=corpus_ids, vocab=vocab), show_progress=False)
+            self._bm25 = (retriever, vocab)
+            logger.info(f"BM25索引构建完成: {len(corpus_ids)} 封邮件, 词表 {len(vocab)}")
+        return self._bm25
     
-    def save_index(self, filepath: str) -> bool:
+    def _bm25_scores(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """
+        使用BM25S检索关键词得分最高的邮件
+        
+        Args:
+            query: 搜索查询
+            top_k: 返回结果数量
+        
+        Returns:
+            List[Tuple[int, float]]: 按分数降序的(行号, 分数)
+        """
+        retriever, vocab = self._get_bm25()
+        query_ids = [vocab[t] for t in self._tokenize(query) if t in vocab]
+        if not query_ids:
+            return []
+        
+        k = min(top_k, len(self.email_metadata))
+        docs, scores = retriever.retrieve(
+            bm25s.tokenization.Tokenized(ids=[query_ids], vocab=vocab), k=k, show_progress=False
+        )
+        return [(int(i), float(score)) for i, score in zip(docs[0], scores[0]) if score > 0]
+    
+    def hybrid_search(self, query: str, top_k: int = None) -> List[SearchResult]:
+        """
+        混合搜索：语义检索与关键词检索各取top_k，再用RRF融合排序
+        
+        Args:
+            query: 搜索查询
+            top_k: 返回结果数量
+        
+        Returns:
+            List[SearchResult]: 融合后的搜索结果
+        """
+        if top_k is None:
+            top_k = self.default_top_k
+        
+        semantic_results = self.search(query=query, top_k=top_k)
+        keyword_results = self.keyword_search(query=query, top_k=top_k)
+        return reciprocal_rank_fusion([semantic_results, keyword_results], top_k)
+    
+    def save_index(self, filepath: str, extra_config: Optional[Dict] = None) -> bool:
         """
         保存索引到文件
         
         Args:
             filepath: 保存路径
+            extra_config: 额外写入配置文件的字段（如邮件数据指纹）
             
         Returns:
             bool: 保存是否成功
@@ -1292,18 +1779,26 @@ class SemanticSearchEngine:
             # 创建保存目录
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
             
-            # 保存FAISS索引
+            # 所有索引都保存为FAISS文件（全精度，可按需只读内存映射加载），
+            # 并移除旧版本为精确检索索引保存的fp16向量矩阵
             faiss.write_index(self.index, f"{filepath}.faiss")
+            stale_path = f"{filepath}.emb.npy"
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
             
-            # 保存元数据
+            # 保存元数据与向量所属邮件映射
             with open(f"{filepath}.metadata", 'wb') as f:
                 pickle.dump(self.email_metadata, f)
+            np.save(f"{filepath}.chunks.npy", self._owner_rows())
             
             # 保存配置信息
             config = {
                 'model_name': self.model_name,
+                'index_type': type(self.index).__name__,
                 'email_count': len(self.email_metadata),
-                'created_at': datetime.now().isoformat()
+                'chunk_count': self.index.ntotal,
+                'created_at': datetime.now().isoformat(),
+                **(extra_config or {})
             }
             
             with open(f"{filepath}.config", 'w', encoding='utf-8') as f:
@@ -1316,19 +1811,38 @@ class SemanticSearchEngine:
             logger.error(f"保存索引失败: {str(e)}")
             return False
     
-    def load_index(self, filepath: str) -> bool:
+    @staticmethod
+    def _load_embedding_matrix(path: str):
+        """
+        加载旧版本保存的fp16向量矩阵：以只读内存映射打开，分块转换为fp32复制进新的精确检索索引
+        
+        Args:
+            path: 向量矩阵文件路径
+            
+        Returns:
+            faiss.IndexFlatIP: 精确检索索引
+        """
+        matrix = np.load(path, mmap_mode='r')
+        index = faiss.IndexFlatIP(matrix.shape[1])
+        for start in range(0, len(matrix), EMBEDDING_BLOCK_ROWS):
+            index.add(np.asarray(matrix[start:start + EMBEDDING_BLOCK_ROWS], dtype=np.float32))
+        return index
+    
+    def load_index(self, filepath: str, mmap: bool = False) -> bool:
         """
         从文件加载索引
         
         Args:
             filepath: 索引文件路径
+            mmap: 是否以只读内存映射方式加载（加载后不可再追加向量，多个会话共享页缓存）
             
         Returns:
             bool: 加载是否成功
         """
         try:
             # 检查文件是否存在
-            if not os.path.exists(f"{filepath}.faiss"):
+            embedding_path = f"{filepath}.emb.npy"
+            if not os.path.exists(f"{filepath}.faiss") and not os.path.exists(embedding_path):
                 logger.error(f"索引文件不存在: {filepath}.faiss")
                 return False
             
@@ -1339,12 +1853,24 @@ class SemanticSearchEngine:
             if not self.is_initialized:
                 return False
             
-            # 加载FAISS索引
-            self.index = faiss.read_index(f"{filepath}.faiss")
+            # 加载FAISS索引；只有旧版本的fp16向量矩阵时复制加载（此时mmap不生效）
+            if os.path.exists(f"{filepath}.faiss"):
+                io_flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+                self.index = faiss.read_index(f"{filepath}.faiss", io_flags)
+            else:
+                self.index = self._load_embedding_matrix(embedding_path)
             
             # 加载元数据
             with open(f"{filepath}.metadata", 'rb') as f:
                 self.email_metadata = pickle.load(f)
+            self.build_meta_frame()
+            
+            # 旧版索引没有映射文件，一邮件一向量
+            chunks_path = f"{filepath}.chunks.npy"
+            if os.path.exists(chunks_path):
+                self.chunk_owner = np.load(chunks_path)
+            else:
+                self.chunk_owner = np.arange(self.index.ntotal, dtype=np.int64)
             
             # 加载配置信息
             if os.path.exists(f"{filepath}.config"):
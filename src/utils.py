@@ -6,18 +6,47 @@
 import re
 import os
 import json
-import pandas as pd
+import mmap
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import email.utils
 import hashlib
 import logging
+from functools import lru_cache
+from dataclasses import dataclass
+import numpy as np
 from email_validator import validate_email, EmailNotValidError
 
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，缺失时退回标准库json
+    orjson = None
+
+try:
+    import xlsxwriter
+except ImportError:  # xlsxwriter为可选依赖，缺失时退回pandas+openpyxl导出
+    xlsxwriter = None
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _load_json_file(file_path: str) -> Any:
+    """
+    读取JSON文件，优先使用orjson直接解析mmap映射的文件内容
+    
+    Args:
+        file_path: JSON文件路径
+        
+    Returns:
+        Any: 解析后的数据
+    """
+    with open(file_path, 'rb') as f:
+        if orjson is None or os.fstat(f.fileno()).st_size == 0:
+            return json.load(f)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
 def validate_email_config(config: Dict) -> bool:
     """
     验证邮件配置
@@ -84,6 +113,14 @@ def format_email_preview(email_data: Dict, max_length: int = 200) -> str:
     
     return body
 
+# 预编译的文本清理正则
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_MD_STRIKE_RE = re.compile(r'~~([^~]+)~~')
+_COMBINING_STRIKE_RE = re.compile(r'[\u0335\u0336\u0337\u0338]')
+_WHITESPACE_RE = re.compile(r'\s+')
+_TAG_NAME_RE = re.compile(r"<\s*(\w+)")
+
+@lru_cache(maxsize=8192)
 def clean_html_tags(html_text: str) -> str:
     """
     清理HTML标签，保留纯文本
@@ -117,16 +154,16 @@ def clean_html_tags(html_text: str) -> str:
         clean_text = clean_text.replace(entity, replacement)
     
     # 再移除HTML标签（包括可能因实体解码重新出现的标签）
-    clean_text = re.sub(r'<[^>]+>', '', clean_text)
+    clean_text = _HTML_TAG_RE.sub('', clean_text)
     
     # 额外移除可能的删除线Markdown标记（~~文本~~）
-    clean_text = re.sub(r'~~([^~]+)~~', r'\1', clean_text)
+    clean_text = _MD_STRIKE_RE.sub(r'\1', clean_text)
     
     # 移除Unicode组合删除线字符（常见：U+0335/U+0336等）
-    clean_text = re.sub(r'[\u0335\u0336\u0337\u0338]', '', clean_text)
+    clean_text = _COMBINING_STRIKE_RE.sub('', clean_text)
     
     # 清理多余的空白字符
-    clean_text = re.sub(r'\s+', ' ', clean_text)
+    clean_text = _WHITESPACE_RE.sub(' ', clean_text)
     
     return clean_text.strip()
 
@@ -274,7 +311,8 @@ def export_emails_to_csv(emails: List, filename: str = None) -> bytes:
             else:
                 logger.warning(f"跳过未知类型的邮件数据: {type(email)}")
         
-        # 创建DataFrame并导出
+        # 创建DataFrame并导出（pandas仅在导出时按需导入）
+        import pandas as pd
         df = pd.DataFrame(export_data)
         
         # 如果提供了文件名，保存到文件
@@ -290,6 +328,78 @@ def export_emails_to_csv(emails: List, filename: str = None) -> bytes:
         logger.error(f"导出CSV失败: {str(e)}")
         return b""
 
+def _excel_column_width(column_name: str, max_length: int) -> int:
+    """按列名与内容长度计算导出列宽"""
+    if column_name == '正文':
+        return 80  # 正文列设置为80
+    if column_name == '主题':
+        return min(max_length + 2, 60)  # 主题列最大60
+    return min(max_length + 2, 30)  # 其他列最大30
+
+def _write_xlsx_rows(rows: List[Dict], buffer) -> None:
+    """
+    使用xlsxwriter的constant_memory模式逐行写出Excel，不在内存中保留整个工作簿
+    
+    Args:
+        rows: 导出行（列名到值的映射）
+        buffer: 写入目标（BytesIO）
+    """
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    workbook = xlsxwriter.Workbook(buffer, {'constant_memory': True})
+    worksheet = workbook.add_worksheet('邮件数据')
+    date_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+    
+    # constant_memory模式下需在写入数据前设置列宽
+    for col, name in enumerate(columns):
+        max_length = max((len(str(row.get(name, ''))) for row in rows), default=0)
+        worksheet.set_column(col, col, _excel_column_width(name, max(max_length, len(name))))
+    
+    worksheet.write_row(0, 0, columns)
+    for row_idx, row in enumerate(rows, start=1):
+        for col, name in enumerate(columns):
+            value = row.get(name)
+            if value is None or value == '':
+                continue
+            if isinstance(value, datetime):
+                worksheet.write_datetime(row_idx, col, value, date_format)
+            elif isinstance(value, (int, float)):
+                worksheet.write_number(row_idx, col, value)
+            else:
+                worksheet.write_string(row_idx, col, str(value))
+    workbook.close()
+
+def _write_xlsx_pandas(rows: List[Dict], buffer) -> None:
+    """
+    使用pandas+openpyxl写出Excel（未安装xlsxwriter时使用）
+    
+    Args:
+        rows: 导出行（列名到值的映射）
+        buffer: 写入目标（BytesIO）
+    """
+    # pandas仅在导出时按需导入
+    import pandas as pd
+    df = pd.DataFrame(rows)
+    
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='邮件数据', index=False)
+        
+        # 调整列宽
+        worksheet = writer.sheets['邮件数据']
+        for column in worksheet.columns:
+            max_length = 0
+            column_letter = column[0].column_letter
+            column_name = column[0].value  # 获取列名
+            
+            for cell in column:
+                try:
+                    if cell.value is not None and len(str(cell.value)) > max_length:
+                        max_length = len(str(cell.value))
+                except (AttributeError, TypeError) as e:
+                    logger.debug(f"计算列宽时跳过单元格: {str(e)}")
+                    continue
+            
+            worksheet.column_dimensions[column_letter].width = _excel_column_width(column_name, max_length)
+
 def export_emails_to_excel(emails: List, filename: str = None) -> bytes:
     """
     导出邮件数据到Excel文件
@@ -385,40 +495,14 @@ def export_emails_to_excel(emails: List, filename: str = None) -> bytes:
             else:
                 logger.warning(f"跳过未知类型的邮件数据: {type(email)}")
         
-        # 创建DataFrame并导出
-        df = pd.DataFrame(export_data)
-        
         # 创建内存中的Excel文件
         from io import BytesIO
         excel_buffer = BytesIO()
         
-        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='邮件数据', index=False)
-            
-            # 调整列宽
-            worksheet = writer.sheets['邮件数据']
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                column_name = column[0].value  # 获取列名
-                
-                for cell in column:
-                    try:
-                        if cell.value is not None and len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except (AttributeError, TypeError) as e:
-                        logger.debug(f"计算列宽时跳过单元格: {str(e)}")
-                        continue
-                
-                # 为正文列设置特殊宽度
-                if column_name == '正文':
-                    adjusted_width = 80  # 正文列设置为80
-                elif column_name == '主题':
-                    adjusted_width = min(max_length + 2, 60)  # 主题列最大60
-                else:
-                    adjusted_width = min(max_length + 2, 30)  # 其他列最大30
-                    
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+        if xlsxwriter is not None:
+            _write_xlsx_rows(export_data, excel_buffer)
+        else:
+            _write_xlsx_pandas(export_data, excel_buffer)
         
         # 如果提供了文件名，保存到文件
         if filename:
@@ -454,6 +538,11 @@ def load_config_from_env() -> Dict:
     # AI模型配置
     config['ai'] = {
         'model_name': os.getenv('SENTENCE_TRANSFORMER_MODEL', 'paraphrase-multilingual-MiniLM-L12-v2'),
+        # 向量编码：每批文本数量，以及CPU上是否启用int8动态量化
+        'encode_batch_size': int(os.getenv('EMBED_BATCH_SIZE', '256')),
+        'quantize': os.getenv('EMBED_QUANTIZE', 'false').lower() == 'true',
+        # 编码后端：torch（sentence-transformers）或onnx（ONNX Runtime，需安装optimum[onnxruntime]）
+        'backend': os.getenv('EMBED_BACKEND', 'torch').lower(),
         'openai_api_key': os.getenv('OPENAI_API_KEY')
     }
     
@@ -608,22 +697,14 @@ def validate_search_query(query: str) -> bool:
     
     return True
 
-def highlight_search_terms(text: str, query: str,
-                          highlight_tag: str = "**") -> str:
-    """
-    在文本中高亮搜索关键词
-    
-    Args:
-        text: 原始文本
-        query: 搜索查询
-        highlight_tag: 高亮标签
-        
-    Returns:
-        str: 高亮后的文本
-    """
-    if not query or not text:
-        return text
-    
+@lru_cache(maxsize=1024)
+def _term_pattern(term: str) -> re.Pattern:
+    """编译并缓存单个查询词的不区分大小写正则"""
+    return re.compile(re.escape(term), re.IGNORECASE)
+
+@lru_cache(maxsize=8192)
+def _highlight_cached(text: str, query: str, highlight_tag: str) -> str:
+    """按 (text, query, highlight_tag) 缓存的高亮实现"""
     # 分割查询词
     terms = query.split()
     highlighted_text = text
@@ -632,21 +713,38 @@ def highlight_search_terms(text: str, query: str,
     end_tag = highlight_tag
     if highlight_tag.startswith("<"):
         # 提取标签名
-        m = re.match(r"<\s*(\w+)", highlight_tag)
+        m = _TAG_NAME_RE.match(highlight_tag)
         if m:
             end_tag = f"</{m.group(1)}>"
     
     for term in terms:
         if len(term) > 1:  # 忽略单字符
             # 使用正则表达式进行不区分大小写的替换
-            pattern = re.compile(re.escape(term), re.IGNORECASE)
-            highlighted_text = pattern.sub(
+            highlighted_text = _term_pattern(term).sub(
                 f"{highlight_tag}{term}{end_tag}",
                 highlighted_text
             )
     
     return highlighted_text
 
+def highlight_search_terms(text: str, query: str,
+                          highlight_tag: str = "**") -> str:
+    """
+    在文本中高亮搜索关键词
+    
+    Args:
+        text: 原始文本
+        query: 搜索查询
+        highlight_tag: 高亮标签
+        
+    Returns:
+        str: 高亮后的文本
+    """
+    if not query or not text:
+        return text
+    
+    return _highlight_cached(text, query, highlight_tag)
+
 def save_email_config(config: Dict, config_name: str = "default", 
                      config_dir: str = "./configs") -> bool:
     """
@@ -797,8 +895,7 @@ def load_emails_from_specific_cache(cache_file_path: str) -> Optional[List]:
             logger.error(f"缓存文件不存在: {cache_file_path}")
             return None
         
-        with open(cache_file_path, 'r', encoding='utf-8') as f:
-            cache_data = json.load(f)
+        cache_data = _load_json_file(cache_file_path)
         
         email_dicts = cache_data.get("emails", [])
         sync_time = cache_data.get("sync_time", "未知")
@@ -836,17 +933,20 @@ def search_emails_in_cache(emails: List, query: str, search_fields: List[str] =
     try:
         query_lower = query.lower()
         matched_emails = []
+        # 主题和发件人优先使用EmailMessage入库时预先小写化的字段
+        lowered_fields = [(field, f"{field}_lc") for field in search_fields]
         
         for email in emails:
             match_found = False
             
             # 在指定字段中搜索
-            for field in search_fields:
-                if hasattr(email, field):
-                    field_value = getattr(email, field)
-                    if field_value and query_lower in str(field_value).lower():
-                        match_found = True
-                        break
+            for field, lowered_field in lowered_fields:
+                field_value = getattr(email, lowered_field, None)
+                if field_value is None:
+                    field_value = str(getattr(email, field, '') or '').lower()
+                if field_value and query_lower in field_value:
+                    match_found = True
+                    break
             
             if match_found:
                 matched_emails.append(email)
@@ -927,8 +1027,8 @@ def email_message_to_dict(email_obj) -> Dict:
     Returns:
         Dict: 邮件字典数据
     """
-    if hasattr(email_obj, '__dict__'):
-        # 如果是EmailMessage对象，转换为字典
+    if not isinstance(email_obj, dict):
+        # 如果是EmailMessage对象（使用__slots__，没有__dict__），转换为字典
         email_dict = {
             'uid': email_obj.uid,
             'subject': email_obj.subject,
@@ -1045,8 +1145,7 @@ def load_emails_from_cache(cache_dir: str = "./cache") -> Optional[List]:
             logger.info("未找到邮件缓存文件")
             return None
         
-        with open(latest_cache_file, 'r', encoding='utf-8') as f:
-            cache_data = json.load(f)
+        cache_data = _load_json_file(latest_cache_file)
         
         email_dicts = cache_data.get("emails", [])
         sync_time = cache_data.get("sync_time", "未知")
@@ -1089,4 +1188,48 @@ def get_cache_info(cache_dir: str = "./cache") -> Optional[Dict]:
         
     except Exception as e:
         logger.error(f"获取缓存信息失败: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+@dataclass
+class EmailColumns:
+    """
+    邮件数据的列式视图（每个字段一个数组），用于对全部邮件做批量统计
+    
+    Attributes:
+        dates: 邮件日期（datetime64[D]），无日期为NaT
+        has_attachments: 是否包含附件
+    """
+    dates: np.ndarray
+    has_attachments: np.ndarray
+    
+    @classmethod
+    def from_emails(cls, emails: List) -> 'EmailColumns':
+        """
+        从EmailMessage列表构建列式视图
+        
+        Args:
+            emails: 邮件列表（EmailMessage对象）
+            
+        Returns:
+            EmailColumns: 列式视图
+        """
+        dates = np.array(
+            [e.date.date() if isinstance(e.date, datetime) else None for e in emails],
+            dtype='datetime64[D]'
+        )
+        has_attachments = np.fromiter(
+            (bool(e.attachments) for e in emails),
+            dtype=bool, count=len(emails)
+        )
+        return cls(dates=dates, has_attachments=has_attachments)
+    
+    def __len__(self) -> int:
+        return len(self.dates)
+    
+    def count_on(self, day) -> int:
+        """统计指定日期的邮件数量"""
+        return int(np.count_nonzero(self.dates == np.datetime64(day, 'D')))
+    
+    def attachment_count(self) -> int:
+        """统计包含附件的邮件数量"""
+        return int(np.count_nonzero(self.has_attachments))